@@ -13,6 +13,7 @@ from flask import Flask, render_template, request, jsonify, redirect, url_for, f
 from flask_sqlalchemy import SQLAlchemy
 
 from main import run_newsletter_generation, load_config
+from circuit_breaker import CircuitBreaker
 from database import (
     DatabaseArticleManager, DatabaseSponsorManager, 
     DatabaseNewsletterManager, DatabaseRSSManager
@@ -31,7 +32,6 @@ if not secret_key:
     secret_key = secrets.token_hex(32)
     logger.warning("No SECRET_KEY environment variable found. Generated a random key for this session. "
                    "For production, set the SECRET_KEY environment variable to a secure random value.")
-=======
 
 # Generate a secure secret key
 secret_key = os.environ.get('SECRET_KEY')
@@ -63,7 +63,8 @@ def index():
         # Initialize database managers using context managers
         with DatabaseArticleManager() as article_manager, \
              DatabaseSponsorManager() as sponsor_manager, \
-             DatabaseNewsletterManager() as newsletter_manager:
+             DatabaseNewsletterManager() as newsletter_manager, \
+             DatabaseRSSManager() as rss_manager:
             
             # Get database statistics
             article_stats = article_manager.get_stats()
@@ -79,6 +80,18 @@ def index():
                 'newsletters_today': newsletter_stats.get('newsletters_today', 0),
                 'total_newsletters': newsletter_stats.get('total_newsletters', 0)
             }
+            
+            # Get fetch health and circuit breaker state per RSS source
+            breaker = CircuitBreaker.from_config(config.get("circuit_breaker", {}))
+            source_health = {
+                source.url: {
+                    'circuit_state': breaker.current_state(source),
+                    'last_fetch_status': source.last_fetch_status,
+                    'consecutive_failures': source.consecutive_failures or 0,
+                    'next_fetch_date': source.next_fetch_date
+                }
+                for source in rss_manager.get_active_sources()
+            }
         
         # Check if recent newsletter exists
         recent_newsletter = None
@@ -92,11 +105,12 @@ def index():
         return render_template('preview.html', 
                              config=config, 
                              stats=stats, 
+                             source_health=source_health,
                              recent_newsletter=recent_newsletter)
     except Exception as e:
         logger.error(f"Error loading dashboard: {e}")
         flash(f"Error loading dashboard: {e}", 'error')
-        return render_template('preview.html', config={}, stats={}, recent_newsletter=None)
+        return render_template('preview.html', config={}, stats={}, source_health={}, recent_newsletter=None)
 
 @app.route('/generate', methods=['POST'])
 def generate_newsletter():
@@ -0,0 +1,272 @@
+"""
+Content-addressed on-disk cache for article pages
+Stores compressed raw HTML and the trafilatura extraction separately, with TTL and size-based LRU eviction
+"""
+
+import gzip
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+logger = logging.getLogger(__name__)
+
+# Query parameters that never change the page, besides utm_*
+TRACKING_PARAMS = {'fbclid', 'gclid'}
+
+class ArticleCache:
+    """
+    Caches downloaded article pages keyed by URL, minus tracking parameters
+
+    The index maps each URL key (see cache_key) to its response validators and to the
+    SHA-256 digest of the page body. Bodies are stored once per digest
+    (``<digest>.html.gz``) next to their extracted text (``<digest>.txt``),
+    so pages served under several URLs share one copy.
+    """
+
+    def __init__(self, cache_dir: str = "data/article_cache", max_size_mb: float = 200,
+                 ttl_hours: float = 72):
+        self.cache_dir = cache_dir
+        self.index_file = os.path.join(cache_dir, "index.json")
+        self.max_bytes = int(max_size_mb * 1024 * 1024)
+        self.ttl_seconds = ttl_hours * 3600
+        self.entries: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+
+        # Ensure cache directory exists
+        os.makedirs(cache_dir, exist_ok=True)
+
+        # Load existing index
+        self.load()
+
+    def load(self):
+        """Load the cache index from disk"""
+        try:
+            if os.path.exists(self.index_file):
+                with open(self.index_file, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+
+                self.entries = data.get('entries', {})
+                logger.info(f"Loaded article cache index with {len(self.entries)} pages")
+            else:
+                logger.info("No existing article cache found, starting fresh")
+        except Exception as e:
+            logger.error(f"Failed to load article cache index: {e}")
+            self.entries = {}
+
+    def save(self):
+        """Evict expired/excess pages and write the index atomically"""
+        try:
+            self.evict()
+
+            with self._lock:
+                data = {
+                    'entries': dict(self.entries),
+                    'last_updated': datetime.now().isoformat()
+                }
+
+            temp_file = f"{self.index_file}.tmp"
+            with open(temp_file, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(temp_file, self.index_file)
+
+            logger.debug("Article cache index saved")
+        except Exception as e:
+            logger.error(f"Failed to save article cache index: {e}")
+
+    @staticmethod
+    def cache_key(url: str) -> str:
+        """
+        Index key for a URL
+
+        Only the scheme and host are lowercased, and only tracking parameters
+        (utm_*, fbclid, gclid) and the fragment are dropped. Path and query
+        keep their case and the other parameters are kept, because on some
+        sites they select a different page. Dedup normalization is looser on
+        purpose, so it is not used here.
+        """
+        try:
+            parts = urlsplit(url.strip())
+            query = [
+                (name, value) for name, value in parse_qsl(parts.query, keep_blank_values=True)
+                if not name.lower().startswith('utm_') and name.lower() not in TRACKING_PARAMS
+            ]
+            return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path or '/', urlencode(query), ''))
+        except ValueError:
+            return url.strip()
+
+    def _blob_path(self, digest: str, suffix: str) -> str:
+        return os.path.join(self.cache_dir, digest[:2], f"{digest}{suffix}")
+
+    def _write_blob(self, path: str, data: bytes):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write-then-rename so concurrent writers of the same digest never
+        # expose a partial file
+        temp_file = f"{path}.{threading.get_ident()}.tmp"
+        with open(temp_file, 'wb') as f:
+            f.write(data)
+        os.replace(temp_file, path)
+
+    def lookup(self, url: str) -> Optional[Dict]:
+        """
+        Get the cache entry for a URL, fresh or stale
+
+        Returns:
+            Entry dictionary with 'fresh' set, or None if the URL is not cached
+        """
+        with self._lock:
+            entry = self.entries.get(self.cache_key(url))
+            if entry is None:
+                return None
+            entry = dict(entry)
+
+        entry['fresh'] = time.time() - entry['stored_at'] < self.ttl_seconds
+        return entry
+
+    def conditional_headers(self, entry: Dict) -> Dict[str, str]:
+        """Build revalidation headers from a (stale) cache entry"""
+        headers = {}
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def read_text(self, url: str) -> Optional[str]:
+        """
+        Read the extracted text cached for a URL
+
+        Returns:
+            Extracted text ('' when extraction found nothing), or None on a miss
+        """
+        with self._lock:
+            key = self.cache_key(url)
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            entry['accessed_at'] = time.time()
+            digest = entry['digest']
+
+        try:
+            with open(self._blob_path(digest, '.txt'), 'r', encoding='utf-8') as f:
+                return f.read()
+        except OSError:
+            # Blob evicted or removed behind our back
+            with self._lock:
+                self.entries.pop(key, None)
+            return None
+
+    def read_html(self, url: str) -> Optional[str]:
+        """Read the raw HTML cached for a URL, or None on a miss"""
+        entry = self.lookup(url)
+        if entry is None:
+            return None
+
+        try:
+            with gzip.open(self._blob_path(entry['digest'], '.html.gz'), 'rt', encoding='utf-8') as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def store(self, url: str, html: str, text: str, etag: Optional[str] = None,
+              last_modified: Optional[str] = None):
+        """
+        Cache a downloaded page and its extracted text
+
+        Args:
+            url: Article URL
+            html: Raw page HTML
+            text: Extracted text ('' if extraction found nothing)
+            etag: ETag response header, if any
+            last_modified: Last-Modified response header, if any
+        """
+        try:
+            body = html.encode('utf-8')
+            digest = hashlib.sha256(body).hexdigest()
+            html_path = self._blob_path(digest, '.html.gz')
+            text_path = self._blob_path(digest, '.txt')
+
+            if not os.path.exists(html_path):
+                self._write_blob(html_path, gzip.compress(body))
+            self._write_blob(text_path, (text or '').encode('utf-8'))
+
+            now = time.time()
+            with self._lock:
+                self.entries[self.cache_key(url)] = {
+                    'digest': digest,
+                    'etag': etag,
+                    'last_modified': last_modified,
+                    'size': os.path.getsize(html_path) + os.path.getsize(text_path),
+                    'stored_at': now,
+                    'accessed_at': now
+                }
+        except Exception as e:
+            logger.debug(f"Failed to cache article page {url}: {e}")
+
+    def refresh(self, url: str, etag: Optional[str] = None, last_modified: Optional[str] = None):
+        """Mark a revalidated (304) entry as fresh again"""
+        with self._lock:
+            entry = self.entries.get(self.cache_key(url))
+            if entry is None:
+                return
+            if etag:
+                entry['etag'] = etag
+            if last_modified:
+                entry['last_modified'] = last_modified
+            entry['stored_at'] = entry['accessed_at'] = time.time()
+
+    def evict(self):
+        """Drop entries past their TTL, then least recently used ones until under the size cap"""
+        with self._lock:
+            now = time.time()
+            for key in [key for key, entry in self.entries.items()
+                        if now - entry['stored_at'] >= self.ttl_seconds]:
+                del self.entries[key]
+
+            references: Dict[str, int] = {}
+            sizes: Dict[str, int] = {}
+            for entry in self.entries.values():
+                references[entry['digest']] = references.get(entry['digest'], 0) + 1
+                sizes[entry['digest']] = entry['size']
+
+            total = sum(sizes.values())
+            if total > self.max_bytes:
+                for key, entry in sorted(self.entries.items(), key=lambda item: item[1]['accessed_at']):
+                    if total <= self.max_bytes:
+                        break
+                    del self.entries[key]
+                    references[entry['digest']] -= 1
+                    if not references[entry['digest']]:
+                        total -= sizes[entry['digest']]
+
+            live_digests = {entry['digest'] for entry in self.entries.values()}
+
+        removed = 0
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                # Leave the index and any blob still being written alone
+                if name.endswith('.tmp') or os.path.join(root, name) == self.index_file:
+                    continue
+                if name.split('.', 1)[0] not in live_digests:
+                    try:
+                        os.remove(os.path.join(root, name))
+                        removed += 1
+                    except OSError:
+                        pass
+
+        if removed:
+            logger.info(f"Evicted {removed} files from the article cache")
+
+    def clear(self):
+        """Remove every cached page (for testing/maintenance)"""
+        with self._lock:
+            self.entries.clear()
+        self.evict()
+        if os.path.exists(self.index_file):
+            os.remove(self.index_file)
+        logger.info("Article cache cleared")
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Memory and lookup benchmark for ArticleDeduplicator history modes
+Compares plain string sets with metadata dicts against the compact digest tables and the memory-mapped digest file at a large history size
+
+Usage:
+    python benchmarks/bench_dedup_memory.py [--entries 1000000] [--lookups 100000]
+
+Both modes load the same synthetic plain snapshot (spread over 90 day
+buckets); memory is what the loaded deduplicator retains, as seen by
+tracemalloc. Compact mode is also timed loading its own snapshot. The
+digest file is migrated from the snapshot once, then timed opening it;
+its pages live in the OS page cache, which tracemalloc does not see.
+"""
+
+import argparse
+import gc
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import compact_history
+from deduplicator import ArticleDeduplicator, generate_content_hash
+
+WORDS = ("meeting planners venue hotel convention attendees hybrid event budget destination "
+         "incentive sponsor keynote registration catering exhibitors breakout ballroom").split()
+
+def build_articles(count: int, seed: int = 42) -> list:
+    """Synthetic articles with realistic URL, title and source lengths"""
+    rng = random.Random(seed)
+    sources = [f"https://www.{rng.choice(WORDS)}{n}news.com" for n in range(200)]
+    articles = []
+    for i in range(count):
+        source = sources[i % len(sources)]
+        slug = '-'.join(rng.choice(WORDS) for _ in range(6))
+        title = ' '.join(rng.choice(WORDS) for _ in range(8)).capitalize()
+        articles.append({
+            'link': f"{source}/2024/{i % 12 + 1:02d}/{slug}-{i}",
+            'title': title,
+            'summary': f"{title} summary {i}",
+            'source': source
+        })
+    return articles
+
+def write_snapshot(path: str, articles: list):
+    """Write a day-bucketed plain snapshot, as ArticleDeduplicator saves it"""
+    today = datetime.now()
+    buckets = {}
+    metadata = {}
+    for i, article in enumerate(articles):
+        processed_at = (today - timedelta(days=i % 90)).isoformat()
+        bucket = buckets.setdefault(processed_at[:10], {'urls': [], 'hashes': []})
+        bucket['urls'].append(article['link'])
+        bucket['hashes'].append(generate_content_hash(article))
+        metadata[article['link']] = {
+            'title': article['title'],
+            'processed_at': processed_at,
+            'source': article['source']
+        }
+
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'buckets': buckets, 'article_metadata': metadata}, f, separators=(',', ':'))
+
+def retained_bytes(path: str, **options) -> int:
+    """Memory a loaded deduplicator keeps, measured in its own pass since tracemalloc slows loading"""
+    gc.collect()
+    tracemalloc.start()
+    dedup = ArticleDeduplicator(path, **options)
+    gc.collect()
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del dedup
+    return retained
+
+def time_lookups(dedup: ArticleDeduplicator, probes: list) -> float:
+    """Microseconds per is_duplicate call"""
+    start = time.perf_counter()
+    for article in probes:
+        dedup.is_duplicate(article)
+    return (time.perf_counter() - start) / len(probes) * 1e6
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--entries', type=int, default=1_000_000, help='Articles in the history')
+    parser.add_argument('--lookups', type=int, default=100_000, help='is_duplicate calls per mode (half hits)')
+    args = parser.parse_args()
+
+    if compact_history.np is None:
+        sys.exit("Compact mode needs NumPy")
+
+    articles = build_articles(args.entries)
+    misses = build_articles(args.lookups // 2, seed=7)
+    for article in misses:
+        article['link'] += '-new'
+    probes = random.Random(1).sample(articles, args.lookups - len(misses)) + misses
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'history.json')
+        write_snapshot(path, articles)
+        # Migrate into the digest file now, before compact mode rewrites the snapshot
+        digest_path = os.path.join(directory, 'history.bin')
+        ArticleDeduplicator(path, digest_file=digest_path).store.close()
+        print(f"{args.entries} articles, snapshot {os.path.getsize(path) / 1024 / 1024:.0f}MB, "
+              f"{args.lookups} lookups\n")
+        print(f"{'mode':<8} {'load (s)':>9} {'memory MB':>10} {'bytes/article':>14} {'lookup (us)':>12}")
+
+        for compact in (False, True):
+            retained = retained_bytes(path, compact=compact)
+            gc.collect()
+            start = time.perf_counter()
+            dedup = ArticleDeduplicator(path, compact=compact)
+            load_seconds = time.perf_counter() - start
+            lookup_us = time_lookups(dedup, probes)
+            print(f"{'compact' if compact else 'plain':<8} {load_seconds:>9.2f} {retained / 1024 / 1024:>10.1f} "
+                  f"{retained / args.entries:>14.0f} {lookup_us:>12.2f}")
+
+            if compact:
+                # Whole-batch membership without per-key Python calls
+                digests = compact_history.np.array(
+                    [compact_history.key_digest(article['link']) for article in probes], dtype='uint64'
+                )
+                start = time.perf_counter()
+                dedup.processed_urls.contains_many(digests)
+                batch_us = (time.perf_counter() - start) / len(probes) * 1e6
+                print(f"{'':<8} vectorized URL membership: {batch_us:.3f}us per key")
+
+                # Later startups read the compact snapshot instead of converting strings
+                dedup.save_history()
+                start = time.perf_counter()
+                ArticleDeduplicator(path, compact=True)
+                print(f"{'':<8} load from compact snapshot ({os.path.getsize(path) / 1024 / 1024:.0f}MB): "
+                      f"{time.perf_counter() - start:.2f}s")
+            del dedup
+        
+        retained = retained_bytes(path, digest_file=digest_path)
+        gc.collect()
+        start = time.perf_counter()
+        dedup = ArticleDeduplicator(path, digest_file=digest_path)
+        load_seconds = time.perf_counter() - start
+        lookup_us = time_lookups(dedup, probes)
+        print(f"{'mmap':<8} {load_seconds:>9.4f} {retained / 1024 / 1024:>10.1f} "
+              f"{retained / args.entries:>14.0f} {lookup_us:>12.2f}")
+        print(f"{'':<8} digest file {os.path.getsize(digest_path) / 1024 / 1024:.0f}MB, shared through the page cache")
+        dedup.store.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark for RSS summary HTML-to-text backends
+Compares the fast tokenizer (and lxml, if installed) against the original BeautifulSoup path
+
+Usage:
+    python benchmarks/bench_html_text.py [--entries 2000] [--repeat 5]
+"""
+
+import argparse
+import os
+import random
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from html_text import BACKENDS, html_to_text
+
+def build_samples(count: int, seed: int = 42) -> list:
+    """Build a mix of plain, simple-markup and HTML-heavy feed summaries"""
+    rng = random.Random(seed)
+    words = ("meeting planners venue hotel convention attendees hybrid event budget "
+             "destination incentive sponsor keynote registration catering").split()
+
+    def sentence(length: int) -> str:
+        return ' '.join(rng.choice(words) for _ in range(length)).capitalize() + '.'
+
+    samples = []
+    for i in range(count):
+        kind = i % 3
+        if kind == 0:
+            samples.append(f"{sentence(25)}  {sentence(15)}")
+        elif kind == 1:
+            samples.append(f"<p>{sentence(20)} &amp; <a href=\"https://example.com/{i}\">{sentence(4)}</a></p>")
+        else:
+            paragraphs = ''.join(
+                f"<p class=\"body\"><strong>{sentence(3)}</strong> {sentence(30)}&nbsp;&#8212; "
+                f"<em>{sentence(5)}</em></p>\n"
+                for _ in range(rng.randint(3, 8))
+            )
+            samples.append(
+                f"<div><img src=\"https://example.com/{i}.jpg\" alt=\"\"/>{paragraphs}"
+                f"<script>var tracker = '<p>ignored</p>';</script>"
+                f"<style>p {{ color: red; }}</style>"
+                f"<p>The post <a href=\"https://example.com\">{sentence(4)}</a> appeared first.</p></div>"
+            )
+    return samples
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--entries', type=int, default=2000, help='Number of summaries per run')
+    parser.add_argument('--repeat', type=int, default=5, help='Timing repetitions (best is reported)')
+    args = parser.parse_args()
+
+    samples = build_samples(args.entries)
+    reference = [html_to_text(sample, 'bs4') for sample in samples]
+
+    print(f"{args.entries} summaries, best of {args.repeat} runs\n")
+    print(f"{'backend':<8} {'total (ms)':>11} {'per entry (us)':>15} {'speedup':>8}  output")
+
+    baseline = None
+    # Time the BeautifulSoup reference first so the others can be compared to it
+    for name in ['bs4'] + [backend for backend in BACKENDS if backend != 'bs4']:
+        try:
+            BACKENDS[name](samples[-1])
+        except ImportError:
+            print(f"{name:<8} {'-':>11} {'-':>15} {'-':>8}  not installed")
+            continue
+
+        best = min(timeit.repeat(
+            lambda: [html_to_text(sample, name) for sample in samples],
+            repeat=args.repeat, number=1
+        ))
+        if baseline is None:
+            baseline = best
+        mismatches = sum(
+            1 for sample, expected in zip(samples, reference)
+            if html_to_text(sample, name) != expected
+        )
+        output = 'identical' if not mismatches else f"{mismatches} differ"
+        speedup = f"{baseline / best:.1f}x"
+        print(f"{name:<8} {best * 1000:>11.1f} {best / len(samples) * 1e6:>15.1f} {speedup:>8}  {output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Scraper throughput benchmark against the local fixture server
+Measures fetch_articles wall time, requests per second and peak Python memory as the feed count grows
+
+Usage:
+    python benchmarks/bench_scraper.py [--feeds 5,25,100,250,1000] [--max-per-feed 5] [--latency-ms 50]
+
+All fixture feeds share one host, so the per-host limits the scraper uses for
+real publishers are raised to the global worker count; the benchmark measures
+the scraper itself rather than politeness throttling.
+"""
+
+import argparse
+import logging
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fixture_server import FixtureServer, add_fixture_arguments, settings_from_args
+from extraction import configure_extraction
+from http_client import configure_http_client
+from scraper import fetch_articles
+
+def run_once(server: FixtureServer, feed_count: int, args, trace_memory: bool):
+    """Scrape ``feed_count`` fixture feeds; returns (seconds, requests, articles, peak bytes)"""
+    urls = server.feed_urls(feed_count)
+    server.reset_counters()
+
+    if trace_memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    articles = fetch_articles(
+        urls,
+        max_per_feed=args.max_per_feed,
+        max_workers=args.workers,
+        per_host_limit=args.workers,
+        full_text_workers=args.full_text_workers,
+        full_text_timeout=600
+    )
+    elapsed = time.perf_counter() - start
+    peak = 0
+    if trace_memory:
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    return elapsed, server.requests, len(articles), peak
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--feeds', default='5,25,100,250,1000', help='Comma-separated feed counts')
+    parser.add_argument('--max-per-feed', type=int, default=5, help='Articles taken per feed')
+    parser.add_argument('--workers', type=int, default=8, help='Feed download workers')
+    parser.add_argument('--full-text-workers', type=int, default=4, help='Article page download workers')
+    parser.add_argument('--process-workers', type=int, default=0,
+                        help='Extraction processes (0 = extract in-process)')
+    parser.add_argument('--no-memory', action='store_true', help='Skip the tracemalloc pass')
+    add_fixture_arguments(parser)
+    args = parser.parse_args()
+
+    # Injected errors and bozo feeds would otherwise flood the table with log lines
+    logging.disable(logging.ERROR)
+    # The fixture server is local, so per-host rate limiting would only measure the limiter
+    configure_http_client({'rate_per_host': 0, 'pool_size': max(args.workers, args.full_text_workers)})
+    configure_extraction({'process_workers': args.process_workers})
+
+    settings = settings_from_args(args)
+    print(f"{settings.entries_per_feed} entries/feed, {args.max_per_feed} taken, "
+          f"{settings.latency_ms:.0f}ms latency, {settings.article_kb}KB pages, "
+          f"error rate {settings.error_rate}, bozo rate {settings.bozo_rate}\n")
+    print(f"{'feeds':>6} {'wall (s)':>9} {'requests':>9} {'req/s':>8} {'articles':>9} {'peak MB':>8}")
+
+    with FixtureServer(settings) as server:
+        for feed_count in [int(count) for count in args.feeds.split(',')]:
+            elapsed, requests, articles, _ = run_once(server, feed_count, args, trace_memory=False)
+            peak = '-'
+            if not args.no_memory:
+                # tracemalloc slows allocation-heavy code, so memory is measured in its own pass
+                peak = f"{run_once(server, feed_count, args, trace_memory=True)[3] / 1024 / 1024:.1f}"
+            print(f"{feed_count:>6} {elapsed:>9.2f} {requests:>9} {requests / elapsed:>8.1f} "
+                  f"{articles:>9} {peak:>8}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""
+Local fixture server for scraper benchmarks
+Serves deterministic synthetic RSS/Atom feeds and article pages with configurable latency, sizes and failures
+
+Usage:
+    python benchmarks/fixture_server.py [--port 8000] [--feeds 50] [--latency-ms 50] [--error-rate 0.05]
+
+Routes:
+    /feeds/<n>.xml        Feed n (even n: RSS 2.0, odd n: Atom)
+    /articles/<n>/<i>     Article page for entry i of feed n
+"""
+
+import argparse
+import hashlib
+import random
+import threading
+import time
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List, Tuple
+
+WORDS = ("meeting planners venue hotel convention attendees hybrid event budget destination "
+         "incentive sponsor keynote registration catering exhibitors breakout ballroom").split()
+
+@dataclass
+class FixtureSettings:
+    """Shape of the synthetic feeds and how the server misbehaves"""
+    entries_per_feed: int = 20
+    summary_words: int = 60
+    short_summary_rate: float = 0.3   # share of entries whose summary is too short, forcing a full-text fetch
+    article_kb: int = 40
+    latency_ms: float = 50
+    jitter_ms: float = 20
+    error_rate: float = 0.0           # share of feeds answering 500
+    bozo_rate: float = 0.0            # share of feeds with malformed XML
+    seed: int = 42
+
+class FixtureServer:
+    """Threaded HTTP server serving synthetic feeds; counts requests and bytes sent"""
+
+    def __init__(self, settings: FixtureSettings = None, host: str = '127.0.0.1', port: int = 0):
+        self.settings = settings or FixtureSettings()
+        self.requests = 0
+        self.bytes_sent = 0
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer((host, port), self._handler_class())
+        self._httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def feed_urls(self, count: int) -> List[str]:
+        """URLs of the first ``count`` feeds"""
+        return [f"{self.base_url}/feeds/{n}.xml" for n in range(count)]
+
+    def start(self) -> 'FixtureServer':
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def reset_counters(self):
+        with self._lock:
+            self.requests = 0
+            self.bytes_sent = 0
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    def _count(self, size: int):
+        with self._lock:
+            self.requests += 1
+            self.bytes_sent += size
+
+    def _rng(self, *key) -> random.Random:
+        # Every response is derived from the seed and its path, so runs are repeatable
+        digest = hashlib.sha256(repr((self.settings.seed,) + key).encode()).digest()
+        return random.Random(int.from_bytes(digest[:8], 'big'))
+
+    def _sentence(self, rng: random.Random, words: int) -> str:
+        return ' '.join(rng.choice(WORDS) for _ in range(words)).capitalize() + '.'
+
+    def render_feed(self, n: int) -> Tuple[int, str, bytes]:
+        """Build (status, content type, body) for feed n"""
+        settings = self.settings
+        rng = self._rng('feed', n)
+
+        if rng.random() < settings.error_rate:
+            return 500, 'text/plain', b'Internal Server Error'
+
+        atom = n % 2 == 1
+        items = []
+        for i in range(settings.entries_per_feed):
+            link = f"{self.base_url}/articles/{n}/{i}"
+            published = time.gmtime(1_700_000_000 - n * 3600 - i * 7200)
+            if rng.random() < settings.short_summary_rate:
+                summary = f"&lt;p&gt;{self._sentence(rng, 5)}&lt;/p&gt;"
+            else:
+                summary = (f"&lt;p&gt;{self._sentence(rng, settings.summary_words)} "
+                           f"&lt;b&gt;{self._sentence(rng, 4)}&lt;/b&gt;&lt;/p&gt;")
+            title = self._sentence(rng, 6)
+            if atom:
+                items.append(
+                    f"<entry><title>{title}</title><link href=\"{link}\"/><id>urn:fixture:{n}:{i}</id>"
+                    f"<updated>{time.strftime('%Y-%m-%dT%H:%M:%SZ', published)}</updated>"
+                    f"<summary type=\"html\">{summary}</summary></entry>"
+                )
+            else:
+                items.append(
+                    f"<item><title>{title}</title><link>{link}</link><guid>urn:fixture:{n}:{i}</guid>"
+                    f"<pubDate>{time.strftime('%a, %d %b %Y %H:%M:%S GMT', published)}</pubDate>"
+                    f"<description>{summary}</description></item>"
+                )
+
+        if atom:
+            body = (f"<?xml version=\"1.0\" encoding=\"utf-8\"?>"
+                    f"<feed xmlns=\"http://www.w3.org/2005/Atom\"><title>Fixture Feed {n}</title>"
+                    f"<id>urn:fixture:{n}</id>{''.join(items)}</feed>")
+            content_type = 'application/atom+xml'
+        else:
+            body = (f"<?xml version=\"1.0\" encoding=\"utf-8\"?><rss version=\"2.0\"><channel>"
+                    f"<title>Fixture Feed {n}</title><link>{self.base_url}</link>"
+                    f"{''.join(items)}</channel></rss>")
+            content_type = 'application/rss+xml'
+
+        if rng.random() < settings.bozo_rate:
+            # Unescaped ampersand plus a truncated document: feedparser flags it as bozo
+            body = body.replace('Fixture Feed', 'Fixture & Feed', 1)[:len(body) * 3 // 4]
+
+        return 200, content_type, body.encode('utf-8')
+
+    def render_article(self, n: int, i: int) -> Tuple[int, str, bytes]:
+        """Build (status, content type, body) for an article page"""
+        rng = self._rng('article', n, i)
+        paragraphs = []
+        size = 0
+        while size < self.settings.article_kb * 1024:
+            paragraph = f"<p>{self._sentence(rng, 40)}</p>\n"
+            paragraphs.append(paragraph)
+            size += len(paragraph)
+
+        body = (f"<!DOCTYPE html><html><head><title>Article {n}-{i}</title></head><body>"
+                f"<nav><a href=\"/\">Home</a></nav><article><h1>Article {n}-{i}</h1>"
+                f"{''.join(paragraphs)}</article><footer>Fixture footer</footer></body></html>")
+        return 200, 'text/html; charset=utf-8', body.encode('utf-8')
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, format, *args):
+                pass
+
+            def do_GET(self):
+                settings = server.settings
+                delay = settings.latency_ms + random.uniform(-settings.jitter_ms, settings.jitter_ms)
+                time.sleep(max(0, delay) / 1000)
+
+                parts = self.path.strip('/').split('/')
+                try:
+                    if len(parts) == 2 and parts[0] == 'feeds' and parts[1].endswith('.xml'):
+                        status, content_type, body = server.render_feed(int(parts[1][:-4]))
+                    elif len(parts) == 3 and parts[0] == 'articles':
+                        status, content_type, body = server.render_article(int(parts[1]), int(parts[2]))
+                    else:
+                        status, content_type, body = 404, 'text/plain', b'Not Found'
+                except ValueError:
+                    status, content_type, body = 404, 'text/plain', b'Not Found'
+
+                self.send_response(status)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+                server._count(len(body))
+
+        return Handler
+
+def settings_from_args(args) -> FixtureSettings:
+    """Build fixture settings from parsed command-line arguments"""
+    return FixtureSettings(
+        entries_per_feed=args.entries,
+        short_summary_rate=args.short_summary_rate,
+        article_kb=args.article_kb,
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        bozo_rate=args.bozo_rate,
+        seed=args.seed
+    )
+
+def add_fixture_arguments(parser: argparse.ArgumentParser):
+    """Register the fixture shape options shared by the server and the benchmarks"""
+    defaults = FixtureSettings()
+    parser.add_argument('--entries', type=int, default=defaults.entries_per_feed, help='Entries per feed')
+    parser.add_argument('--short-summary-rate', type=float, default=defaults.short_summary_rate,
+                        help='Share of entries needing a full-text fetch')
+    parser.add_argument('--article-kb', type=int, default=defaults.article_kb, help='Article page size in KB')
+    parser.add_argument('--latency-ms', type=float, default=defaults.latency_ms, help='Response latency')
+    parser.add_argument('--jitter-ms', type=float, default=defaults.jitter_ms, help='Latency jitter (+/-)')
+    parser.add_argument('--error-rate', type=float, default=defaults.error_rate, help='Share of feeds returning 500')
+    parser.add_argument('--bozo-rate', type=float, default=defaults.bozo_rate, help='Share of malformed feeds')
+    parser.add_argument('--seed', type=int, default=defaults.seed, help='Seed for the synthetic content')
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--port', type=int, default=8000, help='Port to listen on')
+    parser.add_argument('--feeds', type=int, default=50, help='Number of feed URLs to print')
+    add_fixture_arguments(parser)
+    args = parser.parse_args()
+
+    server = FixtureServer(settings_from_args(args), port=args.port).start()
+    print(f"Serving fixtures on {server.base_url}")
+    for url in server.feed_urls(args.feeds):
+        print(url)
+
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.stop()
+
+if __name__ == "__main__":
+    main()
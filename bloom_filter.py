@@ -0,0 +1,200 @@
+"""
+Scalable Bloom filter for dedup membership checks
+Answers "definitely new" without touching the database or the history sets; persisted as JSON
+"""
+
+import base64
+import hashlib
+import json
+import logging
+import math
+import os
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+def _hash_pair(key: str):
+    digest = hashlib.blake2b(key.encode('utf-8'), digest_size=16).digest()
+    # Odd step so probes cycle through every bit position
+    return int.from_bytes(digest[:8], 'big'), int.from_bytes(digest[8:], 'big') | 1
+
+def dedup_keys(normalized_url: str = None, content_hash: str = None) -> List[str]:
+    """Bloom filter keys for an article's normalized URL and content hash, namespaced apart"""
+    keys = []
+    if normalized_url:
+        keys.append(f"url:{normalized_url}")
+    if content_hash:
+        keys.append(f"hash:{content_hash}")
+    return keys
+
+class BloomFilter:
+    """Fixed-size Bloom filter sized for ``capacity`` keys at ``error_rate`` false positives"""
+
+    def __init__(self, capacity: int, error_rate: float, bits: bytearray = None, count: int = 0):
+        self.capacity = max(1, capacity)
+        self.error_rate = error_rate
+        self.num_bits = max(8, math.ceil(-self.capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.num_hashes = max(1, round(self.num_bits / self.capacity * math.log(2)))
+        self.bits = bits if bits is not None else bytearray((self.num_bits + 7) // 8)
+        self.count = count
+
+    def _positions(self, key: str):
+        first, step = _hash_pair(key)
+        return ((first + i * step) % self.num_bits for i in range(self.num_hashes))
+
+    def __contains__(self, key: str) -> bool:
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+    def add(self, key: str):
+        for position in self._positions(key):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    @property
+    def is_full(self) -> bool:
+        return self.count >= self.capacity
+
+    def to_dict(self) -> Dict:
+        return {
+            'capacity': self.capacity,
+            'error_rate': self.error_rate,
+            'count': self.count,
+            'bits': base64.b64encode(bytes(self.bits)).decode('ascii')
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'BloomFilter':
+        return cls(data['capacity'], data['error_rate'],
+                   bytearray(base64.b64decode(data['bits'])), data.get('count', 0))
+
+class ScalableBloomFilter:
+    """
+    Bloom filter that grows with the history while keeping its false-positive bound
+
+    When the current filter reaches its capacity a new one, ``growth`` times
+    larger and with a ``tightening`` times lower error rate, is added; a key
+    is present if any filter contains it. The first filter gets
+    ``error_rate * (1 - tightening)`` so the compounded false-positive rate
+    stays under ``error_rate`` however many filters are added.
+
+    Keys are never removed: articles expiring from the history stay
+    "maybe seen", which only costs the exact check a false positive would.
+    """
+
+    def __init__(self, filter_file: str = "data/dedup_bloom.json", error_rate: float = 0.001,
+                 initial_capacity: int = 10000, growth: int = 2, tightening: float = 0.5):
+        """
+        Args:
+            filter_file: JSON file the filter is persisted to
+            error_rate: Target false-positive rate across all filters
+            initial_capacity: Keys the first filter holds before a larger one is added
+            growth: Capacity multiplier for each added filter
+            tightening: Error-rate multiplier for each added filter
+        """
+        self.filter_file = filter_file
+        self.error_rate = error_rate
+        self.initial_capacity = initial_capacity
+        self.growth = growth
+        self.tightening = tightening
+        self.filters: List[BloomFilter] = []
+        self.last_article_id = 0
+        # Rows with an id at or below the watermark when they were absorbed (None if unknown)
+        self.article_count: Optional[int] = 0
+        self.dirty = False
+
+        # Ensure data directory exists
+        os.makedirs(os.path.dirname(filter_file), exist_ok=True)
+
+        # Load existing filter
+        self.load()
+
+    @classmethod
+    def from_config(cls, settings: Dict) -> 'ScalableBloomFilter':
+        """Create a filter from the "bloom_filter" section of config.json"""
+        return cls(
+            settings.get('filter_file', 'data/dedup_bloom.json'),
+            error_rate=settings.get('error_rate', 0.001),
+            initial_capacity=settings.get('initial_capacity', 10000)
+        )
+
+    def load(self):
+        """Load the filters and the article-id watermark from the JSON file"""
+        try:
+            if os.path.exists(self.filter_file):
+                with open(self.filter_file, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+
+                if data.get('error_rate') != self.error_rate:
+                    logger.warning("Bloom filter was built for another error rate, rebuilding")
+                    return
+
+                self.filters = [BloomFilter.from_dict(item) for item in data.get('filters', [])]
+                self.last_article_id = data.get('last_article_id', 0)
+                self.article_count = data.get('article_count', None if self.last_article_id else 0)
+                logger.info(f"Loaded Bloom filter with {len(self)} keys")
+            else:
+                logger.info("No existing Bloom filter found, starting fresh")
+        except Exception as e:
+            logger.error(f"Failed to load Bloom filter: {e}")
+            self.filters = []
+            self.last_article_id = 0
+            self.article_count = 0
+
+    def save(self):
+        """Save the filters to the JSON file if anything was added"""
+        if not self.dirty:
+            return
+        try:
+            data = {
+                'error_rate': self.error_rate,
+                'last_article_id': self.last_article_id,
+                'article_count': self.article_count,
+                'filters': [bloom.to_dict() for bloom in self.filters],
+                'last_updated': datetime.now().isoformat()
+            }
+
+            temp_file = f"{self.filter_file}.tmp"
+            with open(temp_file, 'w', encoding='utf-8') as f:
+                json.dump(data, f)
+            os.replace(temp_file, self.filter_file)
+
+            self.dirty = False
+            logger.debug("Bloom filter saved")
+        except Exception as e:
+            logger.error(f"Failed to save Bloom filter: {e}")
+
+    def clear(self):
+        """Forget every key and the watermark; saved on the next save()"""
+        self.filters = []
+        self.last_article_id = 0
+        self.article_count = 0
+        self.dirty = True
+
+    def __len__(self) -> int:
+        return sum(bloom.count for bloom in self.filters)
+
+    def __contains__(self, key: str) -> bool:
+        return bool(key) and any(key in bloom for bloom in self.filters)
+
+    def add(self, key: str):
+        """Add a key, starting a larger filter when the current one is full"""
+        if not key or key in self:
+            return
+
+        if not self.filters or self.filters[-1].is_full:
+            level = len(self.filters)
+            self.filters.append(BloomFilter(
+                self.initial_capacity * self.growth ** level,
+                self.error_rate * (1 - self.tightening) * self.tightening ** level
+            ))
+        self.filters[-1].add(key)
+        self.dirty = True
+
+    def update(self, keys: Iterable[str]):
+        for key in keys:
+            self.add(key)
+
+    def might_contain_any(self, keys: Iterable[str]) -> bool:
+        """False only if every key is definitely absent"""
+        return any(key in self for key in keys)
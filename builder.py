@@ -104,6 +104,10 @@ def build_markdown_newsletter(newsletter_data: Dict[str, Any], config: Dict[str,
                     md_content.append(story['summary'])
                 if 'link' in story:
                     md_content.append(f"\n[Read More]({story['link']})")
+                if story.get('also_covered_by'):
+                    links = ', '.join(f"[{covered_by_label(other)}]({other.get('link', '')})"
+                                      for other in story['also_covered_by'])
+                    md_content.append(f"\n*Also covered by:* {links}")
             else:
                 # Handle string summaries
                 md_content.append(str(story))
@@ -170,6 +174,10 @@ def build_text_newsletter(newsletter_data: Dict[str, Any], config: Dict[str, Any
                     text_content.append(f"Summary: {clean_summary}")
                 if 'link' in story:
                     text_content.append(f"Read More: {story['link']}")
+                if story.get('also_covered_by'):
+                    text_content.append("Also covered by:")
+                    for other in story['also_covered_by']:
+                        text_content.append(f"  {covered_by_label(other)}: {other.get('link', '')}")
             else:
                 # Handle string summaries
                 clean_summary = clean_text_for_email(str(story))
@@ -203,6 +211,10 @@ def build_text_newsletter(newsletter_data: Dict[str, Any], config: Dict[str, Any
         logger.error(f"Failed to build plain text newsletter: {e}")
         return None
 
+def covered_by_label(article: Dict[str, Any]) -> str:
+    """Name shown for an article listed under Also covered by"""
+    return article.get('source') or article.get('title', 'Link')
+
 def clean_text_for_email(text: str) -> str:
     """Remove markdown formatting for plain text email"""
     import re
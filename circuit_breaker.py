@@ -0,0 +1,125 @@
+"""
+Per-source circuit breaker for RSS feeds
+Stops fetching feeds that keep failing and probes them again after a cooldown
+"""
+
+import logging
+from datetime import datetime, timedelta
+from typing import Dict
+
+logger = logging.getLogger(__name__)
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+class CircuitBreaker:
+    """
+    Decides whether a source may be fetched from its persisted circuit state
+
+    A closed circuit fetches normally. After ``failure_threshold`` consecutive
+    errors or empty feeds the circuit opens and the source is skipped. Once
+    ``cooldown_minutes`` have passed a single half-open probe is allowed: a
+    good fetch closes the circuit, a failed one re-opens it for another
+    cooldown.
+    """
+
+    def __init__(self, failure_threshold: int = 3, cooldown_minutes: int = 720):
+        """
+        Args:
+            failure_threshold: Consecutive failures that open the circuit
+            cooldown_minutes: Time an open circuit waits before a half-open probe
+        """
+        self.failure_threshold = failure_threshold
+        self.cooldown = timedelta(minutes=cooldown_minutes)
+
+    @classmethod
+    def from_config(cls, settings: Dict) -> 'CircuitBreaker':
+        """Create a circuit breaker from the "circuit_breaker" section of config.json"""
+        return cls(
+            failure_threshold=settings.get('failure_threshold', 3),
+            cooldown_minutes=settings.get('cooldown_minutes', 720)
+        )
+
+    @staticmethod
+    def state_of(source) -> str:
+        """Persisted circuit state of an RSSSource, treating unset as closed"""
+        return (source.circuit_state if source else None) or CLOSED
+
+    def current_state(self, source, now: datetime = None) -> str:
+        """Circuit state as of now: an open circuit past its cooldown is half-open"""
+        state = self.state_of(source)
+        if state == OPEN and self.allow_request(source, now):
+            return HALF_OPEN
+        return state
+
+    def allow_request(self, source, now: datetime = None) -> bool:
+        """
+        Check whether a source may be fetched
+
+        Args:
+            source: RSSSource row, or None for sources not in the database
+            now: Current UTC time
+
+        Returns:
+            True if the circuit is closed or due for a half-open probe
+        """
+        if self.state_of(source) == CLOSED:
+            return True
+
+        now = now or datetime.utcnow()
+        opened_at = source.circuit_opened_at
+        return opened_at is None or now - opened_at >= self.cooldown
+
+    def filter_urls(self, urls, sources_by_url: Dict, now: datetime = None) -> list:
+        """
+        Drop feed URLs whose circuit is open
+
+        Returns:
+            Allowed URLs in their original order
+        """
+        now = now or datetime.utcnow()
+        allowed = []
+        for url in urls:
+            source = sources_by_url.get(url)
+            if self.allow_request(source, now):
+                if self.current_state(source, now) == HALF_OPEN:
+                    logger.info(f"Probing {url} (circuit half-open)")
+                allowed.append(url)
+            else:
+                logger.info(f"Skipping {url} (circuit open since {source.circuit_opened_at})")
+        return allowed
+
+    def record_result(self, source, status: str, consecutive_failures: int,
+                      now: datetime = None) -> Dict:
+        """
+        Work out the circuit state after a fetch
+
+        Args:
+            source: RSSSource row, or None for sources not in the database
+            status: Feed result status from the scraper
+            consecutive_failures: Failure count including this fetch
+            now: Current UTC time
+
+        Returns:
+            Dictionary with circuit_state and, when the circuit (re)opens, circuit_opened_at
+        """
+        now = now or datetime.utcnow()
+        previous = self.state_of(source)
+
+        if status == 'timeout':
+            # The scrape budget ran out before this source finished; leave the circuit alone
+            return {'circuit_state': previous}
+
+        if status not in ('error', 'empty'):
+            if previous != CLOSED:
+                logger.info(f"Closing circuit for {source.url} after a successful probe")
+            return {'circuit_state': CLOSED}
+
+        if previous != CLOSED or consecutive_failures >= self.failure_threshold:
+            if previous == CLOSED:
+                url = source.url if source else 'source'
+                logger.warning(f"Opening circuit for {url} after {consecutive_failures} consecutive failures")
+            return {'circuit_state': OPEN, 'circuit_opened_at': now}
+
+        return {'circuit_state': CLOSED}
@@ -0,0 +1,271 @@
+"""
+Compact in-memory dedup history backed by NumPy
+Stores 8-byte digests of URLs and content hashes in open-addressing tables with column-array metadata
+"""
+
+import base64
+import hashlib
+import logging
+from datetime import date
+from typing import Dict, Iterable, List, Optional
+
+try:
+    import numpy as np
+except ImportError:  # Compact mode needs NumPy; ArticleDeduplicator falls back to plain sets
+    np = None
+
+logger = logging.getLogger(__name__)
+
+# Slots are kept at most half full, so probe sequences stay short
+MAX_LOAD_FACTOR = 0.5
+MIN_CAPACITY = 1024
+
+def key_digest(key: str) -> int:
+    """
+    64-bit digest of a URL or content hash
+
+    Zero marks an empty slot, so it is remapped to one. At a million keys
+    the chance of any two colliding is about 3 in 100 million.
+    """
+    digest = int.from_bytes(hashlib.blake2b(key.encode('utf-8'), digest_size=8).digest(), 'little')
+    return digest or 1
+
+def day_number(day) -> int:
+    """Days since 1970-01-01 for a date or an ISO date/datetime string"""
+    if isinstance(day, str):
+        day = date.fromisoformat(day[:10])
+    return day.toordinal() - date(1970, 1, 1).toordinal()
+
+class DigestTable:
+    """
+    Open-addressing hash table of 64-bit digests with per-entry metadata columns
+
+    Keys, days and source ids live in three parallel NumPy arrays: 12 bytes
+    per slot, so about 25 bytes per entry at the maximum load factor,
+    instead of a Python string, a set entry and a metadata dict. Membership
+    accepts either a digest or the original string.
+    """
+
+    def __init__(self, capacity: int = MIN_CAPACITY):
+        size = MIN_CAPACITY
+        while size * MAX_LOAD_FACTOR < capacity:
+            size *= 2
+        self.keys = np.zeros(size, dtype=np.uint64)
+        self.days = np.zeros(size, dtype=np.uint16)
+        self.sources = np.zeros(size, dtype=np.uint16)
+        self.count = 0
+        self.expired_on_load = 0
+
+    @property
+    def nbytes(self) -> int:
+        return self.keys.nbytes + self.days.nbytes + self.sources.nbytes
+
+    def __len__(self) -> int:
+        return self.count
+
+    def _find(self, digest: int) -> int:
+        """Slot holding ``digest``, or the empty slot where it would go"""
+        mask = len(self.keys) - 1
+        keys = self.keys
+        slot = digest & mask
+        while True:
+            key = int(keys[slot])
+            if key == 0 or key == digest:
+                return slot
+            slot = (slot + 1) & mask
+
+    def __contains__(self, key) -> bool:
+        digest = key_digest(key) if isinstance(key, str) else key
+        return int(self.keys[self._find(digest)]) == digest
+
+    def add(self, key, day: int = 0, source: int = 0):
+        """Insert a key or update its day and source"""
+        digest = key_digest(key) if isinstance(key, str) else key
+        slot = self._find(digest)
+        if int(self.keys[slot]) != digest:
+            if (self.count + 1) > len(self.keys) * MAX_LOAD_FACTOR:
+                self._rebuild(self.count * 2)
+                slot = self._find(digest)
+            self.keys[slot] = digest
+            self.count += 1
+        self.days[slot] = day
+        self.sources[slot] = source
+
+    def contains_many(self, digests) -> 'np.ndarray':
+        """Vectorized membership test for an array of digests"""
+        digests = np.asarray(digests, dtype=np.uint64)
+        mask = np.uint64(len(self.keys) - 1)
+        slots = digests & mask
+        found = np.zeros(len(digests), dtype=bool)
+        pending = np.arange(len(digests))
+        while len(pending):
+            keys = self.keys[slots[pending]]
+            found[pending[keys == digests[pending]]] = True
+            # Keep probing only past occupied slots holding other keys
+            pending = pending[(keys != 0) & (keys != digests[pending])]
+            slots[pending] = (slots[pending] + np.uint64(1)) & mask
+        return found
+
+    def entries(self):
+        """(digests, days, sources) arrays of the occupied slots"""
+        occupied = self.keys != 0
+        return self.keys[occupied], self.days[occupied], self.sources[occupied]
+
+    def _rebuild(self, capacity: int):
+        digests, days, sources = self.entries()
+        self.__init__(capacity)
+        self.bulk_load(digests, days, sources)
+
+    def bulk_load(self, digests, days, sources):
+        """
+        Insert many distinct digests, none already in the table, at once
+
+        Each round places, for every free slot being probed, one of the keys
+        probing it; the rest move on to the next slot.
+        """
+        digests = np.asarray(digests, dtype=np.uint64)
+        if not len(digests):
+            return
+        if self.count + len(digests) > len(self.keys) * MAX_LOAD_FACTOR:
+            existing = self.entries()
+            # At least double, so repeated bulk loads do not rebuild every time
+            self.__init__(max(self.count + len(digests), len(self.keys)))
+            if len(existing[0]):
+                self.bulk_load(*existing)
+
+        days = np.asarray(days, dtype=np.uint16)
+        sources = np.asarray(sources, dtype=np.uint16)
+        mask = np.uint64(len(self.keys) - 1)
+        slots = digests & mask
+        pending = np.arange(len(digests))
+        while len(pending):
+            free = np.nonzero(self.keys[slots[pending]] == 0)[0]
+            _, first = np.unique(slots[pending[free]], return_index=True)
+            placed = pending[free[first]]
+            self.keys[slots[placed]] = digests[placed]
+            self.days[slots[placed]] = days[placed]
+            self.sources[slots[placed]] = sources[placed]
+            self.count += len(placed)
+
+            unplaced = np.ones(len(pending), dtype=bool)
+            unplaced[free[first]] = False
+            pending = pending[unplaced]
+            # Every remaining key now sees an occupied slot and moves on
+            slots[pending] = (slots[pending] + np.uint64(1)) & mask
+
+    def drop_before(self, cutoff_day: int) -> int:
+        """Remove entries whose day is before ``cutoff_day``; returns how many"""
+        digests, days, sources = self.entries()
+        keep = days >= cutoff_day
+        removed = int(len(digests) - keep.sum())
+        if removed:
+            self.__init__(int(keep.sum()))
+            self.bulk_load(digests[keep], days[keep], sources[keep])
+        return removed
+
+    def to_dict(self) -> Dict:
+        digests, days, sources = self.entries()
+        return {
+            'digests': base64.b64encode(digests.astype('<u8').tobytes()).decode('ascii'),
+            'days': base64.b64encode(days.astype('<u2').tobytes()).decode('ascii'),
+            'sources': base64.b64encode(sources.astype('<u2').tobytes()).decode('ascii')
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict, cutoff_day: Optional[int] = None) -> 'DigestTable':
+        digests = np.frombuffer(base64.b64decode(data['digests']), dtype='<u8')
+        days = np.frombuffer(base64.b64decode(data['days']), dtype='<u2')
+        sources = np.frombuffer(base64.b64decode(data['sources']), dtype='<u2')
+        stored = len(digests)
+        if cutoff_day is not None:
+            keep = days >= cutoff_day
+            digests, days, sources = digests[keep], days[keep], sources[keep]
+        table = cls(len(digests))
+        table.bulk_load(digests, days, sources)
+        table.expired_on_load = stored - len(digests)
+        return table
+
+class CompactHistory:
+    """
+    Dedup history holding only digests: one table for URLs, one for content hashes
+
+    Source names are interned into a small list and referenced by index.
+    Titles and full timestamps are not kept; each entry remembers the day
+    it was marked, which is all retention needs, and URLs and hashes of the
+    same article carry the same day so they expire together.
+    """
+
+    def __init__(self):
+        self.urls = DigestTable()
+        self.hashes = DigestTable()
+        self.source_names: List[str] = ['']
+        self._source_ids = {'': 0}
+
+    def source_id(self, source: str) -> int:
+        source = source or ''
+        if source not in self._source_ids:
+            if len(self.source_names) > np.iinfo(np.uint16).max:
+                return 0
+            self._source_ids[source] = len(self.source_names)
+            self.source_names.append(source)
+        return self._source_ids[source]
+
+    def add(self, url: Optional[str], content_hash: Optional[str], day: int, source: str = ''):
+        source = self.source_id(source)
+        if url:
+            self.urls.add(url, day, source)
+        if content_hash:
+            self.hashes.add(content_hash, day, source)
+
+    def load_buckets(self, buckets: Dict[str, Dict[str, Iterable[str]]]):
+        """
+        Load string day buckets (from a plain snapshot) into the tables
+
+        Sources are not recorded in plain buckets; a key found in several
+        buckets keeps its newest day.
+        """
+        for table, kind in ((self.urls, 'urls'), (self.hashes, 'hashes')):
+            digests = []
+            days = []
+            for day, bucket in sorted(buckets.items(), reverse=True):
+                keys = bucket[kind]
+                digests.extend(key_digest(key) for key in keys)
+                days.extend([day_number(day)] * len(keys))
+
+            digests = np.array(digests, dtype=np.uint64)
+            days = np.array(days, dtype=np.uint16)
+            # Newest buckets come first, so unique() keeps each key's newest day
+            digests, first = np.unique(digests, return_index=True)
+            days = days[first]
+            new = ~table.contains_many(digests)
+            table.bulk_load(digests[new], days[new], np.zeros(int(new.sum()), dtype=np.uint16))
+
+    def drop_before(self, cutoff_day: int):
+        """Forget URLs and hashes last marked before ``cutoff_day``; returns (urls, hashes) removed"""
+        return self.urls.drop_before(cutoff_day), self.hashes.drop_before(cutoff_day)
+
+    @property
+    def nbytes(self) -> int:
+        return self.urls.nbytes + self.hashes.nbytes
+
+    def to_dict(self) -> Dict:
+        return {
+            'format': 'compact',
+            'sources': self.source_names,
+            'urls': self.urls.to_dict(),
+            'hashes': self.hashes.to_dict()
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict, cutoff_day: Optional[int] = None) -> 'CompactHistory':
+        history = cls()
+        history.source_names = data.get('sources') or ['']
+        history._source_ids = {name: index for index, name in enumerate(history.source_names)}
+        history.urls = DigestTable.from_dict(data['urls'], cutoff_day)
+        history.hashes = DigestTable.from_dict(data['hashes'], cutoff_day)
+        return history
+
+    @property
+    def expired_on_load(self) -> int:
+        """Entries skipped by from_dict because they were older than the cutoff"""
+        return self.urls.expired_on_load + self.hashes.expired_on_load
@@ -6,15 +6,22 @@ Provides database-backed versions of existing JSON-based functionality
 import logging
 from datetime import datetime
 from typing import List, Dict, Optional
-from sqlalchemy import desc, func
+from sqlalchemy import desc, func, or_
 from models import (
-    get_session, Article, Newsletter, NewsletterArticle, Sponsor,
+    get_session, set_simhash, Article, Newsletter, NewsletterArticle, Sponsor,
     SponsorRotation, RSSSource
 )
 from contextlib import contextmanager
+from bloom_filter import ScalableBloomFilter, dedup_keys
+from digest_file import SortedDigestFile
+from deduplicator import normalize_url, generate_content_hash
+from simhash import MAX_BLOCK_DISTANCE, article_simhash, closest_matches, simhash_blocks
 
 logger = logging.getLogger(__name__)
 
+# Keeps IN (...) lists well under database parameter limits
+IN_QUERY_CHUNK_SIZE = 500
+
 @contextmanager
 def get_db_session():
     """Context manager for database sessions"""
@@ -24,11 +31,37 @@ def get_db_session():
     finally:
         session.close()
 
+# SimHash block columns, in block order
+SIMHASH_BLOCK_COLUMNS = [
+    Article.simhash_block0, Article.simhash_block1, Article.simhash_block2, Article.simhash_block3
+]
+
 class DatabaseArticleManager:
     """Database-backed article management replacing JSON-based deduplicator"""
     
-    def __init__(self):
+    def __init__(self, simhash_distance: Optional[int] = None,
+                 bloom_filter: Optional[ScalableBloomFilter] = None,
+                 digest_index: Optional[SortedDigestFile] = None):
+        """
+        Args:
+            simhash_distance: Articles whose SimHash differs from a stored one in at
+                most this many bits (0-3) are duplicates; None (the default) disables
+                the check, so only the pipeline opts in through config.json
+            bloom_filter: Optional filter over stored URLs and content hashes;
+                articles it has definitely not seen skip the exact-key queries
+            digest_index: Optional memory-mapped digest file of the same keys, used
+                instead of the Bloom filter; articles it holds are duplicates without
+                a query, the rest are still looked up
+        """
         self._session = None
+        self.simhash_distance = simhash_distance
+        self.bloom_filter = bloom_filter
+        self.digest_index = digest_index
+        # Membership index over stored URLs and content hashes, if any
+        self.key_index = digest_index if digest_index is not None else bloom_filter
+        self._index_synced = False
+        if simhash_distance is not None and not 0 <= simhash_distance <= MAX_BLOCK_DISTANCE:
+            raise ValueError(f"simhash_distance must be between 0 and {MAX_BLOCK_DISTANCE}")
     
     @property
     def session(self):
@@ -38,10 +71,12 @@ class DatabaseArticleManager:
         return self._session
     
     def close_session(self):
-        """Close the database session"""
+        """Close the database session and persist the key index"""
         if self._session is not None:
             self._session.close()
             self._session = None
+        if self.key_index is not None:
+            self.key_index.save()
     
     def __enter__(self):
         return self
@@ -65,25 +100,217 @@ class DatabaseArticleManager:
             except Exception:
                 pass
     
+    def sync_key_index(self, batch_size: int = 5000):
+        """
+        Add articles stored since the index's watermark to the Bloom filter or digest index
+        
+        The index records the highest article id it has absorbed and how
+        many rows had ids up to it, so a fresh index is built from the whole
+        table once and later runs only read the articles other processes
+        saved in the meantime. A digest index is remapped first, in case
+        another process merged into it.
+        
+        The watermark is only trusted while the table still matches it:
+        
+        - If MAX(id) is below it, or the row at the watermark holds an
+          article the index has never seen, ids were reused after the table
+          was emptied. The index is cleared and rebuilt.
+        - If the number of rows up to the watermark has changed, rows were
+          committed out of id order or deleted. The whole table is read
+          again; adding keys twice is harmless.
+        """
+        if self.key_index is None or self._index_synced:
+            return
+        
+        index = self.key_index
+        added = 0
+        try:
+            if self.digest_index is not None:
+                self.digest_index.refresh()
+            
+            reason = self._stale_watermark_reason(index)
+            if reason == 'reused':
+                logger.info("Article ids were reused, rebuilding the key index")
+                index.clear()
+            elif reason == 'gap':
+                logger.info("Articles were added or removed below the key index watermark, rescanning")
+                index.last_article_id = 0
+                index.article_count = 0
+            
+            while True:
+                rows = self.session.query(
+                    Article.id, Article.link, Article.normalized_url, Article.content_hash
+                ).filter(Article.id > index.last_article_id).order_by(Article.id).limit(batch_size).all()
+                if not rows:
+                    break
+                
+                for row in rows:
+                    index.update(dedup_keys(row.normalized_url or normalize_url(row.link), row.content_hash))
+                index.last_article_id = rows[-1].id
+                index.article_count += len(rows)
+                index.dirty = True
+                added += len(rows)
+            
+            self._index_synced = True
+            if added:
+                logger.info(f"Added {added} stored articles to the key index")
+        except Exception as e:
+            logger.error(f"Error syncing key index: {e}")
+    
+    def _stale_watermark_reason(self, index) -> Optional[str]:
+        """'reused' or 'gap' if the table no longer matches the index watermark, else None"""
+        watermark = index.last_article_id
+        if not watermark:
+            return None
+        
+        max_id = self.session.query(func.max(Article.id)).scalar() or 0
+        if max_id < watermark:
+            return 'reused'
+        row = self.session.query(
+            Article.link, Article.normalized_url, Article.content_hash
+        ).filter(Article.id == watermark).first()
+        if row is not None and \
+                not index.might_contain_any(dedup_keys(row.normalized_url or normalize_url(row.link), row.content_hash)):
+            return 'reused'
+        
+        count = self.session.query(func.count(Article.id)).filter(Article.id <= watermark).scalar()
+        if count != index.article_count:
+            return 'gap'
+        return None
+    
+    def _index_says_new(self, article: Dict) -> bool:
+        """True if the Bloom filter has definitely never seen the article's URL or content hash"""
+        if self.bloom_filter is None or self.key_index is not self.bloom_filter:
+            return False
+        self.sync_key_index()
+        return self._index_synced and not self.bloom_filter.might_contain_any(
+            dedup_keys(article.get('normalized_url'), article.get('content_hash'))
+        )
+    
+    def _indexed_keys(self, article: Dict) -> Dict[str, bool]:
+        """
+        Which of the article's normalized URL and content hash the digest index holds
+        
+        Only hits are final. A miss may be a row the index has not absorbed
+        yet, e.g. one committed by a concurrent run below the watermark, so
+        misses still go to the database.
+        """
+        if self.digest_index is None:
+            return {'url': False, 'hash': False}
+        self.sync_key_index()
+        url, content_hash = article.get('normalized_url'), article.get('content_hash')
+        return {
+            'url': bool(url) and dedup_keys(normalized_url=url)[0] in self.digest_index,
+            'hash': bool(content_hash) and dedup_keys(content_hash=content_hash)[0] in self.digest_index
+        }
+    
+    @staticmethod
+    def add_dedup_keys(article: Dict) -> Dict:
+        """
+        Compute an article's normalized URL, content hash and SimHash, unless already set
+        
+        Keys are computed from the scraped article, before summarization
+        replaces its summary, and travel with the dict through to save_article.
+        """
+        if article.get('link') and not article.get('normalized_url'):
+            article['normalized_url'] = normalize_url(article['link'])
+        if not article.get('content_hash'):
+            article['content_hash'] = generate_content_hash(article)
+        if 'simhash' not in article:
+            article['simhash'] = article_simhash(article)
+        return article
+    
+    def _similar_simhashes(self, fingerprints: List[int]) -> List[int]:
+        """
+        Stored SimHashes sharing at least one 16-bit block with any of the fingerprints
+        
+        One chunked IN query per indexed block column; every stored fingerprint
+        within Hamming distance 3 of an input is among the results.
+        """
+        fingerprints = [fingerprint for fingerprint in fingerprints if fingerprint is not None]
+        candidates = set()
+        for block, column in enumerate(SIMHASH_BLOCK_COLUMNS):
+            values = list({simhash_blocks(fingerprint)[block] for fingerprint in fingerprints})
+            for i in range(0, len(values), IN_QUERY_CHUNK_SIZE):
+                rows = self.session.query(Article.simhash).filter(
+                    column.in_(values[i:i + IN_QUERY_CHUNK_SIZE])
+                ).all()
+                candidates.update(row[0] for row in rows if row[0] is not None)
+        return list(candidates)
+    
+    def find_similar(self, article: Dict, max_distance: int = MAX_BLOCK_DISTANCE) -> Optional[Article]:
+        """
+        Find a stored article whose SimHash is within ``max_distance`` bits
+        
+        Args:
+            article: Article dictionary with title and summary
+            max_distance: Largest Hamming distance that counts (at most 3)
+        
+        Returns:
+            The closest matching Article, or None
+        """
+        fingerprint = self.add_dedup_keys(article).get('simhash')
+        if fingerprint is None:
+            return None
+        
+        blocks = simhash_blocks(fingerprint)
+        candidates = self.session.query(Article).filter(
+            or_(*(column == block for column, block in zip(SIMHASH_BLOCK_COLUMNS, blocks)))
+        ).all()
+        matches = closest_matches([fingerprint], [candidate.simhash for candidate in candidates], max_distance)
+        return candidates[matches[0]] if matches[0] is not None else None
+    
+    def find_existing(self, article: Dict) -> Optional[Article]:
+        """Stored article with the same link, normalized URL or content hash, if any"""
+        try:
+            self.add_dedup_keys(article)
+            conditions = []
+            if article.get('link'):
+                conditions.append(Article.link == article['link'])
+            if article.get('normalized_url'):
+                conditions.append(Article.normalized_url == article['normalized_url'])
+            if article.get('content_hash'):
+                conditions.append(Article.content_hash == article['content_hash'])
+            if not conditions:
+                return None
+            return self.session.query(Article).filter(or_(*conditions)).first()
+        except Exception as e:
+            logger.error(f"Error finding existing article: {e}")
+            return None
+    
     def is_duplicate(self, article: Dict) -> bool:
         """Check if article already exists in database"""
         try:
-            # Check by URL
+            self.add_dedup_keys(article)
+            
+            # The exact keys are definitely unseen; only the SimHash check could still match
+            if self._index_says_new(article):
+                return self.simhash_distance is not None and \
+                    self.find_similar(article, self.simhash_distance) is not None
+            if any(self._indexed_keys(article).values()):
+                return True
+            
+            # Check by URL, with and without tracking parameters
             if 'link' in article:
-                existing = self.session.query(Article).filter(
-                    Article.link == article['link']
+                existing = self.session.query(Article.id).filter(
+                    (Article.link == article['link']) |
+                    (Article.normalized_url == article['normalized_url'])
                 ).first()
                 if existing:
                     return True
             
             # Check by content hash if available
             if 'content_hash' in article:
-                existing = self.session.query(Article).filter(
+                existing = self.session.query(Article.id).filter(
                     Article.content_hash == article['content_hash']
                 ).first()
                 if existing:
                     return True
             
+            # Check for a nearly identical title and summary
+            if self.simhash_distance is not None and self.find_similar(article, self.simhash_distance):
+                return True
+            
             return False
         except Exception as e:
             logger.error(f"Error checking for duplicate: {e}")
@@ -92,9 +319,11 @@ class DatabaseArticleManager:
     def save_article(self, article_data: Dict) -> Optional[Article]:
         """Save article to database"""
         try:
+            self.add_dedup_keys(article_data)
             article = Article(
                 title=article_data.get('title', ''),
                 link=article_data.get('link', ''),
+                normalized_url=article_data.get('normalized_url'),
                 summary=article_data.get('summary', ''),
                 full_content=article_data.get('full_content', ''),
                 source=article_data.get('source', ''),
@@ -102,10 +331,18 @@ class DatabaseArticleManager:
                 content_hash=article_data.get('content_hash', ''),
                 ai_summary=article_data.get('ai_summary', '')
             )
+            set_simhash(article, article_data.get('simhash'))
             
             self.session.add(article)
             self.session.commit()
             
+            if self.key_index is not None:
+                self.key_index.update(dedup_keys(article.normalized_url, article.content_hash))
+                # Only advance the watermark past ids the index has certainly absorbed
+                if self._index_synced and article.id == self.key_index.last_article_id + 1:
+                    self.key_index.last_article_id = article.id
+                    self.key_index.article_count += 1
+            
             logger.info(f"Saved article: {article.title}")
             return article
             
@@ -114,16 +351,124 @@ class DatabaseArticleManager:
             logger.error(f"Error saving article: {e}")
             return None
     
-    def filter_new_articles(self, articles: List[Dict]) -> List[Dict]:
-        """Filter out articles that already exist in database"""
+    def _existing_values(self, column, values: List[str]) -> set:
+        """Return which of the given values already appear in an Article column"""
+        existing = set()
+        unique_values = list(dict.fromkeys(value for value in values if value))
+        for i in range(0, len(unique_values), IN_QUERY_CHUNK_SIZE):
+            chunk = unique_values[i:i + IN_QUERY_CHUNK_SIZE]
+            rows = self.session.query(column).filter(column.in_(chunk)).all()
+            existing.update(row[0] for row in rows)
+        return existing
+    
+    def _query_existing_keys(self, articles: List[Dict]):
+        """Links (raw or normalized) and content hashes of the articles already stored"""
+        existing_links = self._existing_values(
+            Article.link, [article.get('link') for article in articles]
+        )
+        existing_links |= self._existing_values(
+            Article.normalized_url, [article.get('normalized_url') for article in articles]
+        )
+        existing_hashes = self._existing_values(
+            Article.content_hash, [article.get('content_hash') for article in articles]
+        )
+        return existing_links, existing_hashes
+    
+    def filter_new_articles(self, articles: List[Dict], seen: Dict[str, set] = None) -> List[Dict]:
+        """
+        Filter out articles that already exist in database
+        
+        Each article gets its normalized URL and content hash (see
+        add_dedup_keys). Links, normalized URLs and content hashes are then
+        looked up with one chunked, indexed IN query each instead of one or
+        two queries per article, and duplicates within the batch (the same
+        story in two feeds) are dropped as well. Articles the Bloom filter
+        has definitely not seen are left out of those queries; articles the
+        digest index holds are duplicates without them. With SimHash matching
+        enabled, stored fingerprints sharing a 16-bit block with the batch
+        are fetched the same way and compared against the whole batch at once.
+        
+        Args:
+            articles: Candidate articles
+            seen: Optional dictionary carried across calls so that articles
+                already accepted from an earlier batch count as duplicates
+        
+        Returns:
+            Articles not yet in the database, in input order
+        """
+        for article in articles:
+            self.add_dedup_keys(article)
+        
+        maybe_seen = [article for article in articles if not self._index_says_new(article)]
+        if self.key_index is self.bloom_filter and self.bloom_filter is not None and articles:
+            logger.info(f"Bloom filter: {len(articles) - len(maybe_seen)} of {len(articles)} articles definitely new")
+        
+        try:
+            unindexed = []
+            indexed_links, indexed_hashes = set(), set()
+            for article in maybe_seen:
+                indexed = self._indexed_keys(article)
+                if indexed['url']:
+                    indexed_links.add(article['normalized_url'])
+                if indexed['hash']:
+                    indexed_hashes.add(article['content_hash'])
+                if not any(indexed.values()):
+                    unindexed.append(article)
+            
+            existing_links, existing_hashes = self._query_existing_keys(unindexed)
+            existing_links |= indexed_links
+            existing_hashes |= indexed_hashes
+            similar_simhashes = []
+            if self.simhash_distance is not None:
+                similar_simhashes = self._similar_simhashes([article.get('simhash') for article in articles])
+        except Exception as e:
+            logger.error(f"Error checking for duplicates: {e}")
+            existing_links, existing_hashes, similar_simhashes = set(), set(), []
+        
         new_articles = []
         duplicates_found = 0
+        seen = seen if seen is not None else {}
+        seen_links = seen.setdefault('links', set())
+        seen_hashes = seen.setdefault('hashes', set())
+        seen_simhashes = seen.setdefault('simhashes', [])
         
-        for article in articles:
-            if not self.is_duplicate(article):
-                new_articles.append(article)
-            else:
+        batch_simhashes = []
+        near_matches = [None] * len(articles)
+        if self.simhash_distance is not None:
+            fingerprinted = [i for i, article in enumerate(articles) if article.get('simhash') is not None]
+            matches = closest_matches(
+                [articles[i]['simhash'] for i in fingerprinted],
+                similar_simhashes + seen_simhashes,
+                self.simhash_distance
+            )
+            for i, match in zip(fingerprinted, matches):
+                near_matches[i] = match
+        
+        for article, near_match in zip(articles, near_matches):
+            link = article.get('normalized_url')
+            content_hash = article.get('content_hash')
+            fingerprint = article.get('simhash')
+            if (link and (link in existing_links or article['link'] in existing_links or
+                          link in seen_links)) or \
+               (content_hash and (content_hash in existing_hashes or content_hash in seen_hashes)) or \
+               near_match is not None:
+                duplicates_found += 1
+                continue
+            
+            # Articles accepted earlier in this batch were not part of the batch comparison
+            if self.simhash_distance is not None and fingerprint is not None and \
+                    closest_matches([fingerprint], batch_simhashes, self.simhash_distance)[0] is not None:
                 duplicates_found += 1
+                continue
+            
+            if link:
+                seen_links.add(link)
+            if content_hash:
+                seen_hashes.add(content_hash)
+            if fingerprint is not None:
+                batch_simhashes.append(fingerprint)
+            new_articles.append(article)
+        seen_simhashes.extend(batch_simhashes)
         
         logger.info(f"Filtered out {duplicates_found} duplicate articles")
         logger.info(f"Found {len(new_articles)} new articles")
@@ -458,15 +803,14 @@ class DatabaseNewsletterManager:
             
             # Associate articles with newsletter
             article_manager = DatabaseArticleManager()
+            # Share the session so saving an article does not wait on the uncommitted newsletter
+            article_manager._session = self.session
             for i, article_data in enumerate(articles):
-                # Save article if not exists
-                if not article_manager.is_duplicate(article_data):
-                    article = article_manager.save_article(article_data)
-                else:
-                    # Get existing article
-                    article = self.session.query(Article).filter(
-                        Article.link == article_data.get('link')
-                    ).first()
+                # Link the stored row, or save the article if it has none; a near
+                # match by SimHash is a different article and gets its own row
+                article = article_manager.find_existing(article_data) or article_manager.save_article(article_data)
+                if not article:
+                    logger.warning(f"Could not link article to newsletter: {article_data.get('title', 'Unknown')}")
                 
                 if article:
                     newsletter_article = NewsletterArticle(
@@ -563,8 +907,46 @@ class DatabaseRSSManager:
             logger.error(f"Error getting RSS sources: {e}")
             return []
     
-    def update_fetch_status(self, source_id: int, status: str, error_message: str = None):
-        """Update RSS source fetch status"""
+    def get_sources_by_url(self, urls: List[str]) -> Dict[str, RSSSource]:
+        """
+        Get RSS sources for a list of feed URLs, creating rows for unknown URLs
+        
+        Args:
+            urls: RSS feed URLs (usually the "sources" list of config.json)
+        
+        Returns:
+            Dictionary mapping URL to RSSSource; empty if the database is unavailable
+        """
+        try:
+            sources = {
+                source.url: source
+                for source in self.session.query(RSSSource).filter(RSSSource.url.in_(urls)).all()
+            }
+            
+            import urllib.parse
+            for url in urls:
+                if url not in sources:
+                    source = RSSSource(
+                        name=urllib.parse.urlparse(url).netloc or url,
+                        url=url,
+                        active=True
+                    )
+                    self.session.add(source)
+                    sources[url] = source
+            
+            self.session.commit()
+            return sources
+            
+        except Exception as e:
+            self.session.rollback()
+            logger.error(f"Error getting RSS sources by URL: {e}")
+            return {}
+    
+    def update_fetch_status(self, source_id: int, status: str, error_message: str = None,
+                            articles_fetched: int = 0, next_fetch_date: datetime = None,
+                            poll_interval_minutes: int = None, consecutive_failures: int = None,
+                            circuit_state: str = None, circuit_opened_at: datetime = None):
+        """Update RSS source fetch status, polling schedule and circuit breaker state"""
         try:
             source = self.session.query(RSSSource).get(source_id)
             if source:
@@ -572,10 +954,45 @@ class DatabaseRSSManager:
                 source.last_fetch_status = status
                 if error_message:
                     source.last_error_message = error_message
+                source.total_articles_fetched = (source.total_articles_fetched or 0) + articles_fetched
+                if next_fetch_date is not None:
+                    source.next_fetch_date = next_fetch_date
+                if poll_interval_minutes is not None:
+                    source.poll_interval_minutes = poll_interval_minutes
+                if consecutive_failures is not None:
+                    source.consecutive_failures = consecutive_failures
+                if circuit_state is not None:
+                    source.circuit_state = circuit_state
+                if circuit_opened_at is not None:
+                    source.circuit_opened_at = circuit_opened_at
                 self.session.commit()
         except Exception as e:
+            self.session.rollback()
             logger.error(f"Error updating fetch status: {e}")
     
+    def update_high_water_marks(self, marks: Dict[str, Dict]):
+        """
+        Store the newest entry seen per RSS source
+        
+        Args:
+            marks: Dictionary mapping feed URL to {'guid': ..., 'published': UTC epoch seconds}
+        """
+        if not marks:
+            return
+        
+        try:
+            sources = self.session.query(RSSSource).filter(RSSSource.url.in_(list(marks))).all()
+            for source in sources:
+                mark = marks[source.url]
+                source.last_seen_guid = mark.get('guid')
+                published = mark.get('published')
+                source.last_seen_published = datetime.utcfromtimestamp(published) if published is not None else None
+            self.session.commit()
+            logger.info(f"Updated high-water marks for {len(sources)} RSS sources")
+        except Exception as e:
+            self.session.rollback()
+            logger.error(f"Error updating high-water marks: {e}")
+    
     def add_rss_source(self, source_data: Dict) -> Optional[RSSSource]:
         """Add new RSS source"""
         try:
@@ -6,138 +6,269 @@ import json
 import logging
 import os
 import hashlib
-from datetime import datetime
-from typing import List, Dict, Set
+from datetime import datetime, timedelta
+from typing import List, Dict, Optional
 from urllib.parse import urlparse, parse_qs
 
+import compact_history
+from bloom_filter import dedup_keys
+from history_journal import HistoryJournal
+from history_store import BucketHistoryStore, CompactHistoryStore, DigestFileStore, HistoryStore
+
 logger = logging.getLogger(__name__)
 
+def normalize_url(url: str) -> str:
+    """
+    Normalize URL to catch duplicate articles with different parameters
+
+    Args:
+        url: Original URL
+
+    Returns:
+        Normalized URL string
+    """
+    try:
+        parsed = urlparse(url.lower().strip())
+
+        # Remove common tracking parameters
+        tracking_params = {
+            'utm_source', 'utm_medium', 'utm_campaign', 'utm_term', 'utm_content',
+            'fbclid', 'gclid', 'ref', 'source', 'campaign'
+        }
+
+        # Parse query parameters
+        query_params = parse_qs(parsed.query)
+
+        # Filter out tracking parameters
+        clean_params = {
+            k: v for k, v in query_params.items() 
+            if k.lower() not in tracking_params
+        }
+
+        # Rebuild query string
+        if clean_params:
+            from urllib.parse import urlencode
+            clean_query = urlencode(clean_params, doseq=True)
+            normalized = f"{parsed.scheme}://{parsed.netloc}{parsed.path}?{clean_query}"
+        else:
+            normalized = f"{parsed.scheme}://{parsed.netloc}{parsed.path}"
+
+        # Remove trailing slash
+        normalized = normalized.rstrip('/')
+
+        return normalized
+
+    except Exception as e:
+        logger.warning(f"Failed to normalize URL {url}: {e}")
+        return url.lower().strip()
+
+def generate_content_hash(article: Dict) -> str:
+    """
+    Generate hash for article content to detect duplicates with different URLs
+
+    Args:
+        article: Article dictionary
+
+    Returns:
+        MD5 hash of normalized content
+    """
+    try:
+        # Combine title and summary for content hash
+        title = article.get('title', '').strip().lower()
+        summary = article.get('summary', '').strip().lower()
+
+        # Remove extra whitespace and punctuation for better matching
+        import re
+        title = re.sub(r'\s+', ' ', title)
+        summary = re.sub(r'\s+', ' ', summary)
+
+        # Create content string
+        content = f"{title}|{summary}"
+
+        # Generate hash
+        content_hash = hashlib.md5(content.encode('utf-8')).hexdigest()
+
+        return content_hash
+
+    except Exception as e:
+        logger.warning(f"Failed to generate content hash: {e}")
+        return ""
+
 class ArticleDeduplicator:
-    """Manages article deduplication using URL tracking and content hashing"""
+    """
+    Manages article deduplication using URL tracking and content hashing
     
-    def __init__(self, history_file: str = "data/article_history.json"):
+    The history itself lives in a HistoryStore (see history_store): plain
+    day-bucketed sets by default, compact digest tables with ``compact=True``
+    (needs NumPy), or a memory-mapped digest file with ``digest_file`` set.
+    This class decides what is marked, persists it and applies retention.
+    
+    Marking articles appends their records to a journal
+    (``<history_file>.journal``), so it costs O(batch); once the journal
+    holds ``compact_every`` records the store is saved and the journal
+    emptied. Startup loads the store and replays whatever the journal still
+    holds. With ``retention_days`` set, entries older than the window are
+    skipped while loading, so startup cost follows the retention window.
+    """
+    
+    def __init__(self, history_file: str = "data/article_history.json", bloom_filter=None,
+                 compact_every: int = 1000, retention_days: Optional[int] = None,
+                 compact: bool = False, digest_file: Optional[str] = None):
+        """
+        Args:
+            history_file: JSON snapshot the history is persisted to
+            bloom_filter: Optional ScalableBloomFilter consulted before the store (plain store only)
+            compact_every: Journal records that trigger a compaction into the snapshot
+            retention_days: Days of history to load and keep (None keeps everything)
+            compact: Keep binary digests instead of strings
+            digest_file: Memory-mapped digest file to keep history in
+        """
         self.history_file = history_file
-        self.processed_urls: Set[str] = set()
-        self.processed_hashes: Set[str] = set()
-        self.article_metadata: Dict[str, Dict] = {}
+        self.journal = HistoryJournal(f"{history_file}.journal")
+        self.compact_every = compact_every
+        self.retention_days = retention_days
+        self.bloom_filter = bloom_filter
         
         # Ensure data directory exists
         os.makedirs(os.path.dirname(history_file), exist_ok=True)
         
+        if digest_file:
+            if compact:
+                logger.warning("Using the digest file for article history; compact mode is ignored")
+            self._use_store(DigestFileStore(digest_file))
+        else:
+            store = self._compact_store() if compact else None
+            self._use_store(store if store is not None else BucketHistoryStore())
+        
         # Load existing history
         self.load_history()
     
+    @classmethod
+    def from_config(cls, settings: Dict, bloom_filter=None) -> 'ArticleDeduplicator':
+        """Create a deduplicator from the "deduplication" section of config.json"""
+        return cls(
+            settings.get('history_file', 'data/article_history.json'),
+            bloom_filter=bloom_filter,
+            retention_days=settings.get('history_retention_days', 90) if settings.get('cleanup_on_startup', True) else None,
+            compact=settings.get('compact_history', False),
+            digest_file=settings.get('digest_file')
+        )
+    
+    @staticmethod
+    def _compact_store() -> Optional[CompactHistoryStore]:
+        """Compact store, or None if NumPy is not installed"""
+        if compact_history.np is None:
+            logger.warning("NumPy is not installed, keeping article history in plain sets")
+            return None
+        return CompactHistoryStore()
+    
+    def _use_store(self, store: HistoryStore):
+        if self.bloom_filter is not None and not store.supports_bloom_filter:
+            # Digest lookups are as cheap as the filter, and it could not be seeded from digests
+            logger.info(f"The {store.name} history does not use a Bloom filter")
+            self.bloom_filter = None
+        self.store = store
+    
+    # Read-only views kept for callers of the former attributes
+    @property
+    def processed_urls(self):
+        return getattr(self.store, 'urls', set())
+    
+    @property
+    def processed_hashes(self):
+        return getattr(self.store, 'hashes', set())
+    
+    @property
+    def article_metadata(self) -> Dict[str, Dict]:
+        return getattr(self.store, 'metadata', {})
+    
+    @staticmethod
+    def _cutoff_day(days_to_keep: Optional[int]) -> Optional[str]:
+        """First day still inside the retention window (ISO dates sort as strings)"""
+        if days_to_keep is None:
+            return None
+        return (datetime.now() - timedelta(days=days_to_keep)).date().isoformat()
+    
     def load_history(self):
-        """Load article history from JSON file"""
+        """Load the article history snapshot, then replay the journal on top of it"""
+        cutoff = self._cutoff_day(self.retention_days)
+        expired = 0
         try:
-            if os.path.exists(self.history_file):
+            if not self.store.wants_snapshot():
+                # The store keeps its own file
+                pass
+            elif os.path.exists(self.history_file):
                 with open(self.history_file, 'r', encoding='utf-8') as f:
                     data = json.load(f)
                 
-                self.processed_urls = set(data.get('processed_urls', []))
-                self.processed_hashes = set(data.get('processed_hashes', []))
-                self.article_metadata = data.get('article_metadata', {})
-                
-                logger.info(f"Loaded {len(self.processed_urls)} processed URLs from history")
+                if data.get('format') == 'compact' and isinstance(self.store, BucketHistoryStore):
+                    store = self._compact_store()
+                    if store is None:
+                        raise ValueError("history was saved in compact mode, which needs NumPy")
+                    self._use_store(store)
+                expired = self.store.load(data, cutoff)
             else:
                 logger.info("No existing article history found, starting fresh")
         except Exception as e:
             logger.error(f"Failed to load article history: {e}")
-            # Continue with empty sets
+            # Continue with an empty history
+        
+        # A new (or rebuilt) filter starts from the store; journal records are added on replay
+        if self.bloom_filter is not None and not len(self.bloom_filter):
+            self.bloom_filter.update(self.store.dedup_keys())
+        
+        self._replay_journal(cutoff)
+        logger.info(f"Loaded {len(self.store)} entries of {self.store.name} history")
+        
+        if expired:
+            # Rewrite the snapshot without them so later startups do not read them again
+            logger.info(f"Dropped {expired} expired entries from history")
+            self.save_history()
+    
+    def _replay_journal(self, cutoff: Optional[str] = None):
+        """Apply journal records written since the last snapshot"""
+        for record in self.journal.replay():
+            if cutoff and (record.get('processed_at') or '')[:10] < cutoff:
+                continue
+            self._apply_record(record)
+        
+        if self.journal.records:
+            logger.info(f"Replayed {self.journal.records} article history journal records")
+    
+    def _apply_record(self, record: Dict):
+        """Add one marked article (a journal record) to the in-memory history"""
+        day = (record.get('processed_at') or datetime.now().isoformat())[:10]
+        self.store.add(record, day)
+        if self.bloom_filter is not None:
+            self.bloom_filter.update(dedup_keys(record.get('url'), record.get('hash')))
     
     def save_history(self):
-        """Save article history to JSON file"""
+        """
+        Compact the history into the store's files and empty the journal
+        
+        Stores write to a temporary file and swap it in, so a crash leaves
+        either the old or the new history; the journal is only truncated
+        afterwards, and replaying it over the new history is harmless. The
+        Bloom filter is saved first so it never holds less than the snapshot.
+        """
         try:
-            data = {
-                'processed_urls': list(self.processed_urls),
-                'processed_hashes': list(self.processed_hashes),
-                'article_metadata': self.article_metadata,
-                'last_updated': datetime.now().isoformat()
-            }
+            if self.bloom_filter is not None:
+                self.bloom_filter.save()
             
-            with open(self.history_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
+            self.store.save(self.history_file, self._cutoff_day(self.retention_days))
+            self.journal.truncate()
             
             logger.debug("Article history saved")
         except Exception as e:
             logger.error(f"Failed to save article history: {e}")
     
     def normalize_url(self, url: str) -> str:
-        """
-        Normalize URL to catch duplicate articles with different parameters
-        
-        Args:
-            url: Original URL
-        
-        Returns:
-            Normalized URL string
-        """
-        try:
-            parsed = urlparse(url.lower().strip())
-            
-            # Remove common tracking parameters
-            tracking_params = {
-                'utm_source', 'utm_medium', 'utm_campaign', 'utm_term', 'utm_content',
-                'fbclid', 'gclid', 'ref', 'source', 'campaign'
-            }
-            
-            # Parse query parameters
-            query_params = parse_qs(parsed.query)
-            
-            # Filter out tracking parameters
-            clean_params = {
-                k: v for k, v in query_params.items() 
-                if k.lower() not in tracking_params
-            }
-            
-            # Rebuild query string
-            if clean_params:
-                from urllib.parse import urlencode
-                clean_query = urlencode(clean_params, doseq=True)
-                normalized = f"{parsed.scheme}://{parsed.netloc}{parsed.path}?{clean_query}"
-            else:
-                normalized = f"{parsed.scheme}://{parsed.netloc}{parsed.path}"
-            
-            # Remove trailing slash
-            normalized = normalized.rstrip('/')
-            
-            return normalized
-            
-        except Exception as e:
-            logger.warning(f"Failed to normalize URL {url}: {e}")
-            return url.lower().strip()
+        """Normalize URL to catch duplicate articles with different parameters"""
+        return normalize_url(url)
     
     def generate_content_hash(self, article: Dict) -> str:
-        """
-        Generate hash for article content to detect duplicates with different URLs
-        
-        Args:
-            article: Article dictionary
-        
-        Returns:
-            MD5 hash of normalized content
-        """
-        try:
-            # Combine title and summary for content hash
-            title = article.get('title', '').strip().lower()
-            summary = article.get('summary', '').strip().lower()
-            
-            # Remove extra whitespace and punctuation for better matching
-            import re
-            title = re.sub(r'\s+', ' ', title)
-            summary = re.sub(r'\s+', ' ', summary)
-            
-            # Create content string
-            content = f"{title}|{summary}"
-            
-            # Generate hash
-            content_hash = hashlib.md5(content.encode('utf-8')).hexdigest()
-            
-            return content_hash
-            
-        except Exception as e:
-            logger.warning(f"Failed to generate content hash: {e}")
-            return ""
+        """Generate hash for article content to detect duplicates with different URLs"""
+        return generate_content_hash(article)
     
     def is_duplicate(self, article: Dict) -> bool:
         """
@@ -150,16 +281,21 @@ class ArticleDeduplicator:
             True if article is a duplicate
         """
         try:
+            normalized_url = self.normalize_url(article['link']) if 'link' in article else None
+            content_hash = self.generate_content_hash(article)
+            
+            # Neither key was ever marked, so the store need not be consulted
+            if self.bloom_filter is not None and \
+                    not self.bloom_filter.might_contain_any(dedup_keys(normalized_url, content_hash)):
+                return False
+            
             # Check URL
-            if 'link' in article:
-                normalized_url = self.normalize_url(article['link'])
-                if normalized_url in self.processed_urls:
-                    logger.debug(f"Duplicate URL found: {article.get('title', 'Unknown')}")
-                    return True
+            if normalized_url and self.store.has_url(normalized_url):
+                logger.debug(f"Duplicate URL found: {article.get('title', 'Unknown')}")
+                return True
             
             # Check content hash
-            content_hash = self.generate_content_hash(article)
-            if content_hash and content_hash in self.processed_hashes:
+            if content_hash and self.store.has_hash(content_hash):
                 logger.debug(f"Duplicate content found: {article.get('title', 'Unknown')}")
                 return True
             
@@ -201,38 +337,37 @@ class ArticleDeduplicator:
             articles_or_urls: List of article dictionaries or URLs
         """
         try:
+            processed_at = datetime.now().isoformat()
+            records = []
             for item in articles_or_urls:
                 if isinstance(item, dict):
                     # Article dictionary
                     article = item
+                    record = {'processed_at': processed_at, 'source': article.get('source', '')}
                     if 'link' in article:
-                        normalized_url = self.normalize_url(article['link'])
-                        self.processed_urls.add(normalized_url)
+                        record['url'] = self.normalize_url(article['link'])
+                        record['title'] = article.get('title', '')
                     
                     content_hash = self.generate_content_hash(article)
                     if content_hash:
-                        self.processed_hashes.add(content_hash)
-                    
-                    # Store metadata
-                    if 'link' in article:
-                        self.article_metadata[normalized_url] = {
-                            'title': article.get('title', ''),
-                            'processed_at': datetime.now().isoformat(),
-                            'source': article.get('source', '')
-                        }
+                        record['hash'] = content_hash
+                    records.append(record)
                 
                 elif isinstance(item, str):
                     # URL string
-                    normalized_url = self.normalize_url(item)
-                    self.processed_urls.add(normalized_url)
-                    
-                    self.article_metadata[normalized_url] = {
-                        'processed_at': datetime.now().isoformat(),
+                    records.append({
+                        'url': self.normalize_url(item),
+                        'processed_at': processed_at,
                         'source': 'manual'
-                    }
+                    })
             
-            # Save updated history
-            self.save_history()
+            for record in records:
+                self._apply_record(record)
+            
+            # Persist only this batch; fold the journal into the store now and then
+            self.journal.append(records)
+            if self.journal.records >= self.compact_every:
+                self.save_history()
             
             logger.info(f"Marked {len(articles_or_urls)} articles as processed")
             
@@ -241,20 +376,13 @@ class ArticleDeduplicator:
     
     def get_stats(self) -> Dict:
         """Get deduplication statistics"""
-        return {
-            'total_processed_urls': len(self.processed_urls),
-            'total_processed_hashes': len(self.processed_hashes),
-            'total_articles_tracked': len(self.article_metadata)
-        }
+        return self.store.stats()
     
     def reset_history(self):
         """Reset article history (for testing/maintenance)"""
         try:
-            self.processed_urls.clear()
-            self.processed_hashes.clear()
-            self.article_metadata.clear()
-            
-            # Remove history file
+            self.store.clear()
+            self.journal.remove()
             if os.path.exists(self.history_file):
                 os.remove(self.history_file)
             
@@ -265,35 +393,19 @@ class ArticleDeduplicator:
     
     def cleanup_old_entries(self, days_to_keep: int = 90):
         """
-        Remove old entries to prevent history file from growing too large
+        Drop history entries older than the retention window
+        
+        A URL or content hash is forgotten only if it was not marked again
+        on a later day.
         
         Args:
             days_to_keep: Number of days to keep in history
         """
         try:
-            from datetime import datetime, timedelta
-            cutoff_date = datetime.now() - timedelta(days=days_to_keep)
-            
-            urls_to_remove = []
-            for url, metadata in self.article_metadata.items():
-                try:
-                    processed_at = datetime.fromisoformat(metadata.get('processed_at', ''))
-                    if processed_at < cutoff_date:
-                        urls_to_remove.append(url)
-                except ValueError:
-                    # Invalid date format, remove old entry
-                    urls_to_remove.append(url)
-            
-            # Remove old entries
-            for url in urls_to_remove:
-                self.processed_urls.discard(url)
-                self.article_metadata.pop(url, None)
-            
-            # Note: We keep content hashes as they're small and provide good duplicate detection
-            
-            if urls_to_remove:
+            removed = self.store.drop_before(self._cutoff_day(days_to_keep))
+            if removed:
                 self.save_history()
-                logger.info(f"Cleaned up {len(urls_to_remove)} old entries from history")
+                logger.info(f"Cleaned up {removed} entries from history")
             
         except Exception as e:
             logger.error(f"Failed to cleanup old entries: {e}")
@@ -0,0 +1,253 @@
+"""
+Memory-mapped sorted digest file for dedup lookups
+Fixed-width 64-bit digests searched in place with bisect, plus a small in-memory delta merged in periodically
+"""
+
+import bisect
+import fcntl
+import logging
+import mmap
+import os
+import struct
+from array import array
+from typing import Dict, Iterable, Optional
+
+from compact_history import key_digest
+
+try:
+    import numpy as np
+except ImportError:  # Merges fall back to sorting in pure Python
+    np = None
+
+logger = logging.getLogger(__name__)
+
+# Magic, entry count, article-id watermark, rows at or below it; digests and days follow in native byte order
+HEADER = struct.Struct('=8sQQQ')
+MAGIC = b'PPDIGST2'
+
+class SortedDigestFile:
+    """
+    Read-only memory-mapped set of 64-bit key digests, with a writable delta
+
+    The file holds a header, then ``count`` sorted digests (8 bytes each),
+    then one uint16 day per digest. Lookups bisect a memoryview of the
+    mapping, so opening costs nothing however large the history is, and
+    every process mapping the file shares the same page-cache pages. New
+    keys go into an in-memory delta; merge() folds the delta into a new
+    file, written aside and swapped in with os.replace, so readers keep
+    their old mapping until they call refresh().
+
+    ``last_article_id`` and ``article_count`` let a database-backed owner
+    record which rows the file already covers, as with ScalableBloomFilter; membership here is
+    exact up to 64-bit digest collisions.
+    """
+
+    def __init__(self, path: str = "data/dedup_digests.bin", merge_threshold: int = 10000):
+        """
+        Args:
+            path: Digest file
+            merge_threshold: Delta size at which save() merges it into the file
+        """
+        self.path = path
+        self.merge_threshold = merge_threshold
+        self.delta: Dict[int, int] = {}
+        self.last_article_id = 0
+        self.article_count = 0
+        self.dirty = False
+        self._mmap = None
+        self._digests = ()
+        self._days = ()
+        self._inode = None
+
+        # Ensure data directory exists
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        # Map the existing file
+        self.open()
+
+    @classmethod
+    def from_config(cls, settings: Dict) -> 'SortedDigestFile':
+        """Create the digest file from the "digest_index" section of config.json"""
+        return cls(
+            settings.get('file', 'data/dedup_digests.bin'),
+            merge_threshold=settings.get('merge_threshold', 10000)
+        )
+
+    def open(self):
+        """(Re)map the file, keeping the delta"""
+        self._close_mapping()
+        try:
+            if not os.path.exists(self.path):
+                return
+            with open(self.path, 'rb') as f:
+                stat = os.fstat(f.fileno())
+                if stat.st_size < HEADER.size:
+                    return
+                mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+            magic, count, last_article_id, article_count = HEADER.unpack_from(mapping, 0)
+            if magic != MAGIC or stat.st_size != HEADER.size + count * 10:
+                mapping.close()
+                logger.warning(f"Ignoring digest file {self.path} with an unknown layout")
+                return
+
+            view = memoryview(mapping)
+            self._mmap = mapping
+            self._digests = view[HEADER.size:HEADER.size + count * 8].cast('Q')
+            self._days = view[HEADER.size + count * 8:].cast('H')
+            self._inode = stat.st_ino
+            if last_article_id >= self.last_article_id:
+                # The watermark and its row count only make sense as a pair
+                self.last_article_id, self.article_count = last_article_id, article_count
+        except Exception as e:
+            logger.error(f"Failed to map digest file: {e}")
+            self._close_mapping()
+
+    def _close_mapping(self):
+        for view in (self._digests, self._days):
+            if isinstance(view, memoryview):
+                view.release()
+        if self._mmap is not None:
+            self._mmap.close()
+        self._mmap = None
+        self._digests = ()
+        self._days = ()
+        self._inode = None
+
+    def refresh(self):
+        """Remap if another process has swapped in a newer file"""
+        try:
+            if os.stat(self.path).st_ino != self._inode:
+                self.open()
+        except FileNotFoundError:
+            pass
+
+    def close(self):
+        self._close_mapping()
+
+    def __len__(self) -> int:
+        """Digests in the file plus the delta (keys re-marked since the last merge count twice)"""
+        return len(self._digests) + len(self.delta)
+
+    def _file_index(self, digest: int) -> Optional[int]:
+        """Position of a digest in the mapped file, found by binary search"""
+        digests = self._digests
+        index = bisect.bisect_left(digests, digest)
+        if index < len(digests) and digests[index] == digest:
+            return index
+        return None
+
+    def __contains__(self, key) -> bool:
+        if not key:
+            return False
+        digest = key_digest(key) if isinstance(key, str) else key
+        return digest in self.delta or self._file_index(digest) is not None
+
+    def add(self, key, day: int = 0):
+        """Record a key, or move it to a newer day"""
+        if not key:
+            return
+        digest = key_digest(key) if isinstance(key, str) else key
+        if digest in self.delta:
+            known_day = self.delta[digest]
+        else:
+            index = self._file_index(digest)
+            known_day = self._days[index] if index is not None else None
+        if known_day is None or known_day < day:
+            self.delta[digest] = day
+            self.dirty = True
+
+    def update(self, keys: Iterable[str], day: int = 0):
+        for key in keys:
+            self.add(key, day)
+
+    def might_contain_any(self, keys: Iterable[str]) -> bool:
+        """True if any key is present (exact, unlike a Bloom filter)"""
+        return any(key in self for key in keys)
+
+    def count_before(self, cutoff_day: int) -> int:
+        """Entries a merge with ``cutoff_day`` would drop (file entries re-marked in the delta count once per copy)"""
+        if np is not None:
+            in_file = int(np.count_nonzero(np.asarray(self._days, dtype=np.uint16) < cutoff_day))
+        else:
+            in_file = sum(1 for day in self._days if day < cutoff_day)
+        return in_file + sum(1 for day in self.delta.values() if day < cutoff_day)
+
+    def save(self):
+        """Merge the delta into the file once it has grown past ``merge_threshold``"""
+        if len(self.delta) >= self.merge_threshold:
+            self.merge()
+
+    def merge(self, cutoff_day: Optional[int] = None):
+        """
+        Write the file plus the delta as a new sorted file and swap it in
+
+        Merges are serialized with a lock file; the current file is re-read
+        under the lock so entries another process merged are kept.
+
+        Args:
+            cutoff_day: Drop entries whose day is before this (None keeps all)
+        """
+        with open(f"{self.path}.lock", 'w') as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            self.refresh()
+
+            if np is not None:
+                digests, days = self._merged_arrays_numpy(cutoff_day)
+            else:
+                digests, days = self._merged_arrays_python(cutoff_day)
+
+            temp_file = f"{self.path}.tmp"
+            with open(temp_file, 'wb') as f:
+                f.write(HEADER.pack(MAGIC, len(digests), self.last_article_id, self.article_count or 0))
+                f.write(memoryview(digests).cast('B'))
+                f.write(memoryview(days).cast('B'))
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_file, self.path)
+
+            self.delta = {}
+            self.dirty = False
+            self.open()
+
+        logger.info(f"Merged digest file {self.path} ({len(self._digests)} entries)")
+
+    def _merged_arrays_numpy(self, cutoff_day: Optional[int]):
+        digests = np.concatenate([
+            np.asarray(self._digests, dtype=np.uint64),
+            np.fromiter(self.delta.keys(), dtype=np.uint64, count=len(self.delta))
+        ])
+        days = np.concatenate([
+            np.asarray(self._days, dtype=np.uint16),
+            np.fromiter(self.delta.values(), dtype=np.uint16, count=len(self.delta))
+        ])
+        # Newest day first within each digest, so unique() keeps it
+        order = np.lexsort((-days.astype(np.int32), digests))
+        digests, days = digests[order], days[order]
+        digests, first = np.unique(digests, return_index=True)
+        days = days[first]
+        if cutoff_day is not None:
+            keep = days >= cutoff_day
+            digests, days = digests[keep], days[keep]
+        return np.ascontiguousarray(digests), np.ascontiguousarray(days)
+
+    def _merged_arrays_python(self, cutoff_day: Optional[int]):
+        merged = dict(zip(self._digests, self._days))
+        for digest, day in self.delta.items():
+            merged[digest] = max(day, merged.get(digest, 0))
+        digests = array('Q')
+        days = array('H')
+        for digest in sorted(merged):
+            if cutoff_day is None or merged[digest] >= cutoff_day:
+                digests.append(digest)
+                days.append(merged[digest])
+        return digests, days
+
+    def clear(self):
+        """Remove the file and the delta"""
+        self._close_mapping()
+        self.delta = {}
+        self.last_article_id = 0
+        self.article_count = 0
+        if os.path.exists(self.path):
+            os.remove(self.path)
@@ -0,0 +1,175 @@
+"""
+Process-pool executor for CPU-bound text extraction
+Runs trafilatura page extraction and summary HTML cleaning outside the scraper threads
+"""
+
+import atexit
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, List, Optional
+
+import trafilatura
+
+from html_text import get_default_backend, html_to_text
+
+logger = logging.getLogger(__name__)
+
+def _extract_page(html: str, url: str) -> str:
+    return trafilatura.extract(html, url=url) or ""
+
+def _clean_summaries(markups: List[str], backend: str) -> List[str]:
+    return [html_to_text(markup, backend) for markup in markups]
+
+class ExtractionExecutor:
+    """
+    Offloads extraction work to worker processes, or runs it in-process
+
+    With ``max_workers`` of 0 (or if a process pool cannot be started, or
+    breaks) every call runs in the calling thread, exactly as before.
+    """
+
+    def __init__(self, max_workers: int = 0, chunk_size: int = 16):
+        """
+        Args:
+            max_workers: Number of worker processes (0 = extract in-process)
+            chunk_size: Summaries sent to a worker per task; smaller batches stay in-process
+        """
+        self.max_workers = max(0, max_workers)
+        self.chunk_size = max(1, chunk_size)
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def _pool(self) -> Optional[ProcessPoolExecutor]:
+        """Start the process pool on first use, falling back to in-process on failure"""
+        with self._lock:
+            if self._executor is None and self.max_workers:
+                try:
+                    # Spawned workers do not inherit the scraper's threads or locks
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self.max_workers,
+                        mp_context=multiprocessing.get_context('spawn')
+                    )
+                    logger.info(f"Started extraction pool with {self.max_workers} processes")
+                except (OSError, NotImplementedError, ValueError) as e:
+                    logger.warning(f"Could not start extraction processes, extracting in-process: {e}")
+                    self.max_workers = 0
+            return self._executor
+
+    def _disable_pool(self, error: Exception):
+        logger.warning(f"Extraction pool failed, extracting in-process from now on: {error}")
+        with self._lock:
+            executor, self._executor = self._executor, None
+            self.max_workers = 0
+        if executor:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def extract_page(self, html: str, url: str = None) -> str:
+        """
+        Extract the main text of an article page with trafilatura
+
+        Args:
+            html: Raw page HTML
+            url: Page URL (used by trafilatura for metadata)
+
+        Returns:
+            Extracted text ('' if nothing was found)
+        """
+        pool = self._pool()
+        if pool:
+            try:
+                return pool.submit(_extract_page, html, url).result()
+            except BrokenProcessPool as e:
+                self._disable_pool(e)
+        return _extract_page(html, url)
+
+    def clean_summaries(self, markups: List[str], backend: str = None) -> List[str]:
+        """
+        Convert a batch of summary HTML fragments to plain text
+
+        Fragments are sent to the workers in chunks of ``chunk_size``; a batch
+        no larger than one chunk is converted in-process, since shipping it to
+        another process costs more than the conversion itself.
+
+        Args:
+            markups: HTML (or plain text) fragments
+            backend: html_text backend name; defaults to the configured backend
+
+        Returns:
+            Normalized text for each fragment, in input order
+        """
+        backend = backend or get_default_backend()
+        pool = self._pool() if len(markups) > self.chunk_size else None
+        if pool:
+            chunks = [markups[i:i + self.chunk_size] for i in range(0, len(markups), self.chunk_size)]
+            try:
+                futures = [pool.submit(_clean_summaries, chunk, backend) for chunk in chunks]
+                return [text for future in futures for text in future.result()]
+            except BrokenProcessPool as e:
+                self._disable_pool(e)
+        return _clean_summaries(markups, backend)
+
+    def shutdown(self, wait: bool = True):
+        """Stop the worker processes"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor:
+            executor.shutdown(wait=wait)
+
+_executor = None
+_executor_options = None
+_executor_lock = threading.Lock()
+
+def get_extraction_executor() -> ExtractionExecutor:
+    """Get the process-wide extraction executor, creating an in-process one if needed"""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ExtractionExecutor()
+        return _executor
+
+def configure_extraction(settings: Dict = None) -> ExtractionExecutor:
+    """
+    Configure the process-wide extraction executor
+
+    The running executor, and its warm worker processes, are kept while
+    the settings are unchanged, so a long-running process that calls this
+    once per run starts its pool only once. Pools are shut down at exit.
+
+    Args:
+        settings: The "extraction" section of config.json
+
+    Returns:
+        The configured executor
+    """
+    global _executor, _executor_options
+    settings = settings or {}
+    workers = settings.get('process_workers')
+    if workers is None:
+        workers = multiprocessing.cpu_count()
+    options = {'max_workers': workers, 'chunk_size': settings.get('chunk_size', 16)}
+
+    with _executor_lock:
+        if _executor is not None and options == _executor_options:
+            return _executor
+        previous, _executor = _executor, ExtractionExecutor(**options)
+        _executor_options = options
+        executor = _executor
+
+    # Work already queued on the previous pool still completes
+    if previous:
+        previous.shutdown(wait=False)
+
+    logger.info(f"Extraction executor configured ({workers} processes)")
+    return executor
+
+def shutdown_extraction():
+    """Stop the process-wide executor's worker processes"""
+    with _executor_lock:
+        executor = _executor
+    if executor:
+        executor.shutdown()
+
+atexit.register(shutdown_extraction)
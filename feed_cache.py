@@ -0,0 +1,154 @@
+"""
+Conditional-GET cache for RSS feeds
+Remembers each feed's validators so unchanged feeds are not re-downloaded or re-parsed
+"""
+
+import json
+import logging
+import os
+import hashlib
+import threading
+from datetime import datetime
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Article fields that come from the feed itself; anything the pipeline adds later is not cached
+RSS_ARTICLE_FIELDS = ('title', 'link', 'summary', 'published', 'source')
+
+def copy_rss_fields(articles: List[Dict]) -> List[Dict]:
+    """Fresh copies of articles holding only their RSS-level fields"""
+    return [
+        {field: article[field] for field in RSS_ARTICLE_FIELDS if field in article}
+        for article in articles
+    ]
+
+class FeedCache:
+    """Stores ETag, Last-Modified and body hash per feed URL, plus the articles last extracted"""
+
+    def __init__(self, cache_file: str = "data/feed_cache.json"):
+        self.cache_file = cache_file
+        self.entries: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+
+        # Ensure data directory exists
+        os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+
+        # Load existing cache
+        self.load()
+
+    def load(self):
+        """Load feed cache from JSON file"""
+        try:
+            if os.path.exists(self.cache_file):
+                with open(self.cache_file, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+
+                self.entries = data.get('feeds', {})
+                logger.info(f"Loaded cache validators for {len(self.entries)} feeds")
+            else:
+                logger.info("No existing feed cache found, starting fresh")
+        except Exception as e:
+            logger.error(f"Failed to load feed cache: {e}")
+            self.entries = {}
+
+    def save(self):
+        """Save feed cache to JSON file"""
+        try:
+            with self._lock:
+                data = {
+                    'feeds': dict(self.entries),
+                    'last_updated': datetime.now().isoformat()
+                }
+
+            with open(self.cache_file, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False)
+
+            logger.debug("Feed cache saved")
+        except Exception as e:
+            logger.error(f"Failed to save feed cache: {e}")
+
+    @staticmethod
+    def hash_body(body: bytes) -> str:
+        """Hash a raw feed body so identical responses can be recognised"""
+        return hashlib.sha256(body).hexdigest()
+
+    def get(self, url: str) -> Optional[Dict]:
+        """Get the cached entry for a feed URL"""
+        with self._lock:
+            return self.entries.get(url)
+
+    def conditional_headers(self, url: str) -> Dict[str, str]:
+        """
+        Build conditional request headers for a feed
+
+        Args:
+            url: RSS feed URL
+
+        Returns:
+            Dictionary with If-None-Match / If-Modified-Since when known
+        """
+        headers = {}
+        entry = self.get(url)
+        if entry:
+            if entry.get('etag'):
+                headers['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def is_unchanged(self, url: str, body_hash: str) -> bool:
+        """Check whether a freshly downloaded body matches the cached one"""
+        entry = self.get(url)
+        return bool(entry and entry.get('body_hash') == body_hash)
+
+    def update(self, url: str, etag: Optional[str], last_modified: Optional[str],
+               body_hash: str, title: str, articles: List[Dict], entry_times: List[int] = None):
+        """
+        Record the validators and extracted articles for a feed
+
+        Args:
+            url: RSS feed URL
+            etag: ETag response header, if any
+            last_modified: Last-Modified response header, if any
+            body_hash: Hash of the raw feed body
+            title: Feed title
+            articles: Articles extracted from this version of the feed; a copy of
+                their RSS-level fields is kept, so later changes by the caller are not cached
+            entry_times: Publish times of the feed's entries (UTC epoch seconds)
+        """
+        with self._lock:
+            self.entries[url] = {
+                'etag': etag,
+                'last_modified': last_modified,
+                'body_hash': body_hash,
+                'title': title,
+                'articles': copy_rss_fields(articles),
+                'entry_times': entry_times or [],
+                'fetched_at': datetime.now().isoformat()
+            }
+
+    def touch(self, url: str, etag: Optional[str] = None, last_modified: Optional[str] = None):
+        """Refresh validators of an unchanged feed without touching its articles"""
+        with self._lock:
+            entry = self.entries.get(url)
+            if entry is None:
+                return
+            if etag:
+                entry['etag'] = etag
+            if last_modified:
+                entry['last_modified'] = last_modified
+            entry['fetched_at'] = datetime.now().isoformat()
+
+    def clear(self):
+        """Clear all cached feeds (for testing/maintenance)"""
+        try:
+            with self._lock:
+                self.entries.clear()
+
+            if os.path.exists(self.cache_file):
+                os.remove(self.cache_file)
+
+            logger.info("Feed cache cleared")
+        except Exception as e:
+            logger.error(f"Failed to clear feed cache: {e}")
@@ -0,0 +1,118 @@
+"""
+Adaptive polling scheduler for RSS sources
+Learns each feed's publish cadence and only fetches feeds that are due
+"""
+
+import logging
+from datetime import datetime, timedelta
+from statistics import median
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+class FeedScheduler:
+    """Computes next-due times for RSS sources from their fetch history"""
+
+    def __init__(self, min_interval_minutes: int = 30, max_interval_minutes: int = 1440,
+                 default_interval_minutes: int = 60, backoff_base_minutes: int = 60):
+        """
+        Args:
+            min_interval_minutes: Shortest polling interval for very active feeds
+            max_interval_minutes: Longest polling interval, also the backoff cap
+            default_interval_minutes: Interval used until a cadence has been learned
+            backoff_base_minutes: First backoff step after an error or empty fetch
+        """
+        self.min_interval = min_interval_minutes
+        self.max_interval = max_interval_minutes
+        self.default_interval = default_interval_minutes
+        self.backoff_base = backoff_base_minutes
+
+    @classmethod
+    def from_config(cls, settings: Dict) -> 'FeedScheduler':
+        """Create a scheduler from the "scheduler" section of config.json"""
+        return cls(
+            min_interval_minutes=settings.get('min_interval_minutes', 30),
+            max_interval_minutes=settings.get('max_interval_minutes', 1440),
+            default_interval_minutes=settings.get('default_interval_minutes', 60),
+            backoff_base_minutes=settings.get('backoff_base_minutes', 60)
+        )
+
+    def learn_interval(self, entry_times: List[int]) -> Optional[int]:
+        """
+        Estimate a polling interval from entry publish times
+
+        Feeds are polled at half their median gap between posts so a new
+        entry waits at most about half a publishing cycle.
+
+        Args:
+            entry_times: Entry publish times as UTC epoch seconds
+
+        Returns:
+            Polling interval in minutes, or None if there are too few entries
+        """
+        times = sorted(set(entry_times))
+        if len(times) < 2:
+            return None
+
+        gaps = [later - earlier for earlier, later in zip(times, times[1:])]
+        interval = int(median(gaps) / 60 / 2)
+        return max(self.min_interval, min(self.max_interval, interval))
+
+    def is_due(self, source, now: datetime = None) -> bool:
+        """Check whether an RSSSource should be fetched now"""
+        now = now or datetime.utcnow()
+        return source.next_fetch_date is None or source.next_fetch_date <= now
+
+    def due_urls(self, urls: List[str], sources_by_url: Dict, now: datetime = None) -> List[str]:
+        """
+        Filter feed URLs down to the ones that are due
+
+        Args:
+            urls: Configured feed URLs, in order
+            sources_by_url: RSSSource rows keyed by URL; unknown URLs are always due
+            now: Current UTC time
+
+        Returns:
+            Due URLs in their original order
+        """
+        now = now or datetime.utcnow()
+        due = [url for url in urls if url not in sources_by_url or self.is_due(sources_by_url[url], now)]
+
+        skipped = len(urls) - len(due)
+        if skipped:
+            logger.info(f"Skipping {skipped} feeds that are not due yet")
+        return due
+
+    def plan_next_fetch(self, source, result: Dict, now: datetime = None) -> Dict:
+        """
+        Work out the polling state after a fetch
+
+        Args:
+            source: RSSSource row (or None if the source is not in the database)
+            result: Per-feed result from the scraper
+            now: Current UTC time
+
+        Returns:
+            Dictionary with poll_interval_minutes, consecutive_failures and next_fetch_date
+        """
+        now = now or datetime.utcnow()
+        interval = (source.poll_interval_minutes if source else None) or self.default_interval
+        failures = (source.consecutive_failures if source else None) or 0
+
+        if result['status'] == 'timeout':
+            # Cut off by the scrape budget: says nothing about the feed, retry next run
+            delay = 0
+        elif result['status'] in ('error', 'empty'):
+            failures += 1
+            delay = min(self.backoff_base * 2 ** (failures - 1), self.max_interval)
+            delay = max(delay, interval)
+        else:
+            failures = 0
+            interval = self.learn_interval(result.get('entry_times', [])) or interval
+            delay = interval
+
+        return {
+            'poll_interval_minutes': interval,
+            'consecutive_failures': failures,
+            'next_fetch_date': now + timedelta(minutes=delay)
+        }
@@ -0,0 +1,346 @@
+"""
+Storage backends for the article dedup history
+Day-bucketed string sets, compact digest tables and the memory-mapped digest file, behind one interface
+"""
+
+import json
+import logging
+import os
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Dict, Iterator, Optional, Set, Tuple
+
+from bloom_filter import dedup_keys
+from compact_history import CompactHistory, day_number
+from digest_file import SortedDigestFile
+
+logger = logging.getLogger(__name__)
+
+def snapshot_buckets(data: Dict, cutoff: Optional[str] = None) -> Tuple[Dict[str, Dict[str, Set[str]]], int]:
+    """
+    Day buckets of a plain JSON snapshot, without those before ``cutoff``
+
+    Pre-bucket snapshots are sorted into buckets here: URLs go to the day in
+    their metadata, and hashes, which were never dated, to today, so they
+    expire one retention window from now.
+
+    Returns:
+        The buckets, and how many URLs and hashes were dropped as expired
+    """
+    buckets: Dict[str, Dict[str, Set[str]]] = {}
+
+    def bucket(day: str) -> Dict[str, Set[str]]:
+        return buckets.setdefault(day, {'urls': set(), 'hashes': set()})
+
+    if 'buckets' in data:
+        for day, stored in data['buckets'].items():
+            bucket(day)['urls'].update(stored.get('urls', []))
+            bucket(day)['hashes'].update(stored.get('hashes', []))
+    else:
+        today = datetime.now().date().isoformat()
+        metadata = data.get('article_metadata', {})
+        for url in data.get('processed_urls', []):
+            bucket((metadata.get(url, {}).get('processed_at') or '')[:10] or today)['urls'].add(url)
+        bucket(today)['hashes'].update(data.get('processed_hashes', []))
+
+    expired = 0
+    for day in [day for day in buckets if cutoff and day < cutoff]:
+        dropped = buckets.pop(day)
+        expired += len(dropped['urls']) + len(dropped['hashes'])
+    return buckets, expired
+
+def write_snapshot(path: str, data: Dict):
+    """Write a JSON snapshot to a temporary file and swap it in with os.replace"""
+    data['last_updated'] = datetime.now().isoformat()
+    temp_file = f"{path}.tmp"
+    with open(temp_file, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_file, path)
+
+class HistoryStore(ABC):
+    """
+    Interface of the dedup history backends
+
+    A store only holds normalized URLs and content hashes by the day they
+    were marked. ArticleDeduplicator decides what is marked, when the store
+    is persisted and what retention window applies. Days are ISO dates.
+    """
+
+    name = 'article'
+    # Whether a Bloom filter in front of the store can be seeded from it
+    supports_bloom_filter = False
+
+    def wants_snapshot(self) -> bool:
+        """Whether load() should be given the JSON snapshot"""
+        return True
+
+    @abstractmethod
+    def load(self, data: Dict, cutoff: Optional[str] = None) -> int:
+        """Load a JSON snapshot, skipping entries before ``cutoff``; returns how many were skipped"""
+
+    @abstractmethod
+    def add(self, record: Dict, day: str):
+        """Add one marked article (a journal record: url, hash, processed_at, source, title)"""
+
+    @abstractmethod
+    def has_url(self, normalized_url: str) -> bool:
+        """Whether a normalized URL was marked"""
+
+    @abstractmethod
+    def has_hash(self, content_hash: str) -> bool:
+        """Whether a content hash was marked"""
+
+    @abstractmethod
+    def drop_before(self, cutoff: str) -> int:
+        """Forget entries last marked before ``cutoff``; returns how many were removed"""
+
+    @abstractmethod
+    def save(self, path: str, cutoff: Optional[str] = None):
+        """Persist the history; ``path`` is the JSON snapshot, ``cutoff`` the retention window's first day"""
+
+    @abstractmethod
+    def clear(self):
+        """Forget everything, including any file the store keeps itself"""
+
+    @abstractmethod
+    def stats(self) -> Dict:
+        """Counts reported by ArticleDeduplicator.get_stats"""
+
+    def close(self):
+        """Release mapped files or other handles; most stores hold none"""
+
+    @abstractmethod
+    def __len__(self) -> int:
+        """Entries held, for logging"""
+
+class BucketHistoryStore(HistoryStore):
+    """
+    String sets of URLs and hashes, grouped into buckets by day
+
+    An article's URL and content hash share its bucket, so retention drops
+    whole buckets and they expire together. Titles and sources are kept in
+    ``metadata`` for migrations and debugging.
+    """
+
+    name = 'plain'
+    supports_bloom_filter = True
+
+    def __init__(self):
+        self.urls: Set[str] = set()
+        self.hashes: Set[str] = set()
+        self.metadata: Dict[str, Dict] = {}
+        self.buckets: Dict[str, Dict[str, Set[str]]] = {}
+
+    def _bucket(self, day: str) -> Dict[str, Set[str]]:
+        return self.buckets.setdefault(day, {'urls': set(), 'hashes': set()})
+
+    def load(self, data: Dict, cutoff: Optional[str] = None) -> int:
+        buckets, expired = snapshot_buckets(data, cutoff)
+        for day, bucket in buckets.items():
+            self._bucket(day)['urls'].update(bucket['urls'])
+            self._bucket(day)['hashes'].update(bucket['hashes'])
+            self.urls |= bucket['urls']
+            self.hashes |= bucket['hashes']
+        self.metadata = {
+            url: metadata for url, metadata in data.get('article_metadata', {}).items()
+            if url in self.urls
+        }
+        return expired
+
+    def add(self, record: Dict, day: str):
+        url = record.get('url')
+        content_hash = record.get('hash')
+        bucket = self._bucket(day)
+        if url:
+            self.urls.add(url)
+            bucket['urls'].add(url)
+            metadata = {'processed_at': record.get('processed_at'), 'source': record.get('source', '')}
+            if 'title' in record:
+                metadata = {'title': record['title'], **metadata}
+            self.metadata[url] = metadata
+        if content_hash:
+            self.hashes.add(content_hash)
+            bucket['hashes'].add(content_hash)
+
+    def has_url(self, normalized_url: str) -> bool:
+        return normalized_url in self.urls
+
+    def has_hash(self, content_hash: str) -> bool:
+        return content_hash in self.hashes
+
+    def dedup_keys(self) -> Iterator[str]:
+        """Prefixed keys of every URL and hash, for seeding a Bloom filter"""
+        for url in self.urls:
+            yield from dedup_keys(normalized_url=url)
+        for content_hash in self.hashes:
+            yield from dedup_keys(content_hash=content_hash)
+
+    def drop_before(self, cutoff: str) -> int:
+        removed = 0
+        for day in sorted(day for day in self.buckets if day < cutoff):
+            bucket = self.buckets.pop(day)
+            # Only newer buckets remain, since the oldest are dropped first
+            for url in bucket['urls']:
+                if not any(url in other['urls'] for other in self.buckets.values()):
+                    self.urls.discard(url)
+                    self.metadata.pop(url, None)
+                    removed += 1
+            for content_hash in bucket['hashes']:
+                if not any(content_hash in other['hashes'] for other in self.buckets.values()):
+                    self.hashes.discard(content_hash)
+                    removed += 1
+        return removed
+
+    def save(self, path: str, cutoff: Optional[str] = None):
+        write_snapshot(path, {
+            'buckets': {
+                day: {'urls': list(bucket['urls']), 'hashes': list(bucket['hashes'])}
+                for day, bucket in sorted(self.buckets.items())
+            },
+            'article_metadata': self.metadata
+        })
+
+    def clear(self):
+        self.urls.clear()
+        self.hashes.clear()
+        self.metadata.clear()
+        self.buckets.clear()
+
+    def stats(self) -> Dict:
+        return {
+            'total_processed_urls': len(self.urls),
+            'total_processed_hashes': len(self.hashes),
+            'total_articles_tracked': len(self.metadata)
+        }
+
+    def __len__(self) -> int:
+        return len(self.urls)
+
+class CompactHistoryStore(HistoryStore):
+    """
+    8-byte digests of URLs and hashes in the tables of compact_history (needs NumPy)
+
+    Each entry keeps its day and source as column arrays; titles and the
+    URLs themselves are not retained. Plain snapshots are converted on load.
+    """
+
+    name = 'compact'
+
+    def __init__(self):
+        self.history = CompactHistory()
+
+    @property
+    def urls(self):
+        return self.history.urls
+
+    @property
+    def hashes(self):
+        return self.history.hashes
+
+    def load(self, data: Dict, cutoff: Optional[str] = None) -> int:
+        if data.get('format') == 'compact':
+            self.history = CompactHistory.from_dict(data, day_number(cutoff) if cutoff else None)
+            return self.history.expired_on_load
+        buckets, expired = snapshot_buckets(data, cutoff)
+        self.history.load_buckets(buckets)
+        return expired
+
+    def add(self, record: Dict, day: str):
+        self.history.add(record.get('url'), record.get('hash'), day_number(day), record.get('source', ''))
+
+    def has_url(self, normalized_url: str) -> bool:
+        return normalized_url in self.history.urls
+
+    def has_hash(self, content_hash: str) -> bool:
+        return content_hash in self.history.hashes
+
+    def drop_before(self, cutoff: str) -> int:
+        return sum(self.history.drop_before(day_number(cutoff)))
+
+    def save(self, path: str, cutoff: Optional[str] = None):
+        write_snapshot(path, self.history.to_dict())
+
+    def clear(self):
+        self.history = CompactHistory()
+
+    def stats(self) -> Dict:
+        return {
+            'total_processed_urls': len(self.history.urls),
+            'total_processed_hashes': len(self.history.hashes),
+            'total_articles_tracked': len(self.history.urls),
+            'history_bytes': self.history.nbytes
+        }
+
+    def __len__(self) -> int:
+        return len(self.history.urls)
+
+class DigestFileStore(HistoryStore):
+    """
+    Prefixed key digests in a memory-mapped SortedDigestFile
+
+    Opening maps the file, so startup costs the same at any history size
+    and every process reading it shares its pages. New keys sit in the
+    file's delta until save() merges them in; retention is applied at each
+    merge, so expired keys may still match until then. The JSON snapshot is
+    only read once, to seed a new file.
+    """
+
+    name = 'digest file'
+
+    def __init__(self, path: str):
+        self.digests = SortedDigestFile(path)
+        # Set by drop_before and applied at the next merge
+        self.pending_cutoff: Optional[int] = None
+
+    def wants_snapshot(self) -> bool:
+        return not os.path.exists(self.digests.path)
+
+    def load(self, data: Dict, cutoff: Optional[str] = None) -> int:
+        if data.get('format') == 'compact':
+            # Compact snapshots hold unprefixed digests, which the file cannot reuse
+            logger.warning("Cannot migrate a compact article history snapshot into the digest file")
+            return 0
+        buckets, expired = snapshot_buckets(data, cutoff)
+        for day, bucket in buckets.items():
+            self.digests.update((key for url in bucket['urls'] for key in dedup_keys(normalized_url=url)),
+                                day_number(day))
+            self.digests.update((key for value in bucket['hashes'] for key in dedup_keys(content_hash=value)),
+                                day_number(day))
+        self.digests.merge()
+        logger.info(f"Migrated article history into {self.digests.path}")
+        return expired
+
+    def add(self, record: Dict, day: str):
+        self.digests.update(dedup_keys(record.get('url'), record.get('hash')), day_number(day))
+
+    def has_url(self, normalized_url: str) -> bool:
+        return self.digests.might_contain_any(dedup_keys(normalized_url=normalized_url))
+
+    def has_hash(self, content_hash: str) -> bool:
+        return self.digests.might_contain_any(dedup_keys(content_hash=content_hash))
+
+    def drop_before(self, cutoff: str) -> int:
+        cutoff_day = day_number(cutoff)
+        self.pending_cutoff = max(self.pending_cutoff or 0, cutoff_day)
+        return self.digests.count_before(cutoff_day)
+
+    def save(self, path: str, cutoff: Optional[str] = None):
+        cutoff_day = max(day_number(cutoff) if cutoff else 0, self.pending_cutoff or 0)
+        self.digests.merge(cutoff_day or None)
+        self.pending_cutoff = None
+
+    def clear(self):
+        self.digests.clear()
+        self.pending_cutoff = None
+
+    def stats(self) -> Dict:
+        # URLs and hashes share the file, so only the combined count is known
+        return {'total_digests': len(self.digests), 'total_articles_tracked': 0}
+
+    def close(self):
+        self.digests.close()
+
+    def __len__(self) -> int:
+        return len(self.digests)
@@ -0,0 +1,143 @@
+"""
+HTML-to-text conversion for RSS summaries
+Pluggable backends: a fast streaming tokenizer (default), lxml and the original BeautifulSoup path
+"""
+
+import logging
+from html.parser import HTMLParser
+from typing import Callable, Dict, List
+
+logger = logging.getLogger(__name__)
+
+# Elements whose content is never part of the visible text
+SKIPPED_TAGS = {'script', 'style'}
+
+def normalize_whitespace(text: str) -> str:
+    """
+    Collapse whitespace the way the scraper always has
+
+    Lines are stripped, split on runs of two spaces and re-joined with
+    single spaces.
+
+    Args:
+        text: Raw extracted text
+
+    Returns:
+        Normalized single-line text
+    """
+    lines = (line.strip() for line in text.splitlines())
+    chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
+    return ' '.join(chunk for chunk in chunks if chunk)
+
+class _TextTokenizer(HTMLParser):
+    """Streaming tokenizer that keeps text nodes and drops script/style content"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.parts: List[str] = []
+        self.skip_depth = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in SKIPPED_TAGS:
+            self.skip_depth += 1
+
+    def handle_startendtag(self, tag, attrs):
+        # Self-closing <script/> has no content to skip
+        pass
+
+    def handle_endtag(self, tag):
+        if tag in SKIPPED_TAGS and self.skip_depth:
+            self.skip_depth -= 1
+
+    def handle_data(self, data):
+        if not self.skip_depth:
+            self.parts.append(data)
+
+    def unknown_decl(self, data):
+        # BeautifulSoup keeps CDATA sections as text
+        if data.upper().startswith('CDATA[') and not self.skip_depth:
+            self.parts.append(data[6:])
+
+def _fast_text(markup: str) -> str:
+    # Plain-text summaries are common and need no parsing at all
+    if '<' not in markup and '&' not in markup:
+        return markup
+
+    tokenizer = _TextTokenizer()
+    tokenizer.feed(markup)
+    tokenizer.close()
+    return ''.join(tokenizer.parts)
+
+def _bs4_text(markup: str) -> str:
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(markup, 'html.parser')
+    # Remove script and style elements
+    for script in soup(list(SKIPPED_TAGS)):
+        script.decompose()
+    return soup.get_text()
+
+def _lxml_text(markup: str) -> str:
+    from lxml import etree, html
+
+    if '<' not in markup and '&' not in markup:
+        return markup
+
+    tree = html.fragment_fromstring(markup, create_parent='div')
+    etree.strip_elements(tree, *SKIPPED_TAGS, with_tail=False)
+    return tree.text_content()
+
+BACKENDS: Dict[str, Callable[[str], str]] = {
+    'fast': _fast_text,
+    'bs4': _bs4_text,
+    'lxml': _lxml_text,
+}
+
+_default_backend = 'fast'
+
+def register_backend(name: str, extractor: Callable[[str], str]):
+    """
+    Register an HTML-to-text backend
+
+    Args:
+        name: Backend name used in config.json
+        extractor: Function returning the raw (un-normalized) text of a fragment
+    """
+    BACKENDS[name] = extractor
+
+def set_default_backend(name: str):
+    """Select the backend html_to_text uses when none is given"""
+    global _default_backend
+    if name not in BACKENDS:
+        logger.warning(f"Unknown HTML text backend '{name}', keeping '{_default_backend}'")
+        return
+    _default_backend = name
+
+def get_default_backend() -> str:
+    """Name of the backend html_to_text uses when none is given"""
+    return _default_backend
+
+def html_to_text(markup: str, backend: str = None) -> str:
+    """
+    Convert an HTML fragment to normalized plain text
+
+    Args:
+        markup: HTML (or plain text) fragment
+        backend: Backend name; defaults to the configured backend
+
+    Returns:
+        Visible text with script/style content removed and whitespace normalized
+    """
+    if not markup:
+        return ''
+
+    name = backend or _default_backend
+    try:
+        text = BACKENDS[name](markup)
+    except ImportError:
+        logger.warning(f"HTML text backend '{name}' is not installed, falling back to 'fast'")
+        if name == _default_backend:
+            set_default_backend('fast')
+        text = _fast_text(markup)
+
+    return normalize_whitespace(text)
@@ -0,0 +1,238 @@
+"""
+Shared HTTP client for the scraper
+Pooled keep-alive connections, compressed transfers and per-host rate limiting
+"""
+
+import codecs
+import logging
+import re
+import threading
+import time
+from typing import Dict, Iterable, Tuple
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.request import ACCEPT_ENCODING
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_USER_AGENT = "Mozilla/5.0 (compatible; PlannerPulse/0.1; +https://github.com/Rutherford/PlannerPulse)"
+
+# Article pages larger than this are truncated; the article text is near the top
+DEFAULT_MAX_PAGE_BYTES = 2 * 1024 * 1024
+HTML_CONTENT_TYPES = ('text/html', 'application/xhtml+xml')
+STREAM_CHUNK_SIZE = 64 * 1024
+
+_META_CHARSET = re.compile(rb'<meta[^>]+charset=["\']?([A-Za-z0-9_.:-]+)', re.IGNORECASE)
+
+class ContentRejected(requests.exceptions.RequestException):
+    """Response skipped because its content type is not one the caller accepts"""
+
+def _stream_encoding(response: requests.Response, head: bytes) -> str:
+    """
+    Pick the charset for decoding a streamed body
+
+    An explicit charset in Content-Type wins, then a <meta charset> in the
+    first chunk, then UTF-8.
+    """
+    content_type = response.headers.get('Content-Type', '')
+    if 'charset=' in content_type.lower():
+        charset = content_type.lower().split('charset=', 1)[1].split(';')[0].strip(' "\'')
+    else:
+        match = _META_CHARSET.search(head)
+        charset = match.group(1).decode('ascii') if match else 'utf-8'
+
+    try:
+        return codecs.lookup(charset).name
+    except LookupError:
+        return 'utf-8'
+
+class TokenBucket:
+    """Thread-safe token bucket; acquire() blocks until a token is available"""
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = max(1, capacity)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Take one token, sleeping until the bucket has refilled enough"""
+        if self.rate <= 0:
+            return
+
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                delay = (1 - self.tokens) / self.rate
+            time.sleep(delay)
+
+class HttpClient:
+    """One pooled requests session shared by every scraper download"""
+
+    def __init__(self, user_agent: str = DEFAULT_USER_AGENT, pool_size: int = 20,
+                 rate_per_host: float = 2.0, burst_per_host: int = 5,
+                 max_page_bytes: int = DEFAULT_MAX_PAGE_BYTES):
+        """
+        Args:
+            user_agent: User-Agent header sent with every request
+            pool_size: Keep-alive connections kept per host
+            rate_per_host: Sustained requests per second allowed per host (0 = unlimited)
+            burst_per_host: Requests a host may receive back-to-back before throttling
+            max_page_bytes: Default byte cap for get_text downloads
+        """
+        self.rate_per_host = rate_per_host
+        self.burst_per_host = burst_per_host
+        self.max_page_bytes = max_page_bytes
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._lock = threading.Lock()
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        # urllib3 advertises (and transparently decodes) brotli only when the
+        # brotli package (a declared dependency) can be imported; without it
+        # transfers fall back to gzip/deflate
+        self.session.headers.update({
+            'User-Agent': user_agent,
+            'Accept-Encoding': ACCEPT_ENCODING
+        })
+
+    def _bucket_for(self, url: str) -> TokenBucket:
+        host = urlparse(url).netloc.lower()
+        with self._lock:
+            if host not in self._buckets:
+                self._buckets[host] = TokenBucket(self.rate_per_host, self.burst_per_host)
+            return self._buckets[host]
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """Send a rate-limited request through the shared session"""
+        self._bucket_for(url).acquire()
+        return self.session.request(method, url, **kwargs)
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        kwargs.setdefault('allow_redirects', True)
+        return self.request('GET', url, **kwargs)
+
+    def get_text(self, url: str, max_bytes: int = None,
+                 content_types: Iterable[str] = HTML_CONTENT_TYPES,
+                 **kwargs) -> Tuple[requests.Response, str]:
+        """
+        Stream a text response, decoding it incrementally up to a byte cap
+
+        The body is never held in memory as a whole: chunks are decoded as
+        they arrive and the download stops once ``max_bytes`` (decompressed)
+        have been read. Responses whose Content-Type is not in
+        ``content_types`` are rejected before any of the body is read.
+
+        Args:
+            url: URL to fetch
+            max_bytes: Maximum body bytes to read, defaulting to the client's
+                max_page_bytes; longer bodies are truncated
+            content_types: Accepted media types (None accepts anything)
+            **kwargs: Further arguments for requests (timeout, headers, ...)
+
+        Returns:
+            Tuple of (response, decoded text); the text is '' for non-2xx responses
+
+        Raises:
+            ContentRejected: If the response has an unaccepted content type
+        """
+        max_bytes = max_bytes or self.max_page_bytes
+        response = self.get(url, stream=True, **kwargs)
+        try:
+            if not 200 <= response.status_code < 300:
+                return response, ''
+
+            media_type = response.headers.get('Content-Type', '').split(';')[0].strip().lower()
+            if content_types and media_type and media_type not in content_types:
+                raise ContentRejected(f"Unsupported content type {media_type} for {url}",
+                                      response=response)
+
+            parts = []
+            received = 0
+            decoder = None
+            for chunk in response.iter_content(STREAM_CHUNK_SIZE):
+                if decoder is None:
+                    decoder = codecs.getincrementaldecoder(_stream_encoding(response, chunk))(errors='replace')
+                chunk = chunk[:max_bytes - received]
+                received += len(chunk)
+                parts.append(decoder.decode(chunk))
+                if received >= max_bytes:
+                    logger.debug(f"Truncated {url} at {max_bytes} bytes")
+                    break
+            if decoder is not None:
+                parts.append(decoder.decode(b'', final=True))
+
+            return response, ''.join(parts)
+        finally:
+            # Closing the streamed response returns (or drops) the pooled connection
+            response.close()
+
+    def head(self, url: str, **kwargs) -> requests.Response:
+        kwargs.setdefault('allow_redirects', False)
+        return self.request('HEAD', url, **kwargs)
+
+    def close(self):
+        """Close all pooled connections"""
+        self.session.close()
+
+_client = None
+_client_options = None
+_client_lock = threading.Lock()
+
+def get_http_client() -> HttpClient:
+    """Get the process-wide HTTP client, creating it with defaults if needed"""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = HttpClient()
+        return _client
+
+def configure_http_client(settings: Dict = None) -> HttpClient:
+    """
+    Configure the process-wide HTTP client
+
+    The current client, with its warm connection pool, is kept when the
+    settings have not changed, so a long-running process calling this once
+    per run does not open a new session each time. Otherwise the previous
+    client is closed once it has been replaced.
+
+    Args:
+        settings: The "http" section of config.json
+
+    Returns:
+        The configured client
+    """
+    global _client, _client_options
+    settings = settings or {}
+    options = {
+        'user_agent': settings.get('user_agent', DEFAULT_USER_AGENT),
+        'pool_size': settings.get('pool_size', 20),
+        'rate_per_host': settings.get('rate_per_host', 2.0),
+        'burst_per_host': settings.get('burst_per_host', 5),
+        'max_page_bytes': settings.get('max_page_kb', DEFAULT_MAX_PAGE_BYTES // 1024) * 1024
+    }
+
+    with _client_lock:
+        if _client is not None and options == _client_options:
+            return _client
+        previous = _client
+        _client = HttpClient(**options)
+        _client_options = options
+        client = _client
+
+    if previous is not None:
+        previous.close()
+
+    logger.info(f"HTTP client configured (pool size {settings.get('pool_size', 20)}, "
+                f"{settings.get('rate_per_host', 2.0)} req/s per host)")
+    return client
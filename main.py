@@ -4,15 +4,29 @@ Planner Pulse - AI-Powered Newsletter Generator
 Main orchestration script for generating newsletters
 """
 
+import calendar
 import json
 import logging
 import sys
+from concurrent.futures import Future
 from datetime import datetime
+from typing import Any, Dict, Iterator, List, Tuple
 
-from scraper import fetch_articles
-from summarizer import summarize_article, generate_subject_line
+from scraper import fetch_feeds, iter_feed_results
+from article_cache import ArticleCache
+from feed_cache import FeedCache
+from near_duplicate import NearDuplicateIndex
+from story_clusters import StoryClusterer, cluster_members
+from bloom_filter import ScalableBloomFilter
+from digest_file import SortedDigestFile
+from feed_scheduler import FeedScheduler
+from circuit_breaker import HALF_OPEN, CircuitBreaker
+from http_client import configure_http_client
+from extraction import configure_extraction
+from html_text import set_default_backend
+from summarizer import SummaryStream, generate_subject_line
 from builder import build_newsletter
-from database import DatabaseArticleManager, DatabaseSponsorManager, DatabaseNewsletterManager
+from database import DatabaseArticleManager, DatabaseSponsorManager, DatabaseNewsletterManager, DatabaseRSSManager
 
 # Setup logging
 logging.basicConfig(
@@ -39,6 +53,175 @@ def load_config():
         logger.error(f"Invalid JSON in config.json: {e}")
         raise
 
+def get_scraper_options(config: Dict, feed_cache: FeedCache = None,
+                        article_cache: ArticleCache = None) -> Dict:
+    """Build scraper keyword arguments from the "scraper" section of config.json"""
+    scraper_settings = config.get("scraper", {})
+    return {
+        'max_workers': scraper_settings.get("max_workers", 8),
+        'per_host_limit': scraper_settings.get("per_host_limit", 2),
+        'feed_cache': feed_cache,
+        'full_text_workers': scraper_settings.get("full_text_workers", 4),
+        'full_text_timeout': scraper_settings.get("full_text_timeout", 60),
+        'article_cache': article_cache,
+        'time_budget': scraper_settings.get("time_budget")
+    }
+
+def get_high_water_marks(sources_by_url: Dict) -> Dict[str, Dict]:
+    """Build scraper high-water marks from the RSSSource rows of the last completed run"""
+    marks = {}
+    for url, source in sources_by_url.items():
+        if source.last_seen_guid or source.last_seen_published:
+            published = source.last_seen_published
+            marks[url] = {
+                'guid': source.last_seen_guid,
+                'published': calendar.timegm(published.timetuple()) if published else None
+            }
+    return marks
+
+def record_feed_results(feed_results: Iterator[Tuple[int, Dict]], rss_manager: DatabaseRSSManager,
+                        scheduler: FeedScheduler, breaker: CircuitBreaker, sources_by_url: Dict,
+                        seen_marks: Dict[str, Dict] = None) -> Iterator[Tuple[int, Dict]]:
+    """
+    Store each feed's fetch status, next poll time and circuit state as results arrive
+    
+    Args:
+        feed_results: (source index, feed result) pairs from iter_feed_results
+        rss_manager: Database RSS source manager
+        scheduler: Scheduler that plans the next fetch of each source
+        breaker: Circuit breaker that tracks failing sources
+        sources_by_url: RSSSource rows keyed by feed URL
+        seen_marks: Optional dictionary collecting each feed's new high-water
+            mark; marks are only stored once the run has completed
+    
+    Yields:
+        The feed results, unchanged
+    """
+    for feed_index, result in feed_results:
+        source = sources_by_url.get(result['url'])
+        if source is not None:
+            plan = scheduler.plan_next_fetch(source, result)
+            plan.update(breaker.record_result(source, result['status'], plan['consecutive_failures']))
+            rss_manager.update_fetch_status(
+                source.id,
+                result['status'],
+                error_message=result.get('error'),
+                articles_fetched=len(result['articles']) if result['status'] == 'success' else 0,
+                **plan
+            )
+        if seen_marks is not None and result['status'] == 'success' and result.get('high_water_mark'):
+            seen_marks[result['url']] = result['high_water_mark']
+        yield feed_index, result
+
+def merge_summary(article: Dict, summary_data) -> Dict:
+    """Combine an article with summarizer output"""
+    # Handle both old string format and new dict format
+    if isinstance(summary_data, dict):
+        return {
+            **article,
+            'summary': summary_data.get('summary', ''),
+            'takeaway': summary_data.get('takeaway', '')
+        }
+    # Legacy string format
+    return {
+        **article,
+        'summary': summary_data
+    }
+
+def collect_summaries(stream: SummaryStream, pending: Dict[Future, Tuple[Any, Dict]],
+                      clusterer: StoryClusterer = None) -> List[Dict]:
+    """
+    Wait for submitted summaries and merge them into their articles
+    
+    Args:
+        stream: Stream the articles were submitted to
+        pending: Summary future -> (sort key, article)
+        clusterer: Clusterer the articles came from; a failed representative is
+            replaced by the next story in its cluster, which is submitted in its place
+    
+    Returns:
+        Summarized articles ordered by sort key; those that failed are left out
+    """
+    summaries = []
+    while pending:
+        future = next(iter(pending))
+        order, article = pending.pop(future)
+        try:
+            summary_data = future.result()
+            if summary_data:
+                summaries.append((order, merge_summary(article, summary_data)))
+                continue
+        except Exception as e:
+            logger.error(f"Failed to summarize article '{article['title']}': {e}")
+        successor = clusterer.promote(article) if clusterer else None
+        if successor:
+            pending[stream.submit(successor)] = (order, successor)
+    
+    summaries.sort(key=lambda item: item[0])
+    return [summary for _, summary in summaries]
+
+def summarize_new_articles(new_articles: List[Dict], pipeline_settings: Dict = None,
+                           clusterer: StoryClusterer = None) -> List[Dict]:
+    """
+    Summarize articles concurrently, keeping their order
+    
+    Args:
+        new_articles: Deduplicated articles
+        pipeline_settings: "pipeline" section of config.json (concurrency and rate limits)
+        clusterer: Clusterer the articles came from (see collect_summaries)
+    
+    Returns:
+        Summarized articles; those that failed are left out
+    """
+    with SummaryStream.from_config(pipeline_settings or {}) as stream:
+        pending = {stream.submit(article): (position, article) for position, article in enumerate(new_articles)}
+        return collect_summaries(stream, pending, clusterer)
+
+def summarize_feed_stream(feed_results: Iterator[Tuple[int, Dict]], article_manager: DatabaseArticleManager,
+                          pipeline_settings: Dict = None,
+                          near_duplicates: NearDuplicateIndex = None,
+                          clusterer: StoryClusterer = None) -> Tuple[int, List[Dict]]:
+    """
+    Deduplicate and summarize feeds as they arrive from the scraper
+    
+    Each feed is deduplicated as soon as it completes and its new articles are
+    submitted to one SummaryStream for the whole run, so LLM calls overlap with
+    the feeds that are still downloading and share the run's rate limits.
+    
+    Args:
+        feed_results: (source index, feed result) pairs from iter_feed_results
+        article_manager: Database article manager used for deduplication
+        pipeline_settings: "pipeline" section of config.json (concurrency and rate limits)
+        near_duplicates: Optional index used to drop syndicated copies of a story
+        clusterer: Optional clusterer; only one story per topic is summarized, and a
+            failed representative is replaced by the next story in its cluster
+    
+    Returns:
+        Tuple of (new article count, summaries ordered by source and feed position)
+    """
+    raw_count = 0
+    new_count = 0
+    pending = {}
+    seen = {}
+    
+    with SummaryStream.from_config(pipeline_settings or {}) as stream:
+        for feed_index, result in feed_results:
+            raw_count += len(result['articles'])
+            new_articles = article_manager.filter_new_articles(result['articles'], seen)
+            if near_duplicates:
+                new_articles = near_duplicates.filter_near_duplicates(new_articles)
+            new_count += len(new_articles)
+            logger.info(f"{result['title']}: {len(new_articles)} new of {len(result['articles'])} articles")
+            if clusterer:
+                # Later members are attached to representatives already being summarized
+                new_articles = clusterer.cluster(new_articles)
+            
+            for position, article in enumerate(new_articles):
+                pending[stream.submit(article)] = ((feed_index, position), article)
+        
+        logger.info(f"Fetched {raw_count} raw articles, {new_count} new after deduplication")
+        return new_count, collect_summaries(stream, pending, clusterer)
+
 def run_newsletter_generation():
     """Main function to orchestrate newsletter generation"""
     try:
@@ -48,53 +231,120 @@ def run_newsletter_generation():
         config = load_config()
         
         # Initialize database components using context managers
-        with DatabaseArticleManager() as article_manager, \
+        dedup_settings = config.get("deduplication", {})
+        bloom_settings = config.get("bloom_filter", {})
+        bloom_filter = ScalableBloomFilter.from_config(bloom_settings) if bloom_settings.get("enabled", False) else None
+        digest_settings = config.get("digest_index", {})
+        digest_index = SortedDigestFile.from_config(digest_settings) if digest_settings.get("enabled", False) else None
+        with DatabaseArticleManager(dedup_settings.get("simhash_distance", 3), bloom_filter,
+                                    digest_index) as article_manager, \
              DatabaseSponsorManager() as sponsor_manager, \
-             DatabaseNewsletterManager() as newsletter_manager:
+             DatabaseNewsletterManager() as newsletter_manager, \
+             DatabaseRSSManager() as rss_manager:
             
             # Fetch articles from RSS sources
-            logger.info("Fetching articles from RSS sources")
-            raw_articles = fetch_articles(config["sources"])
-            logger.info(f"Fetched {len(raw_articles)} raw articles")
-            
-            # Deduplicate articles using database
-            logger.info("Deduplicating articles")
-            new_articles = article_manager.filter_new_articles(raw_articles)
-            logger.info(f"Found {len(new_articles)} new articles after deduplication")
+            scraper_settings = config.get("scraper", {})
+            pipeline_settings = config.get("pipeline", {})
+            configure_http_client(config.get("http", {}))
+            configure_extraction(config.get("extraction", {}))
+            set_default_backend(scraper_settings.get("html_backend", "fast"))
+            feed_cache = None
+            if scraper_settings.get("conditional_get", True):
+                feed_cache = FeedCache(scraper_settings.get("feed_cache_file", "data/feed_cache.json"))
+            article_cache = None
+            cache_settings = config.get("article_cache", {})
+            if cache_settings.get("enabled", True):
+                article_cache = ArticleCache(
+                    cache_settings.get("directory", "data/article_cache"),
+                    max_size_mb=cache_settings.get("max_size_mb", 200),
+                    ttl_hours=cache_settings.get("ttl_hours", 72)
+                )
+            scraper_options = get_scraper_options(config, feed_cache, article_cache)
+            near_duplicates = None
+            near_duplicate_settings = config.get("near_duplicate", {})
+            if near_duplicate_settings.get("enabled", False):
+                near_duplicates = NearDuplicateIndex(
+                    near_duplicate_settings.get("index_file", "data/near_duplicate_index.json"),
+                    threshold=near_duplicate_settings.get("threshold", 0.6),
+                    num_perm=near_duplicate_settings.get("num_perm", 128)
+                )
+            clustering_settings = config.get("clustering", {})
+            clusterer = StoryClusterer.from_config(clustering_settings) if clustering_settings.get("enabled", False) else None
             
-            if not new_articles:
-                logger.warning("No new articles found. Newsletter generation skipped.")
+            # Skip sources with an open circuit, then poll only those whose learned
+            # interval or backoff has elapsed; half-open probes ignore the schedule
+            scheduler_settings = config.get("scheduler", {})
+            scheduler = FeedScheduler.from_config(scheduler_settings)
+            breaker = CircuitBreaker.from_config(config.get("circuit_breaker", {}))
+            sources_by_url = rss_manager.get_sources_by_url(config["sources"])
+            sources = breaker.filter_urls(config["sources"], sources_by_url)
+            if scheduler_settings.get("enabled", False):
+                due = set(scheduler.due_urls(sources, sources_by_url))
+                sources = [
+                    url for url in sources
+                    if url in due or breaker.current_state(sources_by_url.get(url)) == HALF_OPEN
+                ]
+            if not sources:
+                logger.warning("No RSS sources are due yet. Newsletter generation skipped.")
                 return False
             
-            # Summarize articles using GPT-4o
-            logger.info("Summarizing articles with GPT-4o")
-            summaries = []
-            successful_summaries = 0
+            # Skip entries already seen on the last completed run
+            seen_marks = {}
+            if scraper_settings.get("incremental", True):
+                scraper_options['high_water_marks'] = get_high_water_marks(sources_by_url)
             
-            for i, article in enumerate(new_articles):
-                try:
-                    logger.info(f"Summarizing article {i+1}/{len(new_articles)}: {article['title']}")
-                    summary_data = summarize_article(article)
-                    if summary_data:
-                        # Handle both old string format and new dict format
-                        if isinstance(summary_data, dict):
-                            summaries.append({
-                                **article,
-                                'summary': summary_data.get('summary', ''),
-                                'takeaway': summary_data.get('takeaway', '')
-                            })
-                        else:
-                            # Legacy string format
-                            summaries.append({
-                                **article,
-                                'summary': summary_data
-                            })
-                        successful_summaries += 1
-                except Exception as e:
-                    logger.error(f"Failed to summarize article '{article['title']}': {e}")
-                    continue
+            if pipeline_settings.get("streaming", False):
+                # Deduplicate and summarize each feed while the others are still downloading
+                logger.info("Fetching, deduplicating and summarizing articles as a stream")
+                new_article_count, summaries = summarize_feed_stream(
+                    record_feed_results(
+                        iter_feed_results(sources, **scraper_options),
+                        rss_manager, scheduler, breaker, sources_by_url, seen_marks
+                    ),
+                    article_manager,
+                    pipeline_settings,
+                    near_duplicates,
+                    clusterer
+                )
+                
+                if not new_article_count:
+                    # Everything fetched was a duplicate, so nothing is lost by moving the marks
+                    rss_manager.update_high_water_marks(seen_marks)
+                    logger.warning("No new articles found. Newsletter generation skipped.")
+                    return False
+            else:
+                logger.info("Fetching articles from RSS sources")
+                feed_results = [
+                    result for _, result in record_feed_results(
+                        enumerate(fetch_feeds(sources, **scraper_options)),
+                        rss_manager, scheduler, breaker, sources_by_url, seen_marks
+                    )
+                ]
+                raw_articles = [article for result in feed_results for article in result['articles']]
+                logger.info(f"Fetched {len(raw_articles)} raw articles")
+                
+                # Deduplicate articles using database
+                logger.info("Deduplicating articles")
+                new_articles = article_manager.filter_new_articles(raw_articles)
+                if near_duplicates:
+                    new_articles = near_duplicates.filter_near_duplicates(new_articles)
+                logger.info(f"Found {len(new_articles)} new articles after deduplication")
+                
+                if not new_articles:
+                    # Everything fetched was a duplicate, so nothing is lost by moving the marks
+                    rss_manager.update_high_water_marks(seen_marks)
+                    logger.warning("No new articles found. Newsletter generation skipped.")
+                    return False
+                
+                if clusterer:
+                    # Stories about the same event share one summary
+                    new_articles = clusterer.cluster(new_articles)
+                
+                # Summarize articles using GPT-4o
+                logger.info("Summarizing articles with GPT-4o")
+                summaries = summarize_new_articles(new_articles, pipeline_settings, clusterer)
             
-            logger.info(f"Successfully summarized {successful_summaries} articles")
+            logger.info(f"Successfully summarized {len(summaries)} articles")
             
             if not summaries:
                 logger.error("No articles were successfully summarized")
@@ -138,6 +388,14 @@ def run_newsletter_generation():
                 saved_newsletter = newsletter_manager.save_newsletter(newsletter_data_db, summaries)
                 if saved_newsletter:
                     logger.info(f"Saved newsletter to database with ID: {saved_newsletter.id}")
+                    # Clustered stories were not summarized, but must not come back as new
+                    for member in cluster_members(summaries):
+                        if not article_manager.is_duplicate(member):
+                            article_manager.save_article(member)
+                    rss_manager.update_high_water_marks(seen_marks)
+                    if near_duplicates:
+                        near_duplicates.cleanup_old_entries(near_duplicate_settings.get("retention_days", 30))
+                        near_duplicates.save()
                 
                 # Rotate to next sponsor
                 old_sponsor = current_sponsor.get('name', 'None') if current_sponsor else 'None'
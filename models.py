@@ -4,10 +4,10 @@ Database models for Planner Pulse newsletter system
 
 import os
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, JSON, ForeignKey
+from sqlalchemy import Column, Integer, BigInteger, String, Text, DateTime, Boolean, JSON, ForeignKey, and_, or_
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, inspect, text
 from sqlalchemy.orm import sessionmaker
 
 Base = declarative_base()
@@ -19,11 +19,19 @@ class Article(Base):
     id = Column(Integer, primary_key=True)
     title = Column(String(500), nullable=False)
     link = Column(String(1000), unique=True, nullable=False)
+    normalized_url = Column(String(1000), index=True)  # link without tracking parameters
     summary = Column(Text)
     full_content = Column(Text)
     source = Column(String(200))
     published_date = Column(String(200))
-    content_hash = Column(String(32))  # MD5 hash for duplicate detection
+    content_hash = Column(String(32), index=True)  # MD5 hash for duplicate detection
+    simhash = Column(BigInteger, index=True)  # 64-bit SimHash of title and summary (signed)
+    
+    # 16-bit SimHash blocks: articles within Hamming distance 3 share at least one
+    simhash_block0 = Column(Integer, index=True)
+    simhash_block1 = Column(Integer, index=True)
+    simhash_block2 = Column(Integer, index=True)
+    simhash_block3 = Column(Integer, index=True)
     
     # Processing metadata
     processed_at = Column(DateTime, default=datetime.utcnow)
@@ -151,6 +159,17 @@ class RSSSource(Base):
     last_fetch_status = Column(String(50))  # success, error, timeout
     last_error_message = Column(Text)
     
+    # Adaptive polling
+    poll_interval_minutes = Column(Integer)  # learned from entry publish times
+    next_fetch_date = Column(DateTime)
+    consecutive_failures = Column(Integer, default=0)  # errors or empty feeds in a row
+    circuit_state = Column(String(20), default='closed')  # closed, open, half_open
+    circuit_opened_at = Column(DateTime)
+    
+    # Incremental processing: newest entry seen on the last completed run
+    last_seen_guid = Column(String(1000))
+    last_seen_published = Column(DateTime)
+    
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
@@ -199,8 +218,105 @@ def init_database():
     """Initialize database tables"""
     engine = create_engine_instance()
     Base.metadata.create_all(engine)
+    upgrade_database(engine)
     print("Database tables created successfully")
 
+def upgrade_database(engine=None):
+    """Add columns and indexes introduced after a table was first created"""
+    engine = engine or create_engine_instance()
+    inspector = inspect(engine)
+    
+    with engine.begin() as connection:
+        for table in Base.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+            
+            existing = {column['name'] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name not in existing:
+                    column_type = column.type.compile(dialect=engine.dialect)
+                    connection.execute(text(
+                        f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}"
+                    ))
+                    print(f"Added column {table.name}.{column.name}")
+            
+            existing_indexes = {index['name'] for index in inspector.get_indexes(table.name)}
+            for index in table.indexes:
+                if index.name not in existing_indexes:
+                    index.create(connection)
+                    print(f"Added index {index.name}")
+    
+    backfill_article_keys(engine)
+
+def set_simhash(article: Article, fingerprint):
+    """Store a SimHash fingerprint and its lookup blocks on an Article row"""
+    from simhash import simhash_blocks
+    
+    article.simhash = fingerprint
+    blocks = simhash_blocks(fingerprint) if fingerprint is not None else (None,) * 4
+    article.simhash_block0, article.simhash_block1, article.simhash_block2, article.simhash_block3 = blocks
+
+def backfill_article_keys(engine=None, batch_size: int = 1000):
+    """
+    Fill dedup keys (normalized URL, content hash, SimHash) for articles stored before they were computed at ingest
+    
+    Incoming articles are keyed on their title and scraped RSS summary. Rows
+    that were published in a newsletter were saved after summarization, so
+    their ``summary`` column holds the GPT summary and the RSS text is gone;
+    neither it nor ``full_content`` reproduces the key of an incoming copy.
+    Those rows only get a normalized URL, and keep a NULL content hash and
+    SimHash (URL matching still catches reposts of them). Unpublished rows,
+    such as clustered stories, were stored with their RSS summary and get
+    all three keys.
+    """
+    from deduplicator import normalize_url, generate_content_hash
+    from simhash import article_simhash
+    
+    engine = engine or create_engine_instance()
+    session = sessionmaker(bind=engine)()
+    updated = 0
+    last_id = 0
+    published = session.query(NewsletterArticle.article_id)
+    
+    try:
+        while True:
+            # Walk by id, since articles without any words keep a NULL SimHash
+            articles = session.query(Article).filter(
+                Article.id > last_id,
+                or_(
+                    Article.normalized_url.is_(None),
+                    and_(Article.simhash.is_(None), ~Article.id.in_(published))
+                )
+            ).order_by(Article.id).limit(batch_size).all()
+            if not articles:
+                break
+            
+            published_ids = {row.article_id for row in published.filter(
+                NewsletterArticle.article_id.in_([article.id for article in articles])
+            )}
+            for article in articles:
+                content = {'title': article.title or '', 'summary': article.summary or ''}
+                if not article.normalized_url:
+                    article.normalized_url = normalize_url(article.link)
+                if article.id in published_ids:
+                    # The summary column holds the GPT summary, not the text incoming copies are keyed on
+                    continue
+                if not article.content_hash:
+                    article.content_hash = generate_content_hash(content)
+                if article.simhash is None:
+                    set_simhash(article, article_simhash(content))
+            session.commit()
+            last_id = articles[-1].id
+            updated += len(articles)
+        
+        if updated:
+            print(f"Backfilled dedup keys for {updated} articles")
+    except Exception as e:
+        session.rollback()
+        print(f"Error backfilling article keys: {e}")
+    finally:
+        session.close()
+
 def migrate_from_json():
     """Migrate existing JSON data to database"""
     from deduplicator import ArticleDeduplicator
@@ -0,0 +1,256 @@
+"""
+Near-duplicate detection for syndicated stories
+MinHash signatures over word shingles with LSH banding, persisted across runs
+"""
+
+import hashlib
+import json
+import logging
+import os
+import random
+import re
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from deduplicator import normalize_url
+
+logger = logging.getLogger(__name__)
+
+# Universal hashing modulo a Mersenne prime, truncated to 32-bit values
+MERSENNE_PRIME = (1 << 61) - 1
+MAX_HASH = (1 << 32) - 1
+
+def _shingle_hash(shingle: str) -> int:
+    # Stable across processes and Python versions, unlike hash()
+    return int.from_bytes(hashlib.blake2b(shingle.encode('utf-8'), digest_size=8).digest(), 'big')
+
+def optimal_bands(num_perm: int, threshold: float) -> Tuple[int, int]:
+    """
+    Choose an LSH banding for a similarity threshold
+
+    With b bands of r rows, pairs become candidates with probability
+    1 - (1 - s^r)^b, a curve whose steep part sits near (1/b)^(1/r). The
+    banding with the most rows whose steep part is still at or below the
+    threshold is used, so true duplicates are rarely missed and candidates
+    are then verified against the threshold.
+
+    Returns:
+        Tuple of (bands, rows per band) with b * r == num_perm
+    """
+    best = (num_perm, 1)
+    for rows in range(1, num_perm + 1):
+        if num_perm % rows:
+            continue
+        bands = num_perm // rows
+        if (1 / bands) ** (1 / rows) <= threshold:
+            best = (bands, rows)
+    return best
+
+class NearDuplicateIndex:
+    """
+    Finds articles whose title and summary are nearly the same as one seen before
+
+    Each article is reduced to a MinHash signature over word shingles. The
+    signature is cut into bands, and articles sharing any band bucket are
+    candidates; only candidates are compared, so lookups do not scan the
+    whole history.
+    """
+
+    def __init__(self, index_file: str = "data/near_duplicate_index.json", threshold: float = 0.6,
+                 num_perm: int = 128, shingle_size: int = 2, seed: int = 1):
+        """
+        Args:
+            index_file: JSON file the index is persisted to
+            threshold: Estimated Jaccard similarity at which articles count as duplicates
+            num_perm: Number of MinHash permutations (signature length)
+            shingle_size: Words per shingle
+            seed: Seed for the permutation coefficients; changing it invalidates the index
+        """
+        self.index_file = index_file
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        self.seed = seed
+        self.bands, self.rows = optimal_bands(num_perm, threshold)
+
+        rng = random.Random(seed)
+        self._permutations = [
+            (rng.randrange(1, MERSENNE_PRIME), rng.randrange(0, MERSENNE_PRIME))
+            for _ in range(num_perm)
+        ]
+
+        self.entries: Dict[str, Dict] = {}
+        self.buckets: Dict[str, set] = {}
+
+        # Ensure data directory exists
+        os.makedirs(os.path.dirname(index_file), exist_ok=True)
+
+        # Load existing index
+        self.load()
+
+    def load(self):
+        """Load signatures from the JSON file and rebuild the band buckets"""
+        try:
+            if os.path.exists(self.index_file):
+                with open(self.index_file, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+
+                if data.get('num_perm') != self.num_perm or data.get('seed') != self.seed \
+                        or data.get('shingle_size') != self.shingle_size:
+                    logger.warning("Near-duplicate index was built with other MinHash settings, starting fresh")
+                    return
+
+                for key, entry in data.get('entries', {}).items():
+                    self._insert(key, entry)
+                logger.info(f"Loaded near-duplicate index with {len(self.entries)} articles")
+            else:
+                logger.info("No existing near-duplicate index found, starting fresh")
+        except Exception as e:
+            logger.error(f"Failed to load near-duplicate index: {e}")
+            self.entries = {}
+            self.buckets = {}
+
+    def save(self):
+        """Save signatures to the JSON file (buckets are rebuilt on load)"""
+        try:
+            data = {
+                'num_perm': self.num_perm,
+                'seed': self.seed,
+                'shingle_size': self.shingle_size,
+                'entries': self.entries,
+                'last_updated': datetime.now().isoformat()
+            }
+
+            temp_file = f"{self.index_file}.tmp"
+            with open(temp_file, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(temp_file, self.index_file)
+
+            logger.debug("Near-duplicate index saved")
+        except Exception as e:
+            logger.error(f"Failed to save near-duplicate index: {e}")
+
+    def shingles(self, article: Dict) -> set:
+        """Word shingles of an article's normalized title and summary"""
+        text = f"{article.get('title', '')} {article.get('summary', '')}".lower()
+        words = re.findall(r'[a-z0-9]+', text)
+        if len(words) < self.shingle_size:
+            return {' '.join(words)} if words else set()
+        return {
+            ' '.join(words[i:i + self.shingle_size])
+            for i in range(len(words) - self.shingle_size + 1)
+        }
+
+    def signature(self, article: Dict) -> List[int]:
+        """MinHash signature of an article"""
+        hashes = [_shingle_hash(shingle) for shingle in self.shingles(article)]
+        if not hashes:
+            return [MAX_HASH] * self.num_perm
+        return [
+            min(((a * value + b) % MERSENNE_PRIME) & MAX_HASH for value in hashes)
+            for a, b in self._permutations
+        ]
+
+    def _band_keys(self, signature: List[int]) -> List[str]:
+        return [
+            f"{band}:{hash(tuple(signature[band * self.rows:(band + 1) * self.rows]))}"
+            for band in range(self.bands)
+        ]
+
+    @staticmethod
+    def similarity(first: List[int], second: List[int]) -> float:
+        """Estimated Jaccard similarity of two signatures"""
+        return sum(1 for a, b in zip(first, second) if a == b) / len(first)
+
+    def _insert(self, key: str, entry: Dict):
+        self.entries[key] = entry
+        for band_key in self._band_keys(entry['signature']):
+            self.buckets.setdefault(band_key, set()).add(key)
+
+    def _remove(self, key: str):
+        entry = self.entries.pop(key, None)
+        if entry:
+            for band_key in self._band_keys(entry['signature']):
+                bucket = self.buckets.get(band_key)
+                if bucket:
+                    bucket.discard(key)
+                    if not bucket:
+                        del self.buckets[band_key]
+
+    def find_duplicate(self, article: Dict, signature: List[int] = None) -> Optional[Tuple[str, float]]:
+        """
+        Find the most similar indexed article above the threshold
+
+        Args:
+            article: Article dictionary with title, summary and link
+            signature: Precomputed signature, if any
+
+        Returns:
+            Tuple of (matching key, estimated similarity), or None. The article
+            itself (same normalized URL) never counts as its own duplicate.
+        """
+        signature = signature or self.signature(article)
+        own_key = normalize_url(article.get('link', ''))
+        candidates = set()
+        for band_key in self._band_keys(signature):
+            candidates |= self.buckets.get(band_key, set())
+        candidates.discard(own_key)
+
+        best = None
+        for key in candidates:
+            score = self.similarity(signature, self.entries[key]['signature'])
+            if score >= self.threshold and (best is None or score > best[1]):
+                best = (key, score)
+        return best
+
+    def add(self, article: Dict, signature: List[int] = None):
+        """Index an article under its normalized URL"""
+        key = normalize_url(article.get('link', ''))
+        self._remove(key)
+        self._insert(key, {
+            'signature': signature or self.signature(article),
+            'title': article.get('title', ''),
+            'added_at': datetime.now().isoformat()
+        })
+
+    def filter_near_duplicates(self, articles: List[Dict]) -> List[Dict]:
+        """
+        Drop articles that nearly duplicate an indexed article or an earlier one in the batch
+
+        Kept articles are added to the in-memory index; call save() once the
+        run has succeeded to persist them.
+
+        Args:
+            articles: Candidate articles (already exact-deduplicated)
+
+        Returns:
+            Articles that are not near-duplicates, in input order
+        """
+        unique_articles = []
+        for article in articles:
+            signature = self.signature(article)
+            match = self.find_duplicate(article, signature)
+            if match:
+                key, score = match
+                logger.info(f"Skipping near-duplicate '{article.get('title', '')}' "
+                            f"(similar to '{self.entries[key]['title']}', {score:.2f})")
+                continue
+            self.add(article, signature)
+            unique_articles.append(article)
+
+        if len(unique_articles) < len(articles):
+            logger.info(f"Filtered out {len(articles) - len(unique_articles)} near-duplicate articles")
+        return unique_articles
+
+    def cleanup_old_entries(self, days_to_keep: int = 30):
+        """Remove articles indexed more than ``days_to_keep`` days ago"""
+        cutoff = datetime.now() - timedelta(days=days_to_keep)
+        expired = [
+            key for key, entry in self.entries.items()
+            if datetime.fromisoformat(entry['added_at']) < cutoff
+        ]
+        for key in expired:
+            self._remove(key)
+
+        if expired:
+            logger.info(f"Removed {len(expired)} old entries from the near-duplicate index")
@@ -5,61 +5,526 @@ Fetches articles from RSS feeds with fallback handling
 
 import feedparser
 import requests
-import trafilatura
 import logging
-from typing import List, Dict
+import calendar
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Set, Tuple
 from urllib.parse import urlparse
-from bs4 import BeautifulSoup
+
+from article_cache import ArticleCache
+from extraction import get_extraction_executor
+from feed_cache import FeedCache, copy_rss_fields
+from html_text import html_to_text
+from http_client import get_http_client
 
 logger = logging.getLogger(__name__)
 
-def fetch_articles(rss_urls: List[str], max_per_feed: int = 5) -> List[Dict]:
+# Feeds are downloaded through the shared HTTP client so conditional GETs,
+# connection reuse and timeouts apply
+FEED_REQUEST_TIMEOUT = 15
+FEED_REQUEST_HEADERS = {
+    'Accept': 'application/atom+xml,application/rdf+xml,application/rss+xml,'
+              'application/xml;q=0.9,text/xml;q=0.2,*/*;q=0.1'
+}
+
+class HostConcurrencyLimiter:
+    """Caps the number of simultaneous requests made to any single host"""
+    
+    def __init__(self, per_host_limit: int = 2):
+        self.per_host_limit = max(1, per_host_limit)
+        self._semaphores: Dict[str, threading.BoundedSemaphore] = {}
+        self._lock = threading.Lock()
+    
+    def _semaphore_for(self, host: str) -> threading.BoundedSemaphore:
+        with self._lock:
+            if host not in self._semaphores:
+                self._semaphores[host] = threading.BoundedSemaphore(self.per_host_limit)
+            return self._semaphores[host]
+    
+    @contextmanager
+    def slot(self, url: str):
+        """Hold one of the host's request slots for the duration of the block"""
+        semaphore = self._semaphore_for(urlparse(url).netloc.lower())
+        with semaphore:
+            yield
+
+def download_feed(url: str, feed_cache: FeedCache = None) -> requests.Response:
     """
-    Fetch articles from RSS feeds
+    Download a raw RSS feed, sending conditional headers when the feed is cached
     
     Args:
-        rss_urls: List of RSS feed URLs
-        max_per_feed: Maximum articles to fetch per feed
+        url: RSS feed URL
+        feed_cache: Optional cache holding the feed's ETag/Last-Modified
     
     Returns:
-        List of article dictionaries with title, link, summary, source
+        The HTTP response (status 304 when the feed has not changed)
     """
-    articles = []
+    headers = dict(FEED_REQUEST_HEADERS)
+    if feed_cache:
+        headers.update(feed_cache.conditional_headers(url))
+    
+    return get_http_client().get(url, headers=headers, timeout=FEED_REQUEST_TIMEOUT)
+
+def fetch_feed(url: str, max_per_feed: int = 5, host_limiter: HostConcurrencyLimiter = None,
+               feed_cache: FeedCache = None, high_water_mark: Dict = None) -> Dict:
+    """
+    Fetch and parse a single RSS feed
+    
+    When a feed cache is supplied the request is conditional; a 304 response
+    or a body identical to the cached one short-circuits parsing and returns
+    the articles extracted the last time the feed changed. When a high-water
+    mark is supplied, entries at or below it are skipped before extraction.
+    
+    Args:
+        url: RSS feed URL
+        max_per_feed: Maximum articles to take from the feed
+        host_limiter: Optional limiter bounding concurrent requests per host
+        feed_cache: Optional conditional-GET cache
+        high_water_mark: Optional newest entry seen on an earlier run, as
+            {'guid': ..., 'published': UTC epoch seconds}
+    
+    Returns:
+        Dictionary with url, title, status ('success', 'not_modified', 'empty'
+        or 'error'), articles, entry_times (publish times of every entry in
+        the feed, as UTC epoch seconds), high_water_mark (newest entry in
+        this version of the feed, or None) and error message
+    """
+    result = _new_feed_result(url)
+    
+    try:
+        logger.info(f"Fetching from RSS feed: {url}")
+        if host_limiter:
+            with host_limiter.slot(url):
+                response = download_feed(url, feed_cache)
+        else:
+            response = download_feed(url, feed_cache)
+        
+        cached = feed_cache.get(url) if feed_cache else None
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+        
+        if cached and response.status_code == 304:
+            logger.info(f"Feed not modified since last fetch: {url}")
+            feed_cache.touch(url, etag, last_modified)
+            return _cached_feed_result(result, cached)
+        
+        response.raise_for_status()
+        body_hash = FeedCache.hash_body(response.content)
+        
+        if cached and feed_cache.is_unchanged(url, body_hash):
+            logger.info(f"Feed body unchanged since last fetch: {url}")
+            feed_cache.touch(url, etag, last_modified)
+            return _cached_feed_result(result, cached)
+        
+        response_headers = {key.lower(): value for key, value in response.headers.items()}
+        response_headers.setdefault('content-location', response.url)
+        feed = feedparser.parse(response.content, response_headers=response_headers)
+        
+        if feed.bozo:
+            logger.warning(f"RSS feed may have issues: {url}")
+        
+        feed_title = getattr(feed.feed, 'title', urlparse(url).netloc)
+        result['title'] = feed_title
+        logger.info(f"Found {len(feed.entries)} entries in {feed_title}")
+        
+        entries = new_entries(feed.entries, high_water_mark)
+        if len(entries) < len(feed.entries):
+            logger.info(f"Skipping {len(feed.entries) - len(entries)} already seen entries in {feed_title}")
+        
+        for entry in entries[:max_per_feed]:
+            try:
+                article = extract_article_data(entry, feed_title, clean_summary=False)
+                if article:
+                    result['articles'].append(article)
+            except Exception as e:
+                logger.error(f"Error processing entry from {url}: {e}")
+                continue
+        
+        # Strip markup for the whole feed in one batch (offloaded to worker processes when configured)
+        summaries = get_extraction_executor().clean_summaries(
+            [article['summary'] for article in result['articles']]
+        )
+        for article, summary in zip(result['articles'], summaries):
+            article['summary'] = summary
+        
+        result['entry_times'] = [
+            timestamp for timestamp in (entry_timestamp(entry) for entry in feed.entries)
+            if timestamp is not None
+        ]
+        result['high_water_mark'] = newest_entry_mark(feed.entries) or high_water_mark
+        result['status'] = 'success' if feed.entries else 'empty'
+        
+        if feed_cache:
+            feed_cache.update(url, etag, last_modified, body_hash, feed_title, result['articles'],
+                              result['entry_times'])
+        
+    except Exception as e:
+        logger.error(f"Failed to fetch RSS feed {url}: {e}")
+        result['error'] = str(e)
+    
+    return result
+
+def _new_feed_result(url: str, status: str = 'error', error: str = None) -> Dict:
+    """Create a per-feed result with no articles"""
+    return {
+        'url': url,
+        'title': urlparse(url).netloc,
+        'status': status,
+        'articles': [],
+        'entry_times': [],
+        'high_water_mark': None,
+        'error': error
+    }
+
+def _cached_feed_result(result: Dict, cached: Dict) -> Dict:
+    """Fill a feed result from its cache entry"""
+    result['title'] = cached.get('title') or result['title']
+    result['articles'] = copy_rss_fields(cached.get('articles', []))
+    result['entry_times'] = list(cached.get('entry_times', []))
+    result['status'] = 'not_modified'
+    return result
+
+def entry_timestamp(entry) -> Optional[int]:
+    """
+    Get an entry's publish (or update) time
+    
+    Args:
+        entry: RSS feed entry
+    
+    Returns:
+        UTC epoch seconds, or None if the entry carries no usable date
+    """
+    parsed = getattr(entry, 'published_parsed', None) or getattr(entry, 'updated_parsed', None)
+    if not parsed:
+        return None
+    try:
+        return calendar.timegm(parsed)
+    except (TypeError, ValueError, OverflowError):
+        return None
+
+def entry_guid(entry) -> Optional[str]:
+    """Get an entry's GUID, falling back to its link"""
+    return entry.get('id') or entry.get('link') or None
+
+def newest_entry_mark(entries) -> Optional[Dict]:
+    """
+    Build a high-water mark from the newest entry of a feed
+    
+    Args:
+        entries: Parsed feed entries
+    
+    Returns:
+        Dictionary with guid and published (UTC epoch seconds or None), or
+        None for an empty feed
+    """
+    if not entries:
+        return None
+    
+    dated = [(timestamp, entry) for timestamp, entry in
+             ((entry_timestamp(entry), entry) for entry in entries) if timestamp is not None]
+    if dated:
+        published, newest = max(dated, key=lambda item: item[0])
+    else:
+        # Undated feeds list their newest entry first
+        published, newest = None, entries[0]
+    
+    return {'guid': entry_guid(newest), 'published': published}
+
+def new_entries(entries, high_water_mark: Dict = None) -> List:
+    """
+    Drop entries at or below a feed's high-water mark
+    
+    Dated entries are compared by publish time. For entries without a usable
+    date the feed is read newest-first up to the previously newest GUID.
+    
+    Args:
+        entries: Parsed feed entries, in feed order
+        high_water_mark: Mark from an earlier run, or None to keep every entry
+    
+    Returns:
+        Entries newer than the mark, in feed order
+    """
+    if not high_water_mark:
+        return list(entries)
+    
+    mark_guid = high_water_mark.get('guid')
+    mark_published = high_water_mark.get('published')
+    fresh = []
+    
+    for entry in entries:
+        published = entry_timestamp(entry)
+        if mark_published is not None and published is not None:
+            # Entries sharing the mark's timestamp are only skipped if they are the mark
+            if published > mark_published or (published == mark_published and
+                                              entry_guid(entry) != mark_guid):
+                fresh.append(entry)
+            continue
+        if mark_guid and entry_guid(entry) == mark_guid:
+            break
+        fresh.append(entry)
+    
+    return fresh
+
+class FullTextEnricher:
+    """Fetches full article text on its own bounded pool, separate from feed parsing"""
+    
+    def __init__(self, max_workers: int = 4, request_timeout: float = 10,
+                 host_limiter: HostConcurrencyLimiter = None, article_cache: ArticleCache = None):
+        self.request_timeout = request_timeout
+        self.host_limiter = host_limiter
+        self.article_cache = article_cache
+        self._executor = ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="fulltext")
+        self._articles: Dict[Future, Dict] = {}
+    
+    def submit(self, articles: List[Dict]) -> Set[Future]:
+        """
+        Queue full-text fetches for the articles whose summaries are too short
+        
+        Returns:
+            Set of futures, one per queued article page
+        """
+        futures = set()
+        for article in articles:
+            if needs_full_content(article):
+                future = self._executor.submit(self._fetch, article['link'])
+                self._articles[future] = article
+                futures.add(future)
+        return futures
     
-    for url in rss_urls:
+    def _fetch(self, url: str) -> str:
+        if self.host_limiter:
+            with self.host_limiter.slot(url):
+                return get_full_article_content(url, self.request_timeout, self.article_cache)
+        return get_full_article_content(url, self.request_timeout, self.article_cache)
+    
+    def apply(self, future: Future) -> bool:
+        """
+        Attach a finished fetch's text to its article
+        
+        Results are applied on the consuming thread, so fetches that are still
+        running when a stage gives up can never modify an article later.
+        
+        Returns:
+            True if the article received full content
+        """
+        article = self._articles.pop(future)
         try:
-            logger.info(f"Fetching from RSS feed: {url}")
-            feed = feedparser.parse(url)
+            full_content = future.result()
+        except Exception as e:
+            logger.debug(f"Could not fetch full content for {article['link']}: {e}")
+            return False
+        if full_content and len(full_content) > len(article.get('summary', '')):
+            article['full_content'] = full_content
+            return True
+        return False
+    
+    def cancel(self, futures: Set[Future]):
+        """Give up on fetches that have not finished"""
+        for future in futures:
+            future.cancel()
+            self._articles.pop(future, None)
+    
+    def shutdown(self):
+        """Stop the pool without waiting for in-flight downloads"""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+def iter_feed_results(rss_urls: List[str], max_per_feed: int = 5, max_workers: int = 8,
+                      per_host_limit: int = 2, feed_cache: FeedCache = None,
+                      full_text_workers: int = 4, full_text_timeout: float = 60,
+                      request_timeout: float = 10, article_cache: ArticleCache = None,
+                      high_water_marks: Dict[str, Dict] = None,
+                      time_budget: float = None) -> Iterator[Tuple[int, Dict]]:
+    """
+    Fetch RSS feeds concurrently, yielding each feed as soon as it is ready
+    
+    Feeds are fetched on a bounded thread pool (the global concurrency cap)
+    while a per-host limiter keeps sources that share a host from being
+    hammered in parallel. Article pages for entries with short summaries are
+    downloaded on a separate full-text pool as soon as their feed is parsed,
+    and a feed is yielded once its own pages are done.
+    
+    With a time budget, the whole scrape is cut off once the budget is
+    spent: article pages still pending are abandoned, feeds waiting on them
+    are yielded as they are, and feeds that have not finished downloading
+    are yielded with status 'timeout' and no articles.
+    
+    Args:
+        rss_urls: List of RSS feed URLs
+        max_per_feed: Maximum articles to fetch per feed
+        max_workers: Maximum number of feeds fetched at the same time
+        per_host_limit: Maximum simultaneous requests to a single host
+        feed_cache: Optional conditional-GET cache, saved once all feeds are done
+        full_text_workers: Size of the full-text download pool
+        full_text_timeout: Seconds to wait for outstanding full-text downloads
+            once every feed has been parsed
+        request_timeout: Timeout for each article page request
+        article_cache: Optional on-disk page cache, saved once all feeds are done
+        high_water_marks: Optional per-URL high-water marks (see fetch_feed);
+            entries at or below a feed's mark are not extracted
+        time_budget: Optional overall deadline for the scrape, in seconds
+    
+    Yields:
+        Tuples of (source index, per-feed result dictionary) in completion order
+    """
+    if not rss_urls:
+        return
+    
+    host_limiter = HostConcurrencyLimiter(per_host_limit)
+    workers = max(1, min(max_workers, len(rss_urls)))
+    executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="feed")
+    enricher = FullTextEnricher(full_text_workers, request_timeout, host_limiter, article_cache)
+    
+    high_water_marks = high_water_marks or {}
+    feed_futures = {
+        executor.submit(fetch_feed, url, max_per_feed, host_limiter, feed_cache,
+                        high_water_marks.get(url)): index
+        for index, url in enumerate(rss_urls)
+    }
+    feed_results: Dict[int, Dict] = {}
+    outstanding: Dict[int, Set[Future]] = {}
+    page_owner: Dict[Future, int] = {}
+    deadline = None
+    budget_deadline = time.monotonic() + time_budget if time_budget else None
+    enriched = 0
+    
+    try:
+        while feed_futures or page_owner:
+            timeout = None
+            if not feed_futures:
+                if deadline is None:
+                    deadline = time.monotonic() + full_text_timeout
+                timeout = max(0, deadline - time.monotonic())
+            if budget_deadline is not None:
+                remaining = max(0, budget_deadline - time.monotonic())
+                timeout = remaining if timeout is None else min(timeout, remaining)
             
-            if feed.bozo:
-                logger.warning(f"RSS feed may have issues: {url}")
+            done, _ = wait(set(feed_futures) | set(page_owner), timeout=timeout,
+                           return_when=FIRST_COMPLETED)
             
-            feed_title = getattr(feed.feed, 'title', urlparse(url).netloc)
-            logger.info(f"Found {len(feed.entries)} entries in {feed_title}")
+            if not done:
+                if feed_futures:
+                    logger.warning(f"Scrape time budget of {time_budget}s exhausted")
+                if page_owner:
+                    logger.warning(f"Full-text stage timed out; skipped {len(page_owner)} article pages")
+                enricher.cancel(set(page_owner))
+                page_owner.clear()
+                for index in sorted(outstanding):
+                    yield index, feed_results.pop(index)
+                outstanding.clear()
+                
+                # Feeds still downloading are reported rather than waited for
+                cut_off = sorted(feed_futures.values())
+                for future in feed_futures:
+                    future.cancel()
+                feed_futures.clear()
+                if cut_off:
+                    logger.warning(f"Cut off {len(cut_off)} feeds: "
+                                   f"{', '.join(rss_urls[index] for index in cut_off)}")
+                for index in cut_off:
+                    yield index, _new_feed_result(rss_urls[index], 'timeout', 'Scrape time budget exceeded')
+                break
             
-            for entry in feed.entries[:max_per_feed]:
-                try:
-                    article = extract_article_data(entry, feed_title)
-                    if article:
-                        articles.append(article)
-                except Exception as e:
-                    logger.error(f"Error processing entry from {url}: {e}")
-                    continue
-                    
-        except Exception as e:
-            logger.error(f"Failed to fetch RSS feed {url}: {e}")
-            continue
+            for future in done:
+                if future in feed_futures:
+                    index = feed_futures.pop(future)
+                    result = future.result()
+                    # Cached (not_modified) results hold RSS fields only, so they are enriched
+                    # too; the article cache makes a repeat fetch a disk read
+                    pages = enricher.submit(result['articles']) \
+                        if result['status'] in ('success', 'not_modified') else set()
+                    if pages:
+                        feed_results[index] = result
+                        outstanding[index] = pages
+                        page_owner.update((page, index) for page in pages)
+                    else:
+                        yield index, result
+                else:
+                    index = page_owner.pop(future)
+                    if enricher.apply(future):
+                        enriched += 1
+                    outstanding[index].discard(future)
+                    if not outstanding[index]:
+                        del outstanding[index]
+                        yield index, feed_results.pop(index)
+        
+        if enriched:
+            logger.info(f"Fetched full content for {enriched} articles")
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+        enricher.shutdown()
+        # The feed cache holds copies of the RSS fields, so full_content never
+        # reaches it; the article cache keeps the fetched pages instead
+        if feed_cache:
+            feed_cache.save()
+        if article_cache:
+            article_cache.save()
+
+def fetch_feeds(rss_urls: List[str], max_per_feed: int = 5, **kwargs) -> List[Dict]:
+    """
+    Fetch several RSS feeds concurrently
+    
+    Args:
+        rss_urls: List of RSS feed URLs
+        max_per_feed: Maximum articles to fetch per feed
+        **kwargs: Further keyword arguments of iter_feed_results
+    
+    Returns:
+        List of per-feed result dictionaries (see fetch_feed) in source order
+    """
+    results: List[Dict] = [None] * len(rss_urls)
+    
+    for index, result in iter_feed_results(rss_urls, max_per_feed, **kwargs):
+        results[index] = result
+    
+    return results
+
+def iter_articles(rss_urls: List[str], **kwargs) -> Iterator[Dict]:
+    """
+    Stream articles from RSS feeds as each feed completes
+    
+    Downstream stages can start deduplicating and summarizing while slower
+    feeds are still downloading. Accepts the keyword arguments of
+    iter_feed_results.
+    
+    Yields:
+        Article dictionaries, grouped by feed in completion order
+    """
+    for _, result in iter_feed_results(rss_urls, **kwargs):
+        yield from result['articles']
+
+def fetch_articles(rss_urls: List[str], max_per_feed: int = 5, **kwargs) -> List[Dict]:
+    """
+    Fetch articles from RSS feeds
+    
+    Args:
+        rss_urls: List of RSS feed URLs
+        max_per_feed: Maximum articles to fetch per feed
+        **kwargs: Concurrency, caching and timeout options of iter_feed_results
+    
+    Returns:
+        List of article dictionaries with title, link, summary, source,
+        ordered by source and then by feed position
+    """
+    articles = []
+    
+    for result in fetch_feeds(rss_urls, max_per_feed, **kwargs):
+        articles.extend(result['articles'])
     
     logger.info(f"Total articles fetched: {len(articles)}")
     return articles
 
-def extract_article_data(entry, source_name: str) -> Dict:
+def extract_article_data(entry, source_name: str, clean_summary: bool = True) -> Dict:
     """
     Extract relevant data from RSS entry
     
     Args:
         entry: RSS feed entry
         source_name: Name of the RSS source
+        clean_summary: Convert the summary to plain text; pass False to keep
+            the raw markup for batch cleaning by the caller
     
     Returns:
         Dictionary with article data
@@ -83,43 +548,39 @@ def extract_article_data(entry, source_name: str) -> Dict:
             if isinstance(entry.content, list) and entry.content:
                 summary = entry.content[0].value
         
-        # Clean HTML from summary safely using BeautifulSoup
-        if summary:
-            # Use BeautifulSoup to safely extract text from HTML
-            soup = BeautifulSoup(summary, 'html.parser')
-            # Remove script and style elements
-            for script in soup(["script", "style"]):
-                script.decompose()
-            # Get text content
-            summary = soup.get_text()
-            # Clean up whitespace
-            lines = (line.strip() for line in summary.splitlines())
-            chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
-            summary = ' '.join(chunk for chunk in chunks if chunk)
+        # Strip markup; script/style content is dropped
+        if clean_summary:
+            summary = html_to_text(summary)
         
         article['summary'] = summary
         
-        # Try to get full content if summary is short
-        if len(summary) < 100 and article['link']:
-            try:
-                full_content = get_full_article_content(article['link'])
-                if full_content and len(full_content) > len(summary):
-                    article['full_content'] = full_content
-            except Exception as e:
-                logger.debug(f"Could not fetch full content for {article['link']}: {e}")
-        
         return article
         
     except Exception as e:
         logger.error(f"Error extracting article data: {e}")
         return None
 
-def get_full_article_content(url: str) -> str:
+def needs_full_content(article: Dict) -> bool:
+    """Check whether an article's summary is too short to summarize on its own"""
+    return (
+        len(article.get('summary', '')) < 100
+        and bool(article.get('link'))
+        and 'full_content' not in article
+    )
+
+def get_full_article_content(url: str, timeout: float = 10, article_cache: ArticleCache = None) -> str:
     """
     Fetch full article content using trafilatura
     
+    The page is downloaded exactly once and the downloaded HTML is handed
+    straight to trafilatura for extraction. With an article cache, fresh
+    pages are read from disk and stale ones are revalidated with a
+    conditional GET.
+    
     Args:
         url: Article URL
+        timeout: Request timeout in seconds
+        article_cache: Optional on-disk page cache
     
     Returns:
         Extracted text content
@@ -130,20 +591,39 @@ def get_full_article_content(url: str) -> str:
             logger.debug(f"Invalid URL format: {url}")
             return ""
         
+        cached = article_cache.lookup(url) if article_cache else None
+        if cached and cached['fresh']:
+            text = article_cache.read_text(url)
+            if text is not None:
+                logger.debug(f"Article cache hit: {url}")
+                return text
+        
+        logger.debug(f"Fetching full content from: {url}")
         try:
-            response = requests.get(url, timeout=10, allow_redirects=True)
+            # Streamed with a byte cap; non-HTML responses are rejected before the body is read
+            headers = article_cache.conditional_headers(cached) if cached else {}
+            response, html = get_http_client().get_text(url, timeout=timeout, headers=headers)
+            if cached and response.status_code == 304:
+                text = article_cache.read_text(url)
+                if text is not None:
+                    article_cache.refresh(url, response.headers.get('ETag'),
+                                          response.headers.get('Last-Modified'))
+                    return text
+                # Cached copy vanished; download it unconditionally
+                response, html = get_http_client().get_text(url, timeout=timeout)
             response.raise_for_status()
-            downloaded = trafilatura.fetch_url(url, html=response.text)
         except requests.exceptions.RequestException as e:
             logger.debug(f"URL fetch failed for {url}: {e}")
             return ""
         
-        logger.debug(f"Fetching full content from: {url}")
-        downloaded = trafilatura.fetch_url(url)
-        if downloaded:
-            text = trafilatura.extract(downloaded)
-            return text if text else ""
-        return ""
+        text = ""
+        if html:
+            text = get_extraction_executor().extract_page(html, response.url)
+        
+        if article_cache:
+            article_cache.store(url, html, text, response.headers.get('ETag'),
+                                response.headers.get('Last-Modified'))
+        return text
     except Exception as e:
         logger.debug(f"Failed to extract full content from {url}: {e}")
         return ""
@@ -159,7 +639,7 @@ def validate_rss_url(url: str) -> bool:
         True if valid and accessible
     """
     try:
-        response = requests.head(url, timeout=10)
+        response = get_http_client().head(url, timeout=10)
         return response.status_code == 200
     except Exception:
         return False
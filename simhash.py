@@ -0,0 +1,158 @@
+"""
+64-bit SimHash fingerprints for near-exact duplicate detection
+Fingerprints are split into four 16-bit blocks so Hamming-distance lookups become indexed equality queries
+"""
+
+import hashlib
+import logging
+import re
+from collections import Counter
+from typing import Dict, List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; batch comparisons fall back to pure Python
+    np = None
+
+logger = logging.getLogger(__name__)
+
+FINGERPRINT_BITS = 64
+BLOCK_COUNT = 4
+BLOCK_BITS = FINGERPRINT_BITS // BLOCK_COUNT
+BLOCK_MASK = (1 << BLOCK_BITS) - 1
+
+# With four blocks, two fingerprints differing in at most three bits agree
+# on at least one whole block (pigeonhole), so block equality finds every
+# candidate within this distance
+MAX_BLOCK_DISTANCE = BLOCK_COUNT - 1
+
+# Caps the batch x history XOR matrix at about 8MB per step
+COMPARE_CHUNK_SIZE = 1 << 20
+
+def _feature_hash(feature: str) -> int:
+    # Stable across processes and Python versions, unlike hash()
+    return int.from_bytes(hashlib.blake2b(feature.encode('utf-8'), digest_size=8).digest(), 'big')
+
+def simhash(text: str) -> Optional[int]:
+    """
+    Compute the SimHash of a text from its word frequencies
+
+    Args:
+        text: Text to fingerprint
+
+    Returns:
+        Unsigned 64-bit fingerprint, or None if the text has no words
+    """
+    features = Counter(re.findall(r'\w+', text.lower()))
+    if not features:
+        return None
+
+    weights = [0] * FINGERPRINT_BITS
+    for feature, count in features.items():
+        value = _feature_hash(feature)
+        for bit in range(FINGERPRINT_BITS):
+            if value >> bit & 1:
+                weights[bit] += count
+            else:
+                weights[bit] -= count
+
+    return sum(1 << bit for bit, weight in enumerate(weights) if weight > 0)
+
+def article_simhash(article: Dict) -> Optional[int]:
+    """
+    SimHash of an article's normalized title and summary, as stored in the database
+
+    Returns:
+        Signed 64-bit fingerprint (fits a BIGINT column), or None for empty articles
+    """
+    title = re.sub(r'\s+', ' ', (article.get('title') or '').strip())
+    summary = re.sub(r'\s+', ' ', (article.get('summary') or '').strip())
+    fingerprint = simhash(f"{title} {summary}")
+    return None if fingerprint is None else to_signed(fingerprint)
+
+def to_signed(fingerprint: int) -> int:
+    """Map an unsigned 64-bit fingerprint onto the signed BIGINT range"""
+    return fingerprint - (1 << FINGERPRINT_BITS) if fingerprint >= 1 << (FINGERPRINT_BITS - 1) else fingerprint
+
+def to_unsigned(fingerprint: int) -> int:
+    """Inverse of to_signed"""
+    return fingerprint & ((1 << FINGERPRINT_BITS) - 1)
+
+def simhash_blocks(fingerprint: int) -> Tuple[int, ...]:
+    """Split a fingerprint (signed or unsigned) into its four 16-bit blocks, low block first"""
+    value = to_unsigned(fingerprint)
+    return tuple(value >> (BLOCK_BITS * block) & BLOCK_MASK for block in range(BLOCK_COUNT))
+
+def hamming_distance(first: int, second: int) -> int:
+    """Number of differing bits between two fingerprints"""
+    return (to_unsigned(first) ^ to_unsigned(second)).bit_count()
+
+def _closest_python(batch: List[int], history: List[int], max_distance: int) -> List[Optional[int]]:
+    matches = []
+    for fingerprint in batch:
+        best = None
+        for index, other in enumerate(history):
+            distance = (fingerprint ^ other).bit_count()
+            if distance <= max_distance and (best is None or distance < best[1]):
+                best = (index, distance)
+                if not distance:
+                    break
+        matches.append(best[0] if best else None)
+    return matches
+
+def _popcount(values):
+    if hasattr(np, 'bitwise_count'):
+        return np.bitwise_count(values)
+    bytes_view = values.view(np.uint8).reshape(values.shape + (8,))
+    return _BYTE_POPCOUNT[bytes_view].sum(axis=-1, dtype=np.uint8)
+
+_BYTE_POPCOUNT = None if np is None else np.array([bin(value).count('1') for value in range(256)], dtype=np.uint8)
+
+def _closest_numpy(batch: List[int], history: List[int], max_distance: int) -> List[Optional[int]]:
+    batch_array = np.array(batch, dtype=np.uint64)
+    history_array = np.array(history, dtype=np.uint64)
+    best_distance = np.full(len(batch), FINGERPRINT_BITS + 1, dtype=np.uint8)
+    best_index = np.full(len(batch), -1, dtype=np.int64)
+
+    step = max(1, COMPARE_CHUNK_SIZE // max(1, len(batch)))
+    for start in range(0, len(history), step):
+        chunk = history_array[start:start + step]
+        distances = _popcount(batch_array[:, None] ^ chunk[None, :])
+        chunk_best = distances.argmin(axis=1)
+        chunk_distance = distances[np.arange(len(batch)), chunk_best]
+        better = chunk_distance < best_distance
+        best_distance[better] = chunk_distance[better]
+        best_index[better] = chunk_best[better] + start
+
+    return [
+        int(index) if distance <= max_distance else None
+        for index, distance in zip(best_index, best_distance)
+    ]
+
+def closest_matches(batch: Sequence[int], history: Sequence[int],
+                    max_distance: int = MAX_BLOCK_DISTANCE) -> List[Optional[int]]:
+    """
+    Compare a batch of fingerprints against history fingerprints
+
+    Uses a vectorized XOR/popcount over the whole batch when NumPy is
+    installed, and a pure-Python loop otherwise; both give the same result.
+
+    Args:
+        batch: Incoming fingerprints (signed or unsigned)
+        history: Fingerprints to compare against (signed or unsigned)
+        max_distance: Largest Hamming distance that counts as a match
+
+    Returns:
+        For each batch fingerprint, the index of the closest history
+        fingerprint within ``max_distance``, or None
+    """
+    if not batch:
+        return []
+    if not history:
+        return [None] * len(batch)
+
+    batch = [to_unsigned(value) for value in batch]
+    history = [to_unsigned(value) for value in history]
+    if np is not None:
+        return _closest_numpy(batch, history, max_distance)
+    return _closest_python(batch, history, max_distance)
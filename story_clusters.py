@@ -0,0 +1,191 @@
+"""
+Topic clustering of candidate stories before summarization
+Groups articles about the same event by TF-IDF cosine similarity so only one per cluster is summarized
+"""
+
+import logging
+import math
+import re
+from collections import Counter
+from typing import Dict, List, Optional
+
+try:
+    import numpy as np
+except ImportError:  # Similarities fall back to sparse dictionaries
+    np = None
+
+logger = logging.getLogger(__name__)
+
+# Words too common in news copy to say anything about the topic
+STOP_WORDS = frozenset("""
+    a about after all also an and any are as at be been but by can for from had has have he her his how
+    in into is it its more new not of on or our out over says said she so than that the their them they
+    this to up was we were what when which who will with would you your
+""".split())
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens without stop words or single characters"""
+    return [word for word in re.findall(r'[a-z0-9]+', text.lower()) if len(word) > 1 and word not in STOP_WORDS]
+
+def story_text(article: Dict) -> str:
+    """Text a story is compared on; the title is counted twice as it names the event most directly"""
+    title = article.get('title', '')
+    return f"{title} {title} {article.get('summary', '')}"
+
+def tfidf_vectors(documents: List[List[str]]) -> List[Dict[str, float]]:
+    """
+    L2-normalized TF-IDF vectors of tokenized documents, as sparse dictionaries
+
+    Uses smoothed IDF, log((1 + n) / (1 + df)) + 1, so a term found in every
+    document still carries some weight.
+    """
+    document_frequency = Counter(term for document in documents for term in set(document))
+    count = len(documents)
+    idf = {term: math.log((1 + count) / (1 + df)) + 1 for term, df in document_frequency.items()}
+
+    vectors = []
+    for document in documents:
+        vector = {term: tf * idf[term] for term, tf in Counter(document).items()}
+        norm = math.sqrt(sum(weight * weight for weight in vector.values()))
+        vectors.append({term: weight / norm for term, weight in vector.items()} if norm else {})
+    return vectors
+
+def tfidf_matrix(documents: List[List[str]]) -> 'np.ndarray':
+    """The same vectors as tfidf_vectors, as rows of a dense NumPy matrix"""
+    vocabulary = {}
+    rows, columns = [], []
+    for row, document in enumerate(documents):
+        for term in document:
+            rows.append(row)
+            columns.append(vocabulary.setdefault(term, len(vocabulary)))
+
+    counts = np.zeros((len(documents), max(1, len(vocabulary))), dtype=np.float32)
+    np.add.at(counts, (np.array(rows, dtype=np.intp), np.array(columns, dtype=np.intp)), 1)
+    document_frequency = np.count_nonzero(counts, axis=0)
+    matrix = counts * (np.log((1 + len(documents)) / (1 + document_frequency)) + 1).astype(np.float32)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return np.divide(matrix, norms, out=np.zeros_like(matrix), where=norms > 0)
+
+class StoryClusterer:
+    """
+    Groups stories about the same event and keeps one representative of each
+
+    Clustering is greedy in input order: a story joins the cluster whose
+    representative it is most similar to, if that similarity reaches
+    ``threshold``, and otherwise starts a cluster of its own. Comparing
+    against representatives only keeps clusters from chaining into loosely
+    related stories. The others in a cluster are attached to the
+    representative as ``also_covered_by``.
+
+    Representatives are remembered across calls, so stories arriving in a
+    later feed join clusters started by an earlier one. IDF weights are
+    recomputed over the representatives and the new batch on every call.
+    """
+
+    def __init__(self, threshold: float = 0.4):
+        """
+        Args:
+            threshold: Cosine similarity of TF-IDF vectors at which two stories cover the same event
+        """
+        self.threshold = threshold
+        self.representatives: List[Dict] = []
+        self._tokens: List[List[str]] = []
+        # Stories whose summary failed, by id(), so they are never promoted again
+        self._failed = set()
+
+    @classmethod
+    def from_config(cls, settings: Dict) -> 'StoryClusterer':
+        """Create a clusterer from the "clustering" section of config.json"""
+        return cls(threshold=settings.get('threshold', 0.4))
+
+    def cluster(self, articles: List[Dict]) -> List[Dict]:
+        """
+        Assign articles to clusters
+
+        Args:
+            articles: Deduplicated candidate stories
+
+        Returns:
+            Articles that start a new cluster, in input order; the rest were
+            added to the ``also_covered_by`` list of their representative
+        """
+        if not articles:
+            return []
+
+        tokens = [tokenize(story_text(article)) for article in articles]
+        documents = self._tokens + tokens
+        known = len(self._tokens)
+        if np is not None:
+            matrix = tfidf_matrix(documents)
+            # Each new story against every representative and every other new story
+            similarities = matrix[known:] @ matrix.T
+        else:
+            vectors = tfidf_vectors(documents)
+
+        # Columns of the documents that are representatives, as they are chosen
+        rep_columns = list(range(known))
+        new_representatives = []
+        for i, article in enumerate(articles):
+            best, best_similarity = None, self.threshold
+            if rep_columns:
+                if np is not None:
+                    row = similarities[i, rep_columns]
+                    position = int(np.argmax(row))
+                    if row[position] >= best_similarity:
+                        best = rep_columns[position]
+                else:
+                    vector = vectors[known + i]
+                    for column in rep_columns:
+                        other = vectors[column]
+                        similarity = sum(weight * other.get(term, 0.0) for term, weight in vector.items())
+                        if similarity >= best_similarity:
+                            best, best_similarity = column, similarity
+
+            if best is None:
+                rep_columns.append(known + i)
+                new_representatives.append(article)
+                self.representatives.append(article)
+                self._tokens.append(tokens[i])
+            else:
+                representative = self.representatives[rep_columns.index(best)]
+                representative.setdefault('also_covered_by', []).append(article)
+
+        clustered = len(articles) - len(new_representatives)
+        if clustered:
+            logger.info(f"Clustered {clustered} of {len(articles)} stories into existing topics")
+        return new_representatives
+
+    def promote(self, representative: Dict) -> Optional[Dict]:
+        """
+        Hand a cluster to its next story when the representative could not be summarized
+
+        The failed representative joins the new one's ``also_covered_by``, so
+        it is still recorded as seen once the cluster is published.
+
+        Returns:
+            The new representative, or None if no story in the cluster is
+            left to try; the cluster is then forgotten, so later stories on
+            the topic start a new one
+        """
+        self._failed.add(id(representative))
+        members = representative.pop('also_covered_by', [])
+        index = next((i for i, known in enumerate(self.representatives) if known is representative), None)
+        candidates = [member for member in members if id(member) not in self._failed]
+        if not candidates:
+            if index is not None:
+                del self.representatives[index]
+                del self._tokens[index]
+            return None
+
+        successor = candidates[0]
+        others = [member for member in members if member is not successor]
+        successor.setdefault('also_covered_by', []).extend(others + [representative])
+        if index is not None:
+            self.representatives[index] = successor
+            self._tokens[index] = tokenize(story_text(successor))
+        logger.info(f"Promoted '{successor.get('title', 'Unknown')}' to represent its topic")
+        return successor
+
+def cluster_members(stories: List[Dict]) -> List[Dict]:
+    """Articles attached to stories as ``also_covered_by``, which were not summarized themselves"""
+    return [member for story in stories for member in story.get('also_covered_by', [])]
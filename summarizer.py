@@ -2,17 +2,25 @@
 AI-powered article summarization and subject line generation using OpenAI GPT-4o
 """
 
+import asyncio
 import os
 import logging
 import json
+import threading
+import time
+from concurrent.futures import Future
 from typing import Dict, List, Optional
-from openai import OpenAI
+from openai import AsyncOpenAI, OpenAI
 
 logger = logging.getLogger(__name__)
 
 # Global OpenAI client - will be initialized when API key is provided
 openai_client = None
 
+SUMMARY_MODEL = "gpt-4o"
+SUMMARY_MAX_TOKENS = 300
+SUMMARY_SYSTEM_PROMPT = "You are an expert content curator for meeting and event industry professionals. You specialize in creating engaging, informative newsletter content."
+
 def get_api_key():
     """Get OpenAI API key from environment or config file"""
     # First try environment variable
@@ -76,38 +84,29 @@ def test_api_connection(api_key=None):
 if not initialize_openai_client():
     logger.warning("OpenAI client not initialized - API key required for summarization features")
 
-def summarize_article(article: Dict) -> Optional[str]:
+def build_summary_messages(article: Dict) -> Optional[List[Dict]]:
     """
-    Summarize an article for newsletter inclusion using GPT-4o
+    Chat messages asking GPT-4o to summarize an article
     
     Args:
         article: Dictionary containing article data (title, summary, full_content, etc.)
     
     Returns:
-        Formatted summary string or None if failed
+        Messages list, or None if the article has no content to summarize
     """
-    global openai_client
+    # Prepare content for summarization
+    content_to_summarize = article.get('summary', '')
     
-    # Check if client is initialized
-    if not openai_client:
-        if not initialize_openai_client():
-            logger.error("Cannot summarize article: OpenAI client not initialized")
-            return None
+    # Use full content if available and summary is short
+    if article.get('full_content') and len(content_to_summarize) < 200:
+        content_to_summarize = article['full_content']
     
-    try:
-        # Prepare content for summarization
-        content_to_summarize = article.get('summary', '')
-        
-        # Use full content if available and summary is short
-        if article.get('full_content') and len(content_to_summarize) < 200:
-            content_to_summarize = article['full_content']
-        
-        if not content_to_summarize.strip():
-            logger.warning(f"No content to summarize for article: {article.get('title', 'Unknown')}")
-            return None
-        
-        # Craft prompt for meeting planner audience
-        prompt = f"""
+    if not content_to_summarize.strip():
+        logger.warning(f"No content to summarize for article: {article.get('title', 'Unknown')}")
+        return None
+    
+    # Craft prompt for meeting planner audience
+    prompt = f"""
 You are writing for a newsletter targeted at meeting planners and event professionals. 
 
 Please summarize this article in a format suitable for a professional newsletter:
@@ -129,54 +128,292 @@ Please summarize this article in a format suitable for a professional newsletter
 [2-3 short sentences summarizing the key points - max 60 words total]
 🔑 **Key Takeaway:** [One actionable insight - max 15 words]
 """
+    return [
+        {"role": "system", "content": SUMMARY_SYSTEM_PROMPT},
+        {"role": "user", "content": prompt}
+    ]
 
+def parse_summary(summary_text: str, article: Dict) -> Optional[Dict]:
+    """Split a model response into the summary and the key takeaway"""
+    summary_text = (summary_text or '').strip()
+    if not summary_text:
+        logger.warning(f"Empty summary returned for: {article.get('title', 'Unknown')}")
+        return None
+    
+    logger.info(f"Successfully summarized: {article.get('title', 'Unknown')}")
+    
+    # Parse the summary to extract takeaway
+    lines = summary_text.split('\n')
+    summary = ""
+    takeaway = ""
+    
+    for line in lines:
+        if '🔑' in line or 'Key Takeaway:' in line:
+            # Extract takeaway
+            takeaway = line.replace('🔑', '').replace('**Key Takeaway:**', '').strip()
+            takeaway = takeaway.replace('**', '').strip()
+        else:
+            summary += line + " "
+    
+    # Return structured data
+    return {
+        'summary': summary.strip(),
+        'takeaway': takeaway
+    }
+
+def summarize_article(article: Dict) -> Optional[Dict]:
+    """
+    Summarize an article for newsletter inclusion using GPT-4o
+    
+    Args:
+        article: Dictionary containing article data (title, summary, full_content, etc.)
+    
+    Returns:
+        Dictionary with 'summary' and 'takeaway', or None if failed
+    """
+    global openai_client
+    
+    # Check if client is initialized
+    if not openai_client:
+        if not initialize_openai_client():
+            logger.error("Cannot summarize article: OpenAI client not initialized")
+            return None
+    
+    try:
+        messages = build_summary_messages(article)
+        if messages is None:
+            return None
+        
         # Call GPT-4o for summarization
         # the newest OpenAI model is "gpt-4o" which was released May 13, 2024.
         # do not change this unless explicitly requested by the user
         response = openai_client.chat.completions.create(
-            model="gpt-4o",
-            messages=[
-                {
-                    "role": "system", 
-                    "content": "You are an expert content curator for meeting and event industry professionals. You specialize in creating engaging, informative newsletter content."
-                },
-                {"role": "user", "content": prompt}
-            ],
+            model=SUMMARY_MODEL,
+            messages=messages,
             temperature=0.7,
-            max_tokens=300
+            max_tokens=SUMMARY_MAX_TOKENS
         )
         
-        summary_text = response.choices[0].message.content.strip()
-        
-        if summary_text:
-            logger.info(f"Successfully summarized: {article.get('title', 'Unknown')}")
-            
-            # Parse the summary to extract takeaway
-            lines = summary_text.split('\n')
-            summary = ""
-            takeaway = ""
-            
-            for line in lines:
-                if '🔑' in line or 'Key Takeaway:' in line:
-                    # Extract takeaway
-                    takeaway = line.replace('🔑', '').replace('**Key Takeaway:**', '').strip()
-                    takeaway = takeaway.replace('**', '').strip()
-                else:
-                    summary += line + " "
-            
-            # Return structured data
-            return {
-                'summary': summary.strip(),
-                'takeaway': takeaway
-            }
-        else:
-            logger.warning(f"Empty summary returned for: {article.get('title', 'Unknown')}")
-            return None
+        return parse_summary(response.choices[0].message.content, article)
             
     except Exception as e:
         logger.error(f"Failed to summarize article '{article.get('title', 'Unknown')}': {e}")
         return None
 
+class AsyncRateLimiter:
+    """
+    Requests-per-minute and tokens-per-minute limits for concurrent API calls
+    
+    Two token buckets, each refilling continuously and holding at most one
+    minute's allowance; acquire() waits until both can cover the call.
+    A limit of 0 disables that bucket.
+    """
+    
+    def __init__(self, requests_per_minute: int = 500, tokens_per_minute: int = 30000):
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.requests = float(requests_per_minute)
+        self.tokens = float(tokens_per_minute)
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+    
+    def _refill(self):
+        now = time.monotonic()
+        elapsed_minutes = (now - self.updated) / 60
+        self.requests = min(self.requests_per_minute, self.requests + elapsed_minutes * self.requests_per_minute)
+        self.tokens = min(self.tokens_per_minute, self.tokens + elapsed_minutes * self.tokens_per_minute)
+        self.updated = now
+    
+    async def acquire(self, tokens: int):
+        """Reserve one request and ``tokens`` tokens, sleeping until both are available"""
+        # A call larger than a whole minute's allowance waits for a full bucket
+        if self.tokens_per_minute:
+            tokens = min(tokens, self.tokens_per_minute)
+        
+        # Callers queue on the lock, so they are served in arrival order
+        async with self._lock:
+            while True:
+                self._refill()
+                waits = []
+                if self.requests_per_minute and self.requests < 1:
+                    waits.append((1 - self.requests) / self.requests_per_minute * 60)
+                if self.tokens_per_minute and self.tokens < tokens:
+                    waits.append((tokens - self.tokens) / self.tokens_per_minute * 60)
+                if not waits:
+                    if self.requests_per_minute:
+                        self.requests -= 1
+                    if self.tokens_per_minute:
+                        self.tokens -= tokens
+                    return
+                await asyncio.sleep(max(waits))
+
+def estimate_tokens(messages: List[Dict], max_tokens: int = SUMMARY_MAX_TOKENS) -> int:
+    """Rough token cost of a chat call: about four characters per prompt token, plus the completion"""
+    return sum(len(message['content']) for message in messages) // 4 + max_tokens
+
+async def summarize_article_async(client: AsyncOpenAI, article: Dict, semaphore: asyncio.Semaphore,
+                                  limiter: AsyncRateLimiter, label: str) -> Optional[Dict]:
+    """
+    Summarize one article with the async client, within the caller's concurrency and rate limits
+    
+    Args:
+        client: Async OpenAI client
+        article: Article to summarize
+        semaphore: Bounds the calls in flight
+        limiter: Rate limiter shared by every call of the run
+        label: Position shown in the log line, e.g. "3/20"
+    
+    Returns:
+        Summary dictionary, or None if the article could not be summarized
+    """
+    messages = build_summary_messages(article)
+    if messages is None:
+        return None
+    
+    async with semaphore:
+        await limiter.acquire(estimate_tokens(messages))
+        try:
+            logger.info(f"Summarizing article {label}: {article.get('title', 'Unknown')}")
+            # the newest OpenAI model is "gpt-4o" which was released May 13, 2024.
+            # do not change this unless explicitly requested by the user
+            response = await client.chat.completions.create(
+                model=SUMMARY_MODEL,
+                messages=messages,
+                temperature=0.7,
+                max_tokens=SUMMARY_MAX_TOKENS
+            )
+            return parse_summary(response.choices[0].message.content, article)
+        except Exception as e:
+            logger.error(f"Failed to summarize article '{article.get('title', 'Unknown')}': {e}")
+            return None
+
+async def summarize_articles_async(articles: List[Dict], concurrency: int = 4,
+                                   requests_per_minute: int = 500,
+                                   tokens_per_minute: int = 30000) -> List[Optional[Dict]]:
+    """
+    Summarize articles concurrently with the async OpenAI client
+    
+    At most ``concurrency`` calls are in flight, and calls start only as
+    fast as the rate limits allow.
+    
+    Args:
+        articles: Articles to summarize
+        concurrency: Maximum simultaneous API calls
+        requests_per_minute: Request rate limit (0 for none)
+        tokens_per_minute: Prompt plus completion token rate limit (0 for none)
+    
+    Returns:
+        One summary dictionary (or None if that article failed) per article, in input order
+    """
+    api_key = get_api_key()
+    if not api_key:
+        logger.error("Cannot summarize articles: no OpenAI API key found in environment or config")
+        return [None] * len(articles)
+    
+    client = AsyncOpenAI(api_key=api_key)
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    limiter = AsyncRateLimiter(requests_per_minute, tokens_per_minute)
+    
+    try:
+        # gather() returns results in the order the coroutines were passed
+        return await asyncio.gather(*(
+            summarize_article_async(client, article, semaphore, limiter, f"{i + 1}/{len(articles)}")
+            for i, article in enumerate(articles)
+        ))
+    finally:
+        await client.close()
+
+def summarize_articles(articles: List[Dict], concurrency: int = 4,
+                       requests_per_minute: int = 500,
+                       tokens_per_minute: int = 30000) -> List[Optional[Dict]]:
+    """
+    Summarize a batch of articles concurrently; see summarize_articles_async
+    
+    Runs its own event loop, so it must be called from synchronous code.
+    
+    Returns:
+        One summary dictionary (or None if that article failed) per article, in input order
+    """
+    if not articles:
+        return []
+    return asyncio.run(summarize_articles_async(articles, concurrency, requests_per_minute, tokens_per_minute))
+
+class SummaryStream:
+    """
+    Summarizes articles submitted one at a time from synchronous code
+    
+    Calls run on an event loop in a background thread and share one async
+    client, one concurrency limit and one AsyncRateLimiter, so the rate
+    limits hold across everything submitted while the stream is open, e.g.
+    every feed of a streaming run. Use it as a context manager.
+    """
+    
+    def __init__(self, concurrency: int = 4, requests_per_minute: int = 500, tokens_per_minute: int = 30000):
+        """
+        Args:
+            concurrency: Maximum simultaneous API calls
+            requests_per_minute: Request rate limit (0 for none)
+            tokens_per_minute: Prompt plus completion token rate limit (0 for none)
+        """
+        self.concurrency = concurrency
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.submitted = 0
+        self._loop = None
+        self._thread = None
+        self._client = None
+    
+    @classmethod
+    def from_config(cls, settings: Dict) -> 'SummaryStream':
+        """Create a stream from the "pipeline" section of config.json"""
+        return cls(
+            concurrency=settings.get('summary_workers', 4),
+            requests_per_minute=settings.get('requests_per_minute', 500),
+            tokens_per_minute=settings.get('tokens_per_minute', 30000)
+        )
+    
+    def __enter__(self) -> 'SummaryStream':
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="summarize", daemon=True)
+        self._thread.start()
+        asyncio.run_coroutine_threadsafe(self._open(), self._loop).result()
+        return self
+    
+    async def _open(self):
+        # Created on the stream's loop, which they are bound to
+        api_key = get_api_key()
+        if not api_key:
+            logger.error("Cannot summarize articles: no OpenAI API key found in environment or config")
+        else:
+            self._client = AsyncOpenAI(api_key=api_key)
+        self._semaphore = asyncio.Semaphore(max(1, self.concurrency))
+        self._limiter = AsyncRateLimiter(self.requests_per_minute, self.tokens_per_minute)
+    
+    def submit(self, article: Dict) -> Future:
+        """Queue an article; the future resolves to its summary dictionary, or None if it failed"""
+        if self._client is None:
+            future = Future()
+            future.set_result(None)
+            return future
+        self.submitted += 1
+        return asyncio.run_coroutine_threadsafe(
+            summarize_article_async(self._client, article, self._semaphore, self._limiter, f"#{self.submitted}"),
+            self._loop
+        )
+    
+    def __exit__(self, *exc_info):
+        """Wait for the calls still running, then stop the loop"""
+        async def close():
+            tasks = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+            await asyncio.gather(*tasks, return_exceptions=True)
+            if self._client is not None:
+                await self._client.close()
+        
+        asyncio.run_coroutine_threadsafe(close(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+
 def generate_subject_line(summaries: List[Dict], newsletter_title: str) -> str:
     """
     Generate compelling subject line for the newsletter using GPT-4o